@@ -0,0 +1,22 @@
+import asyncio
+
+from config.database import AsyncSessionLocal
+from config.get_db import init_create_table
+from module_admin.service.dept_service import DeptService
+from utils.log_util import logger
+
+
+async def backfill_dept_closure() -> None:
+    """
+    根据部门表重建部门闭包表，用于升级后首次回填或修复闭包关系，可通过--env参数指定运行环境，如python backfill_dept_closure.py --env=prod
+
+    :return:
+    """
+    await init_create_table()
+    async with AsyncSessionLocal() as session:
+        count = await DeptService.rebuild_dept_closure_services(session)
+    logger.info(f'✅️ 部门闭包表重建成功，共写入{count}条闭包关系')
+
+
+if __name__ == '__main__':
+    asyncio.run(backfill_dept_closure())
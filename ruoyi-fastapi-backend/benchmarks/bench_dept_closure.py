@@ -0,0 +1,120 @@
+"""
+子部门查询基准测试
+
+在配置的数据库中写入指定数量的部门（每个部门10个子部门，全部在同一事务中写入，测试结束后回滚，不会保留），
+重建部门闭包表后，对比原先通过find_in_set匹配祖级列表与DeptDao.get_children_dept_dao通过闭包表查询子部门的耗时，
+并校验两者查询结果一致。需要可连接的MySQL或PostgreSQL数据库，在后端根目录下执行：python -m benchmarks.bench_dept_closure --env=dev
+可通过环境变量BENCH_DEPT_COUNT（部门数，默认50000）及BENCH_ITERATIONS（查询次数，默认20）调整规模
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from collections.abc import Awaitable, Callable, Sequence
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.database import AsyncSessionLocal, async_engine
+from module_admin.dao.dept_dao import DeptDao
+from module_admin.entity.do.dept_do import SysDept
+
+DEPT_COUNT = int(os.environ.get('BENCH_DEPT_COUNT', '50000'))
+ITERATIONS = int(os.environ.get('BENCH_ITERATIONS', '20'))
+CHILDREN_PER_DEPT = 10
+
+
+async def create_fixture(db: AsyncSession) -> int:
+    """
+    写入测试部门数据，第一个部门为根部门，其余部门依次挂载到前面的部门下
+
+    :param db: orm对象
+    :return: 测试根部门下第一个子部门的id
+    """
+    # 测试数据的起始id，避免与已有数据冲突
+    id_base = ((await db.execute(select(func.max(SysDept.dept_id)))).scalar() or 0) + 1
+    ancestors_list: list[str] = []
+    dept_list = []
+    for index in range(DEPT_COUNT):
+        if index == 0:
+            parent_id = 0
+            ancestors = '0'
+        else:
+            parent_index = (index - 1) // CHILDREN_PER_DEPT
+            parent_id = id_base + parent_index
+            ancestors = f'{ancestors_list[parent_index]},{parent_id}'
+        ancestors_list.append(ancestors)
+        dept_list.append(
+            {
+                'dept_id': id_base + index,
+                'parent_id': parent_id,
+                'ancestors': ancestors,
+                'dept_name': f'bench_dept_{index}',
+                'order_num': index,
+                'status': '0',
+                'del_flag': '0',
+            }
+        )
+    for start in range(0, len(dept_list), 5000):
+        await db.execute(insert(SysDept), dept_list[start : start + 5000])
+    return id_base + 1
+
+
+async def get_children_dept_find_in_set(db: AsyncSession, dept_id: int) -> Sequence[SysDept]:
+    """
+    原先的实现：通过find_in_set匹配祖级列表查询子部门
+
+    :param db: orm对象
+    :param dept_id: 部门id
+    :return: 子部门信息列表
+    """
+    return (await db.execute(select(SysDept).where(func.find_in_set(dept_id, SysDept.ancestors)))).scalars().all()
+
+
+async def measure(
+    db: AsyncSession, query_func: Callable[[AsyncSession, int], Awaitable[Sequence[SysDept]]], dept_id: int
+) -> tuple[float, set[int]]:
+    """
+    多次执行子部门查询，统计中位耗时
+
+    :param db: orm对象
+    :param query_func: 子部门查询函数
+    :param dept_id: 部门id
+    :return: 中位耗时（单位：毫秒）及查询到的子部门id集合
+    """
+    durations = []
+    for _ in range(ITERATIONS):
+        start_time = time.perf_counter()
+        dept_list = await query_func(db, dept_id)
+        durations.append((time.perf_counter() - start_time) * 1000)
+        dept_ids = {dept.dept_id for dept in dept_list}
+        db.expunge_all()
+    return statistics.median(durations), dept_ids
+
+
+async def main() -> None:
+    print(f'部门数：{DEPT_COUNT}，查询次数：{ITERATIONS}')
+    async with AsyncSessionLocal() as db:
+        try:
+            dept_id = await create_fixture(db)
+            start_time = time.perf_counter()
+            closure_count = await DeptDao.rebuild_dept_closure_dao(db)
+            print(
+                f'重建部门闭包表：写入{closure_count}条闭包关系，耗时{(time.perf_counter() - start_time) * 1000:.0f}ms'
+            )
+            results = {}
+            for label, query_func in (
+                ('find_in_set匹配祖级列表', get_children_dept_find_in_set),
+                ('闭包表查询', DeptDao.get_children_dept_dao),
+            ):
+                median_ms, results[label] = await measure(db, query_func, dept_id)
+                print(f'{label}：查询到{len(results[label])}个子部门，中位耗时{median_ms:.1f}ms')
+            print(f'查询结果是否一致：{len({frozenset(dept_ids) for dept_ids in results.values()}) == 1}')
+        finally:
+            await db.rollback()
+    await async_engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""
+登录风暴下无关接口的响应延迟基准测试
+
+同时发起200个登录请求（bcrypt校验密码），期间每10ms请求一次不涉及密码计算的接口，对比在事件循环中同步校验密码
+与通过PwdUtil在线程池中校验密码时该接口的p50/p99延迟。在后端根目录下执行：python -m benchmarks.bench_login_burst
+可通过环境变量BENCH_LOGIN_COUNT（登录请求数，默认200）及BENCH_HASH_ROUNDS（bcrypt计算成本，默认10）调整规模
+"""
+
+import asyncio
+import os
+import statistics
+import time
+
+import bcrypt
+import httpx
+from fastapi import FastAPI
+
+from config.env import AppConfig
+from utils.pwd_util import PwdUtil
+
+LOGIN_COUNT = int(os.environ.get('BENCH_LOGIN_COUNT', '200'))
+HASH_ROUNDS = int(os.environ.get('BENCH_HASH_ROUNDS', '10'))
+PING_INTERVAL = 0.01
+PASSWORD = 'admin123'
+PASSWORD_HASH = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=HASH_ROUNDS)).decode('utf-8')
+
+
+def create_app(offload: bool) -> FastAPI:
+    """
+    创建包含登录接口及无关接口的测试应用
+
+    :param offload: 是否通过PwdUtil在线程池中校验密码
+    :return: 测试应用
+    """
+    app = FastAPI()
+
+    @app.post('/login')
+    async def login() -> dict:
+        if offload:
+            verified = await PwdUtil.verify_password_async(PASSWORD, PASSWORD_HASH)
+        else:
+            verified = PwdUtil.verify_password(PASSWORD, PASSWORD_HASH)
+        return {'verified': verified}
+
+    @app.get('/ping')
+    async def ping() -> dict:
+        return {'pong': True}
+
+    return app
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """
+    计算百分位数
+
+    :param values: 数据列表
+    :param percent: 百分位
+    :return: 百分位数
+    """
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+async def run_burst(offload: bool) -> dict[str, float]:
+    """
+    发起登录风暴，并在登录请求全部完成前持续请求无关接口
+
+    :param offload: 是否通过PwdUtil在线程池中校验密码
+    :return: 登录总耗时及无关接口的延迟统计（单位：毫秒）
+    """
+    transport = httpx.ASGITransport(app=create_app(offload))
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        ping_latencies: list[float] = []
+        start_time = time.perf_counter()
+        login_task = asyncio.gather(*[client.post('/login') for _ in range(LOGIN_COUNT)])
+        ping_count = 0
+        while not login_task.done():
+            # 按固定间隔计划发起请求，延迟从计划发起时间开始计算，事件循环被阻塞期间的等待时间同样计入延迟
+            ping_count += 1
+            scheduled_time = start_time + ping_count * PING_INTERVAL
+            await asyncio.sleep(max(scheduled_time - time.perf_counter(), 0))
+            await client.get('/ping')
+            ping_latencies.append((time.perf_counter() - scheduled_time) * 1000)
+        await login_task
+        total_time = (time.perf_counter() - start_time) * 1000
+    return {
+        'login_total_ms': total_time,
+        'ping_count': len(ping_latencies),
+        'ping_p50_ms': statistics.median(ping_latencies),
+        'ping_p99_ms': percentile(ping_latencies, 99),
+        'ping_max_ms': max(ping_latencies),
+    }
+
+
+async def main() -> None:
+    print(
+        f'登录请求数：{LOGIN_COUNT}，bcrypt计算成本：{HASH_ROUNDS}，密码计算线程数：{AppConfig.app_password_hash_workers}'
+    )
+    for offload in (False, True):
+        result = await run_burst(offload)
+        label = 'PwdUtil线程池校验' if offload else '事件循环中同步校验'
+        print(
+            f'{label}：登录总耗时{result["login_total_ms"]:.0f}ms，无关接口请求{result["ping_count"]}次，'
+            f'p50 {result["ping_p50_ms"]:.1f}ms，p99 {result["ping_p99_ms"]:.1f}ms，max {result["ping_max_ms"]:.1f}ms'
+        )
+    PwdUtil.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
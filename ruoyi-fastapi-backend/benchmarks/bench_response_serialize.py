@@ -0,0 +1,140 @@
+"""
+响应序列化基准测试
+
+构造包含指定行数的分页数据，对比原先先经过jsonable_encoder递归转换再由JSONResponse序列化的方式，
+与ResponseUtil.success通过orjson直接序列化的方式生成响应体的耗时，并校验两者反序列化后的内容一致。
+在后端根目录下执行：python -m benchmarks.bench_response_serialize
+可通过环境变量BENCH_ROW_COUNT（行数，默认10000）及BENCH_REPEAT（重复次数，默认5）调整规模
+"""
+
+import enum
+import json
+import os
+import statistics
+import time
+import uuid
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from common.vo import PageModel
+from utils.response_util import ResponseUtil
+
+ROW_COUNT = int(os.environ.get('BENCH_ROW_COUNT', '10000'))
+REPEAT = int(os.environ.get('BENCH_REPEAT', '5'))
+
+
+class BenchStatus(str, enum.Enum):
+    NORMAL = '0'
+    DISABLE = '1'
+
+
+def create_simple_rows() -> list[dict[str, Any]]:
+    """
+    生成包含字符串、整数、时间及空值的6列数据
+
+    :return: 行数据列表
+    """
+    now = datetime.now()
+    return [
+        {
+            'operId': index,
+            'title': f'用户管理{index}',
+            'operName': 'admin',
+            'operIp': '127.0.0.1',
+            'operTime': now - timedelta(seconds=index),
+            'errorMsg': None,
+        }
+        for index in range(ROW_COUNT)
+    ]
+
+
+def create_mixed_rows() -> list[dict[str, Any]]:
+    """
+    生成额外包含Decimal、日期、UUID及枚举的15列数据
+
+    :return: 行数据列表
+    """
+    now = datetime.now()
+    return [
+        {
+            'id': index,
+            'name': f'name{index}',
+            'code': f'code{index}',
+            'amount': Decimal(f'{index}.25'),
+            'quantity': Decimal(index),
+            'price': Decimal('19.90'),
+            'birthday': date(2000, 1, 1) + timedelta(days=index % 365),
+            'createTime': now - timedelta(minutes=index),
+            'updateTime': now,
+            'traceId': uuid.UUID(int=index),
+            'status': BenchStatus.NORMAL if index % 2 else BenchStatus.DISABLE,
+            'remark': None,
+            'enabled': bool(index % 2),
+            'score': index / 3,
+            'tags': ['a', 'b'],
+        }
+        for index in range(ROW_COUNT)
+    ]
+
+
+def render_jsonable_encoder(page: PageModel) -> bytes:
+    """
+    原先的实现：先通过jsonable_encoder转换整个响应内容，再由JSONResponse序列化
+
+    :param page: 分页数据
+    :return: 响应体
+    """
+    result = {'code': 200, 'msg': '操作成功', **page.model_dump(by_alias=True), 'success': True, 'time': datetime.now()}
+    return JSONResponse(content=jsonable_encoder(result)).body
+
+
+def render_response_util(page: PageModel) -> bytes:
+    """
+    通过ResponseUtil.success生成响应体
+
+    :param page: 分页数据
+    :return: 响应体
+    """
+    return ResponseUtil.success(model_content=page).body
+
+
+def measure(render_func: Callable[[PageModel], bytes], page: PageModel) -> tuple[float, dict[str, Any]]:
+    """
+    多次生成响应体，统计中位耗时
+
+    :param render_func: 响应体生成函数
+    :param page: 分页数据
+    :return: 中位耗时（单位：毫秒）及去除响应时间后的响应内容
+    """
+    durations = []
+    for _ in range(REPEAT):
+        start_time = time.perf_counter()
+        body = render_func(page)
+        durations.append((time.perf_counter() - start_time) * 1000)
+    content = json.loads(body)
+    content.pop('time')
+    return statistics.median(durations), content
+
+
+def main() -> None:
+    print(f'行数：{ROW_COUNT}，重复次数：{REPEAT}')
+    for label, rows in (
+        ('6列（字符串/整数/时间/空值）', create_simple_rows()),
+        ('15列（含Decimal/日期/UUID/枚举）', create_mixed_rows()),
+    ):
+        page = PageModel(rows=rows, pageNum=1, pageSize=ROW_COUNT, total=ROW_COUNT, hasNext=False)
+        baseline_ms, baseline_content = measure(render_jsonable_encoder, page)
+        orjson_ms, orjson_content = measure(render_response_util, page)
+        print(
+            f'{label}：jsonable_encoder {baseline_ms:.0f}ms，ResponseUtil.success {orjson_ms:.0f}ms，'
+            f'内容是否一致：{baseline_content == orjson_content}'
+        )
+
+
+if __name__ == '__main__':
+    main()
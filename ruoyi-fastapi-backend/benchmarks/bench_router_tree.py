@@ -0,0 +1,178 @@
+"""
+路由树生成基准测试
+
+生成指定数量的目录及菜单数据，对比原先按层级递归遍历全部菜单并逐条转换为pydantic菜单树模型的实现，
+与TreeUtil.list_to_tree一次建立索引后自底向上生成路由的实现的耗时，并校验两者生成的路由信息一致。
+在后端根目录下执行：python -m benchmarks.bench_router_tree
+可通过环境变量BENCH_MENU_COUNT（菜单数，默认5000）、BENCH_DIR_COUNT（一级目录数，默认50）调整规模
+"""
+
+import os
+import time
+from typing import Any
+
+from pydantic import Field
+
+from common.constant import MenuConstant
+from module_admin.entity.do.menu_do import SysMenu
+from module_admin.entity.vo.login_vo import MetaModel, RouterModel
+from module_admin.entity.vo.menu_vo import MenuModel
+from module_admin.service.login_service import LoginService, RouterUtil
+from utils.common_util import CamelCaseUtil
+from utils.tree_util import TreeUtil
+
+MENU_COUNT = int(os.environ.get('BENCH_MENU_COUNT', '5000'))
+DIR_COUNT = int(os.environ.get('BENCH_DIR_COUNT', '50'))
+
+
+class MenuTreeModel(MenuModel):
+    children: list['MenuTreeModel'] | None = Field(default=None, description='子菜单')
+
+
+def create_menus() -> list[SysMenu]:
+    """
+    生成测试菜单数据，一级目录下各有一个二级目录，其余菜单平均分配到各二级目录下
+
+    :return: 按显示顺序排序的菜单列表
+    """
+    menus = []
+    for index in range(DIR_COUNT):
+        menus.append(
+            SysMenu(
+                menu_id=index + 1,
+                menu_name=f'目录{index}',
+                parent_id=0,
+                order_num=index,
+                path=f'dir{index}',
+                menu_type=MenuConstant.TYPE_DIR,
+                is_frame=1,
+                is_cache=0,
+                visible='0',
+                status='0',
+                icon='system',
+            )
+        )
+        menus.append(
+            SysMenu(
+                menu_id=DIR_COUNT + index + 1,
+                menu_name=f'子目录{index}',
+                parent_id=index + 1,
+                order_num=0,
+                path=f'sub{index}',
+                menu_type=MenuConstant.TYPE_DIR,
+                is_frame=1,
+                is_cache=0,
+                visible='0',
+                status='0',
+                icon='tree',
+            )
+        )
+    menus.extend(
+        SysMenu(
+            menu_id=DIR_COUNT * 2 + index + 1,
+            menu_name=f'菜单{index}',
+            parent_id=DIR_COUNT + index % DIR_COUNT + 1,
+            order_num=index,
+            path=f'menu{index}',
+            component=f'system/menu{index}/index',
+            menu_type=MenuConstant.TYPE_MENU,
+            is_frame=1,
+            is_cache=0,
+            visible='0',
+            status='0',
+            icon='user',
+        )
+        for index in range(MENU_COUNT - DIR_COUNT * 2)
+    )
+    return sorted(menus, key=lambda x: x.order_num)
+
+
+def generate_menus_recursive(pid: int, permission_list: list[SysMenu]) -> list[MenuTreeModel]:
+    """
+    原先的实现：每一层级都遍历全部菜单查找子菜单，并将每条菜单转换为pydantic菜单树模型
+
+    :param pid: 菜单id
+    :param permission_list: 菜单列表信息
+    :return: 菜单信息树形嵌套数据
+    """
+    menu_list = []
+    for permission in permission_list:
+        if permission.parent_id == pid:
+            children = generate_menus_recursive(permission.menu_id, permission_list)
+            menu_list_data = MenuTreeModel(**CamelCaseUtil.transform_result(permission))
+            if children:
+                menu_list_data.children = children
+            menu_list.append(menu_list_data)
+    return menu_list
+
+
+def generate_routers_recursive(permission_list: list[MenuTreeModel]) -> list[RouterModel]:
+    """
+    原先的实现：根据菜单树信息生成路由信息，仅保留测试数据涉及的目录及菜单分支
+
+    :param permission_list: 菜单树列表信息
+    :return: 路由信息树形嵌套数据
+    """
+    router_list = []
+    for permission in permission_list:
+        router = RouterModel(
+            hidden=permission.visible == '1',
+            name=RouterUtil.get_router_name(permission),
+            path=RouterUtil.get_router_path(permission),
+            component=RouterUtil.get_component(permission),
+            query=permission.query,
+            meta=MetaModel(
+                title=permission.menu_name,
+                icon=permission.icon,
+                noCache=permission.is_cache == 1,
+                link=permission.path if RouterUtil.is_http(permission.path) else None,
+            ),
+        )
+        if permission.children and permission.menu_type == MenuConstant.TYPE_DIR:
+            router.always_show = True
+            router.redirect = 'noRedirect'
+            router.children = generate_routers_recursive(permission.children)
+        router_list.append(router)
+    return router_list
+
+
+def build_routers_recursive(menus: list[SysMenu]) -> list[dict[str, Any]]:
+    """
+    使用原先的实现生成路由信息
+
+    :param menus: 菜单列表
+    :return: 路由信息
+    """
+    routers = generate_routers_recursive(generate_menus_recursive(0, menus))
+    return [router.model_dump(exclude_unset=True, by_alias=True) for router in routers]
+
+
+def build_routers_tree_util(menus: list[SysMenu]) -> list[dict[str, Any]]:
+    """
+    使用与LoginService.get_current_user_routers一致的方式生成路由信息
+
+    :param menus: 菜单列表
+    :return: 路由信息
+    """
+    routers = TreeUtil.list_to_tree(
+        menus, LoginService._LoginService__generate_user_router, 'menu_id', root_parent_id=0
+    )
+    return [router.model_dump(exclude_unset=True, by_alias=True) for router in routers]
+
+
+def main() -> None:
+    menus = create_menus()
+    print(f'菜单数：{len(menus)}，一级目录数：{DIR_COUNT}')
+    results = {}
+    for label, func in (
+        ('按层级递归生成', build_routers_recursive),
+        ('TreeUtil.list_to_tree生成', build_routers_tree_util),
+    ):
+        start_time = time.perf_counter()
+        results[label] = func(menus)
+        print(f'{label}：耗时{(time.perf_counter() - start_time) * 1000:.0f}ms')
+    print(f'生成结果是否一致：{len(set(map(repr, results.values()))) == 1}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+查询结果行转换基准测试
+
+在内存sqlite数据库中写入指定数量的操作日志，分别以ORM实体及列的形式查询后，对比原先逐行逐个值判断类型并逐个转换键名的实现，
+与当前通过缓存的键名映射及按结果集批量转换的实现将查询结果转换为小驼峰字典列表的耗时，并校验两者转换结果一致。
+在后端根目录下执行：python -m benchmarks.bench_row_serialize
+可通过环境变量BENCH_ROW_COUNT（行数，默认50000）及BENCH_REPEAT（重复次数，默认5）调整规模
+"""
+
+import os
+import statistics
+import time
+from collections.abc import Callable, Sequence
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import Row, Select, create_engine, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.collections import InstrumentedList
+
+from config.database import Base
+from module_admin.entity.do.log_do import SysOperLog
+from utils.common_util import SqlalchemyUtil
+from utils.page_util import PageUtil
+
+ROW_COUNT = int(os.environ.get('BENCH_ROW_COUNT', '50000'))
+REPEAT = int(os.environ.get('BENCH_REPEAT', '5'))
+
+
+def snake_to_camel_legacy(snake_str: str) -> str:
+    """
+    原先的实现：每次调用都重新分割并拼接字符串
+
+    :param snake_str: 下划线形式字符串
+    :return: 小驼峰形式字符串
+    """
+    words = snake_str.split('_')
+    return words[0] + ''.join(word.capitalize() for word in words[1:])
+
+
+def serialize_legacy(result: Any) -> Any:
+    """
+    原先的实现：逐行判断结果类型，ORM实体复制__dict__并检查每个值是否为关联列表，再逐个转换键名
+
+    :param result: 查询结果
+    :return: 小驼峰形式的转换结果
+    """
+    if isinstance(result, list):
+        return [serialize_legacy(row) for row in result]
+    if isinstance(result, Base):
+        base_dict = result.__dict__.copy()
+        base_dict.pop('_sa_instance_state', None)
+        for name, value in base_dict.items():
+            if isinstance(value, InstrumentedList):
+                base_dict[name] = serialize_legacy(value)
+        return {snake_to_camel_legacy(k): v for k, v in base_dict.items()}
+    if isinstance(result, Row):
+        if any(isinstance(row, Base) for row in result):
+            return [serialize_legacy(row) for row in result]
+        return {snake_to_camel_legacy(k): v for k, v in result._asdict().items()}
+    return result
+
+
+def create_session() -> Session:
+    """
+    创建内存sqlite数据库会话并写入操作日志数据
+
+    :return: 数据库会话
+    """
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine, tables=[SysOperLog.__table__])
+    session = Session(engine)
+    now = datetime.now()
+    session.execute(
+        insert(SysOperLog),
+        [
+            {
+                'oper_id': index + 1,
+                'title': '用户管理',
+                'business_type': index % 4,
+                'method': 'module_admin.controller.user_controller.add_system_user()',
+                'request_method': 'POST',
+                'operator_type': 1,
+                'oper_name': 'admin',
+                'dept_name': '研发部门',
+                'oper_url': '/system/user',
+                'oper_ip': '127.0.0.1',
+                'oper_location': '内网IP',
+                'oper_param': '{"userName": "test"}',
+                'json_result': '{"code": 200}',
+                'status': 0,
+                'error_msg': '',
+                'oper_time': now - timedelta(seconds=index),
+                'cost_time': index % 100,
+            }
+            for index in range(ROW_COUNT)
+        ],
+    )
+    return session
+
+
+def measure(convert_func: Callable[[], list[Any]]) -> tuple[float, list[Any]]:
+    """
+    多次执行转换函数，统计中位耗时
+
+    :param convert_func: 转换函数
+    :return: 中位耗时（单位：毫秒）及转换结果
+    """
+    durations = []
+    for _ in range(REPEAT):
+        start_time = time.perf_counter()
+        result = convert_func()
+        durations.append((time.perf_counter() - start_time) * 1000)
+    return statistics.median(durations), result
+
+
+def run_case(label: str, query: Select, rows: Sequence[Row]) -> None:
+    """
+    对比同一查询结果在两种实现下的转换耗时
+
+    :param label: 测试场景名称
+    :param query: 查询语句
+    :param rows: 查询结果行
+    :return:
+    """
+    legacy_ms, legacy_result = measure(lambda: serialize_legacy([row[0] if len(row) == 1 else row for row in rows]))
+    current_ms, current_result = measure(lambda: PageUtil.transform_rows(query, rows))
+    print(
+        f'{label}：原先的实现{legacy_ms:.1f}ms，当前实现{current_ms:.1f}ms，'
+        f'转换结果是否一致：{legacy_result == current_result}'
+    )
+
+
+def main() -> None:
+    session = create_session()
+    print(f'行数：{ROW_COUNT}，重复次数：{REPEAT}')
+    entity_query = select(SysOperLog)
+    run_case('ORM实体查询', entity_query, session.execute(entity_query).all())
+    column_query = select(*SqlalchemyUtil.get_model_columns(SysOperLog))
+    run_case('列查询', column_query, session.execute(column_query).all())
+    session.close()
+
+
+if __name__ == '__main__':
+    main()
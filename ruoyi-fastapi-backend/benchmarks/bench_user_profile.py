@@ -0,0 +1,235 @@
+"""
+用户信息查询基准测试
+
+在配置的数据库中写入10000个菜单、1000个角色的测试数据（全部在同一事务中写入，测试结束后回滚，不会保留），
+对比原先依次执行的5次查询（用户、部门、角色、岗位、菜单）与UserDao.get_user_by_id单次聚合查询的耗时及执行的SQL语句数。
+需要可连接的MySQL或PostgreSQL数据库，在后端根目录下执行：python -m benchmarks.bench_user_profile --env=dev
+可通过环境变量BENCH_MENU_COUNT（菜单数，默认10000）、BENCH_ROLE_COUNT（角色数，默认1000）及BENCH_ITERATIONS（查询次数，默认50）调整规模
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import and_, event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.database import AsyncSessionLocal, async_engine
+from module_admin.dao.user_dao import UserDao
+from module_admin.entity.do.dept_do import SysDept
+from module_admin.entity.do.menu_do import SysMenu
+from module_admin.entity.do.post_do import SysPost
+from module_admin.entity.do.role_do import SysRole, SysRoleMenu
+from module_admin.entity.do.user_do import SysUser, SysUserPost, SysUserRole
+
+MENU_COUNT = int(os.environ.get('BENCH_MENU_COUNT', '10000'))
+ROLE_COUNT = int(os.environ.get('BENCH_ROLE_COUNT', '1000'))
+ITERATIONS = int(os.environ.get('BENCH_ITERATIONS', '50'))
+# 测试数据的起始id，避免与已有数据冲突
+ID_BASE = 900_000_000
+BENCH_USER_ID = ID_BASE
+
+
+async def create_fixture(db: AsyncSession) -> None:
+    """
+    写入测试用户及其关联的角色、菜单数据，每个角色关联MENU_COUNT/ROLE_COUNT个菜单
+
+    :param db: orm对象
+    :return:
+    """
+    await db.execute(
+        insert(SysMenu),
+        [
+            {
+                'menu_id': ID_BASE + index,
+                'menu_name': f'bench_menu_{index}',
+                'parent_id': 0,
+                'order_num': index,
+                'menu_type': 'F',
+                'perms': f'bench:menu:{index}',
+                'status': '0',
+            }
+            for index in range(MENU_COUNT)
+        ],
+    )
+    await db.execute(
+        insert(SysRole),
+        [
+            {
+                'role_id': ID_BASE + index,
+                'role_name': f'bench_role_{index}',
+                'role_key': f'bench_role_{index}',
+                'role_sort': index,
+                'status': '0',
+                'del_flag': '0',
+            }
+            for index in range(ROLE_COUNT)
+        ],
+    )
+    menus_per_role = max(MENU_COUNT // ROLE_COUNT, 1)
+    await db.execute(
+        insert(SysRoleMenu),
+        [
+            {'role_id': ID_BASE + index, 'menu_id': ID_BASE + (index * menus_per_role + offset) % MENU_COUNT}
+            for index in range(ROLE_COUNT)
+            for offset in range(menus_per_role)
+        ],
+    )
+    await db.execute(
+        insert(SysUser),
+        [
+            {
+                'user_id': BENCH_USER_ID,
+                'user_name': 'bench_user',
+                'nick_name': 'bench_user',
+                'status': '0',
+                'del_flag': '0',
+            }
+        ],
+    )
+    await db.execute(
+        insert(SysUserRole), [{'user_id': BENCH_USER_ID, 'role_id': ID_BASE + index} for index in range(ROLE_COUNT)]
+    )
+
+
+async def get_user_by_id_sequential(db: AsyncSession, user_id: int) -> dict[str, Any]:
+    """
+    原先的实现：依次查询用户、部门、角色、岗位及菜单信息
+
+    :param db: orm对象
+    :param user_id: 用户id
+    :return: 用户信息
+    """
+    user_filter = (SysUser.status == '0', SysUser.del_flag == '0', SysUser.user_id == user_id)
+    user_basic_info = (await db.execute(select(SysUser).where(*user_filter).distinct())).scalars().first()
+    user_dept_info = (
+        (
+            await db.execute(
+                select(SysDept)
+                .select_from(SysUser)
+                .where(*user_filter)
+                .join(SysDept, and_(SysUser.dept_id == SysDept.dept_id, SysDept.status == '0', SysDept.del_flag == '0'))
+                .distinct()
+            )
+        )
+        .scalars()
+        .first()
+    )
+    user_role_info = (
+        (
+            await db.execute(
+                select(SysRole)
+                .select_from(SysUser)
+                .where(*user_filter)
+                .join(SysUserRole, SysUser.user_id == SysUserRole.user_id, isouter=True)
+                .join(
+                    SysRole,
+                    and_(SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'),
+                )
+                .distinct()
+            )
+        )
+        .scalars()
+        .all()
+    )
+    user_post_info = (
+        (
+            await db.execute(
+                select(SysPost)
+                .select_from(SysUser)
+                .where(*user_filter)
+                .join(SysUserPost, SysUser.user_id == SysUserPost.user_id, isouter=True)
+                .join(SysPost, and_(SysUserPost.post_id == SysPost.post_id, SysPost.status == '0'))
+                .distinct()
+            )
+        )
+        .scalars()
+        .all()
+    )
+    user_menu_info = (
+        (
+            await db.execute(
+                select(SysMenu)
+                .select_from(SysUser)
+                .where(*user_filter)
+                .join(SysUserRole, SysUser.user_id == SysUserRole.user_id, isouter=True)
+                .join(
+                    SysRole,
+                    and_(SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'),
+                    isouter=True,
+                )
+                .join(SysRoleMenu, SysRole.role_id == SysRoleMenu.role_id, isouter=True)
+                .join(SysMenu, and_(SysRoleMenu.menu_id == SysMenu.menu_id, SysMenu.status == '0'))
+                .order_by(SysMenu.order_num)
+                .distinct()
+            )
+        )
+        .scalars()
+        .all()
+    )
+    return {
+        'user_basic_info': user_basic_info,
+        'user_dept_info': user_dept_info,
+        'user_role_info': user_role_info,
+        'user_post_info': user_post_info,
+        'user_permission_info': [menu.perms for menu in user_menu_info if menu.perms],
+    }
+
+
+async def measure(
+    db: AsyncSession, func: Callable[[AsyncSession, int], Awaitable[dict[str, Any]]], user_id: int
+) -> dict[str, float]:
+    """
+    多次执行查询函数，统计耗时及每次执行的SQL语句数
+
+    :param db: orm对象
+    :param func: 查询函数
+    :param user_id: 用户id
+    :return: 耗时统计（单位：毫秒）及SQL语句数
+    """
+    statement_count = 0
+
+    def count_statement(*args: Any) -> None:
+        nonlocal statement_count
+        statement_count += 1
+
+    durations = []
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', count_statement)
+    try:
+        for _ in range(ITERATIONS):
+            start_time = time.perf_counter()
+            result = await func(db, user_id)
+            durations.append((time.perf_counter() - start_time) * 1000)
+            # 清空会话中的对象，避免后续查询直接复用已加载的对象
+            db.expunge_all()
+    finally:
+        event.remove(async_engine.sync_engine, 'before_cursor_execute', count_statement)
+    return {
+        'median_ms': statistics.median(durations),
+        'statements': statement_count / ITERATIONS,
+        'roles': len(result['user_role_info']),
+        'permissions': len(set(result['user_permission_info'])),
+    }
+
+
+async def main() -> None:
+    print(f'菜单数：{MENU_COUNT}，角色数：{ROLE_COUNT}，查询次数：{ITERATIONS}')
+    async with AsyncSessionLocal() as db:
+        try:
+            await create_fixture(db)
+            for label, func in (('依次查询', get_user_by_id_sequential), ('单次聚合查询', UserDao.get_user_by_id)):
+                result = await measure(db, func, BENCH_USER_ID)
+                print(
+                    f'{label}：中位耗时{result["median_ms"]:.1f}ms，每次执行{result["statements"]:.0f}条SQL，'
+                    f'角色{result["roles"]}个，权限标识{result["permissions"]}个'
+                )
+        finally:
+            await db.rollback()
+    await async_engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,34 @@
+import argparse
+import os
+
+from config.env import AppConfig
+from utils.ip_location_util import IpRangeDatabase
+from utils.log_util import logger
+
+
+def build_ip_db(csv_path: str, output_path: str) -> None:
+    """
+    将``起始IP,结束IP,归属区域``格式的csv文件转换为本地IP库文件，如python build_ip_db.py --csv=ip.csv，
+    默认写入APP_IP_LOCATION_DB_PATH配置的路径，可通过--output参数指定输出路径，通过--env参数指定运行环境
+
+    :param csv_path: csv文件路径
+    :param output_path: 本地IP库文件路径
+    :return:
+    """
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    # 先写入临时文件再替换，避免运行中的应用读取到未写完的文件
+    temp_path = f'{output_path}.tmp'
+    range_count = IpRangeDatabase.build_from_csv(csv_path, temp_path)
+    os.replace(temp_path, output_path)
+    logger.info(f'✅️ 本地IP库生成成功，共{range_count}个IP段，已写入{output_path}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='生成本地IP库')
+    parser.add_argument('--csv', type=str, required=True, help='起始IP,结束IP,归属区域格式的csv文件路径')
+    parser.add_argument('--output', type=str, default=AppConfig.app_ip_location_db_path, help='本地IP库文件路径')
+    parser.add_argument('--env', type=str, default='', help='运行环境')
+    args = parser.parse_args()
+    build_ip_db(args.csv, args.output)
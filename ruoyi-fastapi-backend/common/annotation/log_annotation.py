@@ -6,11 +6,8 @@ from datetime import datetime
 from functools import wraps
 from typing import Any, Literal, TypeVar
 
-import httpx
-from async_lru import alru_cache
 from fastapi import Request
 from fastapi.responses import JSONResponse, ORJSONResponse, UJSONResponse
-from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.status import HTTP_200_OK
 from typing_extensions import ParamSpec
 from user_agents import parse
@@ -18,10 +15,11 @@ from user_agents import parse
 from common.context import RequestContext
 from common.enums import BusinessType
 from config.env import AppConfig
+from config.get_log_writer import LogWriterUtil
 from exceptions.exception import LoginException, ServiceException, ServiceWarning
 from module_admin.entity.vo.log_vo import LogininforModel, OperLogModel
-from module_admin.service.log_service import LoginLogService, OperationLogService
 from utils.dependency_util import DependencyUtil
+from utils.ip_location_util import IpLocationUtil
 from utils.log_util import logger
 from utils.response_util import ResponseUtil
 
@@ -63,8 +61,6 @@ class Log:
             request_name_list = get_function_parameters_name_by_type(func, Request)
             request = get_function_parameters_value_by_name(func, request_name_list[0], *args, **kwargs)
             DependencyUtil.check_exclude_routes(request, err_msg='当前路由不在认证规则内，不可使用Log装饰器')
-            session_name_list = get_function_parameters_name_by_type(func, AsyncSession)
-            query_db = get_function_parameters_value_by_name(func, session_name_list[0], *args, **kwargs)
             request_method = request.method
             user_agent = request.headers.get('User-Agent')
             # 获取操作类型
@@ -122,7 +118,7 @@ class Log:
                         }
                     )
 
-                    await LoginLogService.add_login_log_services(query_db, LogininforModel(**login_log))
+                    await LogWriterUtil.add_login_log(LogininforModel(**login_log))
             else:
                 current_user = RequestContext.get_current_user()
                 oper_name = current_user.user.user_name
@@ -145,7 +141,7 @@ class Log:
                     operTime=oper_time,
                     costTime=int(cost_time),
                 )
-                await OperationLogService.add_operation_log_services(query_db, operation_log)
+                await LogWriterUtil.add_operation_log(operation_log)
 
             return result
 
@@ -191,7 +187,7 @@ class Log:
         """
         oper_location = '内网IP'
         if AppConfig.app_ip_location_query:
-            oper_location = await get_ip_location(oper_ip)
+            oper_location = await IpLocationUtil.get_ip_location(oper_ip)
 
         return oper_location
 
@@ -346,31 +342,6 @@ class Log:
         return result_dict
 
 
-@alru_cache()
-async def get_ip_location(oper_ip: str) -> str:
-    """
-    查询ip归属区域
-
-    :param oper_ip: 需要查询的ip
-    :return: ip归属区域
-    """
-    oper_location = '内网IP'
-    try:
-        if oper_ip not in ['127.0.0.1', 'localhost']:
-            oper_location = '未知'
-            async with httpx.AsyncClient() as client:
-                ip_result = await client.get(f'https://qifu-api.baidubce.com/ip/geo/v1/district?ip={oper_ip}')
-                if ip_result.status_code == HTTP_200_OK:
-                    prov = ip_result.json().get('data', {}).get('prov')
-                    city = ip_result.json().get('data', {}).get('city')
-                    if prov or city:
-                        oper_location = f'{prov}-{city}'
-    except Exception as e:
-        oper_location = '未知'
-        print(e)
-    return oper_location
-
-
 def get_function_parameters_name_by_type(func: Callable, param_type: Any) -> list:
     """
     获取函数指定类型的参数名称
@@ -1,16 +1,25 @@
+from typing import Annotated
+
 from fastapi import Depends, Request, params
-from sqlalchemy import ColumnElement, func, or_, select
+from sqlalchemy import ColumnElement, false, or_, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from common.aspect.db_seesion import DBSessionDependency
 from common.context import RequestContext
 from config.database import Base
-from module_admin.entity.do.dept_do import SysDept
+from module_admin.entity.do.dept_do import SysDeptClosure
 from module_admin.entity.do.role_do import SysRoleDept
+from module_admin.entity.vo.role_vo import RoleModel
+from module_admin.service.data_scope_service import DataScopeService
 from utils.dependency_util import DependencyUtil
 
 
 class GetDataScope:
     """
     获取当前用户数据权限对应的查询sql语句
+
+    超级管理员及拥有全部数据权限的用户直接返回恒真条件；其余用户的可见部门id列表经DataScopeService缓存后以绑定参数的IN列表输出，
+    可见部门数量过多时改用子查询。
     """
 
     DATA_SCOPE_ALL = '1'
@@ -36,64 +45,60 @@ class GetDataScope:
         self.user_alias = user_alias
         self.dept_alias = dept_alias
 
-    def __call__(self, request: Request) -> ColumnElement:
+    async def __call__(
+        self, request: Request, query_db: Annotated[AsyncSession, DBSessionDependency()]
+    ) -> ColumnElement:
         DependencyUtil.check_exclude_routes(request, err_msg='当前路由不在认证规则内，不可使用GetDataScope依赖项')
         current_user = RequestContext.get_current_user()
         user_id = current_user.user.user_id
         dept_id = current_user.user.dept_id
-        custom_data_scope_role_id_list = [
-            item.role_id for item in current_user.user.role if item.data_scope == self.DATA_SCOPE_CUSTOM
-        ]
+        role = current_user.user.role
+        data_scopes = {item.data_scope for item in role if item}
+        # 超级管理员及全部数据权限无需构建任何查询条件
+        if current_user.user.admin or self.DATA_SCOPE_ALL in data_scopes:
+            return true()
         param_sql_list = []
-        for role in current_user.user.role:
-            if current_user.user.admin or role.data_scope == self.DATA_SCOPE_ALL:
-                param_sql_list = [True]
-                break
-            if role.data_scope == self.DATA_SCOPE_CUSTOM:
-                if len(custom_data_scope_role_id_list) > 1:
-                    param_sql_list.append(
-                        getattr(self.query_alias, self.dept_alias).in_(
-                            select(SysRoleDept.dept_id).where(SysRoleDept.role_id.in_(custom_data_scope_role_id_list))
-                        )
-                        if hasattr(self.query_alias, self.dept_alias)
-                        else False
-                    )
-                else:
-                    param_sql_list.append(
-                        getattr(self.query_alias, self.dept_alias).in_(
-                            select(SysRoleDept.dept_id).where(SysRoleDept.role_id == role.role_id)
-                        )
-                        if hasattr(self.query_alias, self.dept_alias)
-                        else False
-                    )
-            elif role.data_scope == self.DATA_SCOPE_DEPT:
-                param_sql_list.append(
-                    getattr(self.query_alias, self.dept_alias) == dept_id
-                    if hasattr(self.query_alias, self.dept_alias)
-                    else False
-                )
-            elif role.data_scope == self.DATA_SCOPE_DEPT_AND_CHILD:
-                param_sql_list.append(
-                    getattr(self.query_alias, self.dept_alias).in_(
-                        select(SysDept.dept_id).where(
-                            or_(SysDept.dept_id == dept_id, func.find_in_set(dept_id, SysDept.ancestors))
-                        )
-                    )
-                    if hasattr(self.query_alias, self.dept_alias)
-                    else False
-                )
-            elif role.data_scope == self.DATA_SCOPE_SELF:
-                param_sql_list.append(
-                    getattr(self.query_alias, self.user_alias) == user_id
-                    if hasattr(self.query_alias, self.user_alias)
-                    else False
-                )
-            else:
-                param_sql_list.append(False)
-        param_sql_list = list(dict.fromkeys(param_sql_list))
-        param_sql = or_(*param_sql_list)
-
-        return param_sql
+        dept_column = getattr(self.query_alias, self.dept_alias, None) if self.dept_alias else None
+        if dept_column is not None and not data_scopes.isdisjoint(DataScopeService.DEPT_DATA_SCOPES):
+            dept_ids = await DataScopeService.get_data_scope_dept_ids_services(
+                request.app.state.redis, query_db, dept_id, role
+            )
+            if dept_ids is None:
+                param_sql_list.extend(self._get_dept_scope_sql(dept_column, dept_id, role))
+            elif dept_ids:
+                param_sql_list.append(dept_column.in_(dept_ids))
+        user_column = getattr(self.query_alias, self.user_alias, None) if self.user_alias else None
+        if user_column is not None and self.DATA_SCOPE_SELF in data_scopes:
+            param_sql_list.append(user_column == user_id)
+
+        return or_(false(), *param_sql_list)
+
+    def _get_dept_scope_sql(
+        self, dept_column: ColumnElement, dept_id: int | None, role: list[RoleModel | None]
+    ) -> list[ColumnElement]:
+        """
+        可见部门数量过多时，使用子查询构建部门数据权限对应的查询sql语句
+
+        :param dept_column: 所要查询表的部门id字段
+        :param dept_id: 用户所属部门id
+        :param role: 用户角色列表信息
+        :return: 部门数据权限对应的查询sql语句列表
+        """
+        data_scopes = {item.data_scope for item in role if item}
+        custom_role_ids = [item.role_id for item in role if item and item.data_scope == self.DATA_SCOPE_CUSTOM]
+        param_sql_list = []
+        if custom_role_ids:
+            param_sql_list.append(
+                dept_column.in_(select(SysRoleDept.dept_id).where(SysRoleDept.role_id.in_(custom_role_ids)))
+            )
+        if self.DATA_SCOPE_DEPT_AND_CHILD in data_scopes:
+            param_sql_list.append(
+                dept_column.in_(select(SysDeptClosure.descendant_id).where(SysDeptClosure.ancestor_id == dept_id))
+            )
+        elif self.DATA_SCOPE_DEPT in data_scopes:
+            param_sql_list.append(dept_column == dept_id)
+
+        return param_sql_list
 
 
 def DataScopeDependency(  # noqa: N802
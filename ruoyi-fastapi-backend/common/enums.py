@@ -43,9 +43,17 @@ class RedisInitKeyConfig(Enum):
         return self.value.get('remark')
 
     ACCESS_TOKEN = {'key': 'access_token', 'remark': '登录令牌信息'}
+    ONLINE_SESSION = {'key': 'online_session', 'remark': '在线用户会话信息'}
     SYS_DICT = {'key': 'sys_dict', 'remark': '数据字典'}
     SYS_CONFIG = {'key': 'sys_config', 'remark': '配置信息'}
     CAPTCHA_CODES = {'key': 'captcha_codes', 'remark': '图片验证码'}
     ACCOUNT_LOCK = {'key': 'account_lock', 'remark': '用户锁定'}
     PASSWORD_ERROR_COUNT = {'key': 'password_error_count', 'remark': '密码错误次数'}
     SMS_CODE = {'key': 'sms_code', 'remark': '短信验证码'}
+    USER_INFO = {'key': 'user_info', 'remark': '当前用户信息'}
+    USER_INFO_VERSION = {'key': 'user_info_version', 'remark': '当前用户信息版本'}
+    USER_IMPORT = {'key': 'user_import', 'remark': '用户导入进度'}
+    USER_ROUTERS = {'key': 'user_routers', 'remark': '用户路由信息'}
+    USER_ROUTERS_VERSION = {'key': 'user_routers_version', 'remark': '用户路由信息版本'}
+    DATA_SCOPE = {'key': 'data_scope', 'remark': '数据权限可见部门'}
+    DATA_SCOPE_VERSION = {'key': 'data_scope_version', 'remark': '数据权限可见部门版本'}
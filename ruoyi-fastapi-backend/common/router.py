@@ -1,8 +1,14 @@
+import glob
+import hashlib
 import importlib
+import json
 import os
 import sys
+import time
 from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from types import ModuleType
 from typing import Annotated, Any, Literal
 
 from annotated_doc import Doc
@@ -15,6 +21,9 @@ from starlette.routing import BaseRoute
 from starlette.types import ASGIApp, Lifespan
 from typing_extensions import deprecated
 
+from config.env import AppConfig
+from utils.log_util import logger
+
 
 class APIRouterPro(APIRouter):
     """
@@ -287,8 +296,15 @@ class APIRouterPro(APIRouter):
 class RouterRegister:
     """
     路由注册器，用于自动注册所有controller目录下的路由
+
+    存在未过期的路由清单时，按清单中的顺序仅导入清单列出的controller模块并直接获取其中的路由实例，无需遍历项目目录及扫描模块属性；
+    清单不存在或已过期（controller目录下的文件有增删，或文件大小、修改时间及内容哈希值与清单不一致）时回退为遍历项目目录。
+    路由清单可通过python generate_router_manifest.py --env=prod生成，新增包含controller目录的模块后需重新生成。
     """
 
+    manifest_file = 'router_manifest.json'
+    manifest_version = 1
+
     def __init__(self, app: FastAPI) -> None:
         """
         初始化路由注册器
@@ -298,13 +314,14 @@ class RouterRegister:
         self.app = app
         # 获取项目根目录
         self.project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        self.manifest_path = os.path.join(self.project_root, self.manifest_file)
         sys.path.insert(0, self.project_root)
 
     def _find_controller_files(self) -> list[str]:
         """
         查找所有controller目录下的py文件
 
-        :return: py文件路径列表
+        :return: 按路径排序的py文件路径列表
         """
         controller_files = []
         # 遍历所有目录，查找controller目录
@@ -316,7 +333,81 @@ class RouterRegister:
                     if file.endswith('.py') and not file.startswith('__'):
                         file_path = os.path.join(root, file)
                         controller_files.append(file_path)
-        return controller_files
+        # 排序后导入顺序不受文件系统遍历顺序影响
+        return sorted(controller_files)
+
+    def _get_module_name(self, file_path: str) -> str:
+        """
+        根据py文件路径计算模块路径
+
+        :param file_path: py文件路径
+        :return: 模块路径
+        """
+        relative_path = os.path.relpath(file_path, self.project_root)
+        return relative_path.replace(os.sep, '.')[:-3]
+
+    @staticmethod
+    def _get_module_routers(module: ModuleType) -> list[tuple[str, APIRouter]]:
+        """
+        遍历模块属性获取路由实例
+
+        :param module: 模块对象
+        :return: 路由实例列表
+        """
+        routers = []
+        # 遍历模块属性，寻找APIRouter和APIRouterPro实例
+        for attr_name in dir(module):
+            attr = getattr(module, attr_name)
+            # 对于APIRouterPro实例，只有当auto_register=True时才添加
+            if isinstance(attr, APIRouterPro):
+                if attr.auto_register:
+                    routers.append((attr_name, attr))
+            # 对于APIRouter实例，直接添加
+            elif isinstance(attr, APIRouter):
+                routers.append((attr_name, attr))
+        return routers
+
+    @staticmethod
+    def _timed_import(module_name: str) -> tuple[ModuleType | None, float, Exception | None]:
+        """
+        导入模块并统计导入耗时
+
+        :param module_name: 模块路径
+        :return: 模块对象、导入耗时（单位：秒）及导入异常
+        """
+        start_time = time.perf_counter()
+        try:
+            module = importlib.import_module(module_name)
+        except Exception as e:
+            return None, time.perf_counter() - start_time, e
+        return module, time.perf_counter() - start_time, None
+
+    def _import_modules(self, module_names: Sequence[str]) -> dict[str, ModuleType]:
+        """
+        按顺序导入模块，配置了导入线程数时先并行预热导入，导入失败的模块会被记录并跳过
+
+        :param module_names: 模块路径列表
+        :return: 模块路径与模块对象的映射
+        """
+        import_results: dict[str, tuple[ModuleType | None, float, Exception | None]] = {}
+        if AppConfig.app_router_import_workers > 1:
+            with ThreadPoolExecutor(
+                max_workers=AppConfig.app_router_import_workers, thread_name_prefix='router_import'
+            ) as executor:
+                import_results = dict(zip(module_names, executor.map(self._timed_import, module_names), strict=True))
+        modules = {}
+        for module_name in module_names:
+            module, cost_time, error = import_results.get(module_name) or (None, 0.0, None)
+            if module is None:
+                # 未预热或预热时导入失败（如并发导入存在循环依赖）的模块按顺序重新导入
+                module, retry_cost_time, error = self._timed_import(module_name)
+                cost_time += retry_cost_time
+            if error is not None:
+                logger.error(f'❌️ 导入模块{module_name}失败，耗时{cost_time * 1000:.1f}ms，详细错误信息：{error}')
+                continue
+            logger.debug(f'导入模块{module_name}耗时{cost_time * 1000:.1f}ms')
+            modules[module_name] = module
+        return modules
 
     def _import_module_and_get_routers(self, controller_files: list[str]) -> list[tuple[str, APIRouter]]:
         """
@@ -326,26 +417,151 @@ class RouterRegister:
         :return: 路由实例列表
         """
         routers = []
+        modules = self._import_modules([self._get_module_name(file_path) for file_path in controller_files])
+        for module in modules.values():
+            routers.extend(self._get_module_routers(module))
+        return routers
+
+    @staticmethod
+    def _get_file_hash(file_path: str) -> str:
+        """
+        计算文件内容的sha256哈希值
+
+        :param file_path: 文件路径
+        :return: 哈希值
+        """
+        with open(file_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    @staticmethod
+    def _list_controller_dir(controller_dir: str) -> list[str]:
+        """
+        获取controller目录下需要导入的py文件名
+
+        :param controller_dir: controller目录路径
+        :return: 排序后的py文件名列表
+        """
+        return sorted(file for file in os.listdir(controller_dir) if file.endswith('.py') and not file.startswith('__'))
+
+    def build_manifest(self) -> dict[str, Any]:
+        """
+        遍历项目目录并导入全部controller模块，生成路由清单，存在导入失败的模块时不生成清单，避免缺少路由的清单被视为未过期
+
+        :return: 路由清单
+        """
+        controller_files = self._find_controller_files()
+        controller_dirs = sorted({os.path.dirname(file_path) for file_path in controller_files})
+        module_names = [self._get_module_name(file_path) for file_path in controller_files]
+        modules = self._import_modules(module_names)
+        failed_module_names = [module_name for module_name in module_names if module_name not in modules]
+        if failed_module_names:
+            raise ImportError(f'以下模块导入失败，未生成路由清单：{", ".join(failed_module_names)}')
+        module_entries = []
         for file_path in controller_files:
-            # 计算模块路径
-            relative_path = os.path.relpath(file_path, self.project_root)
-            module_name = relative_path.replace(os.sep, '.')[:-3]
-
-            try:
-                # 动态导入模块
-                module = importlib.import_module(module_name)
-                # 遍历模块属性，寻找APIRouter和APIRouterPro实例
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    # 对于APIRouterPro实例，只有当auto_register=True时才添加
-                    if isinstance(attr, APIRouterPro):
-                        if attr.auto_register:
-                            routers.append((attr_name, attr))
-                    # 对于APIRouter实例，直接添加
-                    elif isinstance(attr, APIRouter):
-                        routers.append((attr_name, attr))
-            except Exception as e:
-                print(f'Error importing module {module_name}: {e}')
+            module_name = self._get_module_name(file_path)
+            file_stat = os.stat(file_path)
+            module_entries.append(
+                {
+                    'module': module_name,
+                    'file': os.path.relpath(file_path, self.project_root),
+                    'size': file_stat.st_size,
+                    'mtime_ns': file_stat.st_mtime_ns,
+                    'sha256': self._get_file_hash(file_path),
+                    'routers': [attr_name for attr_name, _router in self._get_module_routers(modules[module_name])],
+                }
+            )
+        return {
+            'version': self.manifest_version,
+            'controller_dirs': [
+                {
+                    'dir': os.path.relpath(controller_dir, self.project_root),
+                    'files': self._list_controller_dir(controller_dir),
+                }
+                for controller_dir in controller_dirs
+            ],
+            'modules': module_entries,
+        }
+
+    def write_manifest(self) -> dict[str, Any]:
+        """
+        生成路由清单并写入项目根目录
+
+        :return: 路由清单
+        """
+        manifest = self.build_manifest()
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return manifest
+
+    def _is_manifest_module_stale(self, module_entry: dict[str, Any]) -> bool:
+        """
+        判断清单中的模块文件是否已变更，大小及修改时间一致时视为未变更，否则比较文件内容哈希值
+
+        :param module_entry: 清单中的模块信息
+        :return: 是否已变更
+        """
+        file_path = os.path.join(self.project_root, module_entry['file'])
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return True
+        if file_stat.st_size == module_entry['size'] and file_stat.st_mtime_ns == module_entry['mtime_ns']:
+            return False
+        # 复制到容器等场景下修改时间会变化，内容哈希值一致时仍视为未变更
+        return file_stat.st_size != module_entry['size'] or self._get_file_hash(file_path) != module_entry['sha256']
+
+    def _load_manifest(self) -> dict[str, Any] | None:
+        """
+        读取路由清单并检查是否过期，清单记录的controller目录下文件有增删、模块文件有变更，
+        或项目根目录下新增了包含py文件的一级模块controller目录（如module_xxx/controller）时视为过期
+
+        :return: 未过期的路由清单，清单不存在、无法解析或已过期时返回None
+        """
+        if not AppConfig.app_router_manifest or not os.path.isfile(self.manifest_path):
+            return None
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != self.manifest_version:
+                logger.warning('⚠️ 路由清单版本不一致，已改为遍历项目目录注册路由')
+                return None
+            # 新增的模块目录不在清单记录的目录中，需额外检查项目根目录下一级模块的controller目录
+            manifest_dirs = {os.path.normpath(dir_entry['dir']) for dir_entry in manifest['controller_dirs']}
+            for controller_dir in glob.glob(os.path.join(self.project_root, '*', 'controller')):
+                relative_dir = os.path.relpath(controller_dir, self.project_root)
+                if relative_dir not in manifest_dirs and self._list_controller_dir(controller_dir):
+                    logger.warning(f'⚠️ 路由清单已过期（新增了{relative_dir}目录），已改为遍历项目目录注册路由')
+                    return None
+            for dir_entry in manifest['controller_dirs']:
+                controller_dir = os.path.join(self.project_root, dir_entry['dir'])
+                if self._list_controller_dir(controller_dir) != dir_entry['files']:
+                    logger.warning(
+                        f'⚠️ 路由清单已过期（{dir_entry["dir"]}目录下的文件有增删），已改为遍历项目目录注册路由'
+                    )
+                    return None
+            for module_entry in manifest['modules']:
+                if self._is_manifest_module_stale(module_entry):
+                    logger.warning(f'⚠️ 路由清单已过期（{module_entry["file"]}已变更），已改为遍历项目目录注册路由')
+                    return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f'⚠️ 路由清单读取失败，已改为遍历项目目录注册路由，详细错误信息：{e}')
+            return None
+        return manifest
+
+    def _get_routers_from_manifest(self, manifest: dict[str, Any]) -> list[tuple[str, APIRouter]]:
+        """
+        按路由清单导入模块并获取路由实例
+
+        :param manifest: 路由清单
+        :return: 路由实例列表
+        """
+        routers = []
+        modules = self._import_modules([module_entry['module'] for module_entry in manifest['modules']])
+        for module_entry in manifest['modules']:
+            module = modules.get(module_entry['module'])
+            if module is None:
+                continue
+            routers.extend((attr_name, getattr(module, attr_name)) for attr_name in module_entry['routers'])
         return routers
 
     def _sort_routers(self, routers: list[tuple[str, APIRouter]]) -> list[tuple[str, APIRouter]]:
@@ -383,14 +599,24 @@ class RouterRegister:
 
         :return: None
         """
-        # 查找所有controller目录下的py文件
-        controller_files = self._find_controller_files()
-        # 导入模块并获取路由实例
-        routers = self._import_module_and_get_routers(controller_files)
+        start_time = time.perf_counter()
+        manifest = self._load_manifest()
+        if manifest is not None:
+            # 按路由清单导入模块并获取路由实例
+            routers = self._get_routers_from_manifest(manifest)
+        else:
+            # 查找所有controller目录下的py文件
+            controller_files = self._find_controller_files()
+            # 导入模块并获取路由实例
+            routers = self._import_module_and_get_routers(controller_files)
         # 按规则排序路由
         sorted_routers = self._sort_routers(routers)
         # 注册路由到FastAPI应用
         self._register_routers_to_app(sorted_routers)
+        logger.info(
+            f'🧭 路由注册完成，共注册{len(sorted_routers)}个路由，耗时{(time.perf_counter() - start_time) * 1000:.1f}ms'
+            f'（{"使用路由清单" if manifest is not None else "遍历项目目录"}）'
+        )
 
 
 def auto_register_routers(app: FastAPI) -> None:
@@ -22,7 +22,19 @@ class AppSettings(BaseSettings):
     app_version: str = '1.0.0'
     app_reload: bool = True
     app_ip_location_query: bool = True
+    app_ip_location_db_path: str = 'assets/ip/ip_location.db'
+    app_ip_location_remote_fallback: bool = True
+    app_ip_location_remote_timeout: float = 3
+    app_ip_location_cache_size: int = 10000
+    app_ip_location_cache_ttl: int = 86400
+    app_ip_location_unknown_cache_ttl: int = 300
     app_same_time_login: bool = True
+    app_password_hash_rounds: int = 12
+    app_password_hash_workers: int = 4
+    app_router_manifest: bool = True
+    app_router_import_workers: int = 0
+    app_monitor_sample_interval: float = 5
+    app_monitor_history_size: int = 720
 
 
 class JwtSettings(BaseSettings):
@@ -73,6 +85,19 @@ class RedisSettings(BaseSettings):
     redis_database: int = 2
 
 
+class LogSettings(BaseSettings):
+    """
+    日志写入配置
+    """
+
+    log_queue_max_size: int = 10000
+    log_batch_size: int = 200
+    log_flush_interval: int = 1000
+    log_put_timeout: int = 50
+    log_spill_path: str = 'vf_admin/log_spill_path'
+    log_job_events: str = 'EVENT_ALL'
+
+
 class GenSettings:
     """
     代码生成配置
@@ -99,6 +124,8 @@ class UploadSettings:
     UPLOAD_PREFIX = '/profile'
     UPLOAD_PATH = 'vf_admin/upload_path'
     UPLOAD_MACHINE = 'A'
+    # 上传文件内容寻址存储目录，需与UPLOAD_PATH位于同一文件系统以便创建硬链接
+    UPLOAD_STORE_PATH = 'vf_admin/upload_store'
     DEFAULT_ALLOWED_EXTENSION = [
         # 图片
         'bmp',
@@ -135,6 +162,8 @@ class UploadSettings:
             os.makedirs(self.UPLOAD_PATH)
         if not os.path.exists(self.DOWNLOAD_PATH):
             os.makedirs(self.DOWNLOAD_PATH)
+        if not os.path.exists(self.UPLOAD_STORE_PATH):
+            os.makedirs(self.UPLOAD_STORE_PATH)
 
 
 class CachePathConfig:
@@ -182,6 +211,13 @@ class GetConfig:
         # 实例化Redis配置模型
         return RedisSettings()
 
+    def get_log_config(self) -> LogSettings:
+        """
+        获取日志写入配置
+        """
+        # 实例化日志写入配置模型
+        return LogSettings()
+
     def get_gen_config(self) -> GenSettings:
         """
         获取代码生成配置
@@ -216,8 +252,8 @@ class GetConfig:
             # 使用argparse定义命令行参数
             parser = argparse.ArgumentParser(description='命令行参数')
             parser.add_argument('--env', type=str, default='', help='运行环境')
-            # 解析命令行参数
-            args = parser.parse_args()
+            # 解析命令行参数，忽略脚本自定义的其他参数
+            args, _ = parser.parse_known_args()
             # 设置环境变量，如果未设置命令行参数，默认APP_ENV为dev
             os.environ['APP_ENV'] = args.env if args.env else 'dev'
         # 读取运行环境
@@ -241,6 +277,8 @@ JwtConfig = get_config.get_jwt_config()
 DataBaseConfig = get_config.get_database_config()
 # Redis配置
 RedisConfig = get_config.get_redis_config()
+# 日志写入配置
+LogConfig = get_config.get_log_config()
 # 代码生成配置
 GenConfig = get_config.get_gen_config()
 # 上传配置
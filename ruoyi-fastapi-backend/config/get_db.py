@@ -3,6 +3,8 @@ from collections.abc import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.database import AsyncSessionLocal, Base, async_engine
+from module_admin.service.dept_service import DeptService
+from module_ai.service.ai_chat_service import AiChatService
 from utils.log_util import logger
 
 
@@ -26,3 +28,25 @@ async def init_create_table() -> None:
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     logger.info('✅️ 数据库连接成功')
+
+
+async def init_dept_closure() -> None:
+    """
+    应用启动时部门闭包表为空则根据部门表回填
+
+    :return:
+    """
+    async with AsyncSessionLocal() as session:
+        await DeptService.init_dept_closure_services(session)
+
+
+async def init_ai_chat_session_index() -> None:
+    """
+    应用启动时AI对话会话索引为空则根据已存储的会话回填
+
+    :return:
+    """
+    async with AsyncSessionLocal() as session:
+        count = await AiChatService.init_chat_session_index_services(session)
+    if count:
+        logger.info(f'✅️ 已回填{count}条AI对话会话索引')
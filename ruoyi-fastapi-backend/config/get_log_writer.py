@@ -0,0 +1,117 @@
+from collections.abc import Awaitable, Callable
+
+from pydantic import BaseModel
+
+from config.database import AsyncSessionLocal
+from config.env import LogConfig
+from module_admin.entity.vo.job_vo import JobLogModel
+from module_admin.entity.vo.log_vo import LogininforModel, OperLogModel
+from module_admin.service.job_log_service import JobLogService
+from module_admin.service.log_service import LoginLogService, OperationLogService
+from utils.batch_writer_util import BatchWriter
+from utils.log_util import logger
+
+
+async def _flush_operation_log(operation_log_list: list[OperLogModel]) -> None:
+    async with AsyncSessionLocal() as session:
+        await OperationLogService.add_operation_log_batch_services(session, operation_log_list)
+
+
+async def _flush_login_log(login_log_list: list[LogininforModel]) -> None:
+    async with AsyncSessionLocal() as session:
+        await LoginLogService.add_login_log_batch_services(session, login_log_list)
+
+
+async def _flush_job_log(job_log_list: list[JobLogModel]) -> None:
+    async with AsyncSessionLocal() as session:
+        await JobLogService.add_job_log_batch_services(session, job_log_list)
+
+
+def _create_writer(name: str, model: type[BaseModel], flush_func: Callable[[list], Awaitable[None]]) -> BatchWriter:
+    return BatchWriter(
+        name=name,
+        model=model,
+        flush_func=flush_func,
+        max_size=LogConfig.log_queue_max_size,
+        batch_size=LogConfig.log_batch_size,
+        flush_interval=LogConfig.log_flush_interval,
+        put_timeout=LogConfig.log_put_timeout,
+        spill_path=LogConfig.log_spill_path,
+    )
+
+
+operation_log_writer = _create_writer('oper_log', OperLogModel, _flush_operation_log)
+login_log_writer = _create_writer('login_log', LogininforModel, _flush_login_log)
+job_log_writer = _create_writer('job_log', JobLogModel, _flush_job_log)
+
+
+class LogWriterUtil:
+    """
+    日志批量写入相关方法
+    """
+
+    @classmethod
+    async def init_log_writer(cls) -> None:
+        """
+        应用启动时启动日志批量写入任务
+
+        :return:
+        """
+        operation_log_writer.start()
+        login_log_writer.start()
+        job_log_writer.start()
+        logger.info('✅️ 日志批量写入任务启动成功')
+
+    @classmethod
+    async def close_log_writer(cls) -> None:
+        """
+        应用关闭时将队列中剩余的日志全部写入并停止日志批量写入任务
+
+        :return:
+        """
+        await operation_log_writer.close()
+        await login_log_writer.close()
+        await job_log_writer.close()
+        logger.info(f'✅️ 关闭日志批量写入任务成功，统计信息：{cls.get_log_writer_stats()}')
+
+    @classmethod
+    async def add_operation_log(cls, operation_log: OperLogModel) -> bool:
+        """
+        将操作日志放入批量写入队列
+
+        :param operation_log: 操作日志对象
+        :return: 是否成功放入队列
+        """
+        return await operation_log_writer.put(operation_log)
+
+    @classmethod
+    async def add_login_log(cls, login_log: LogininforModel) -> bool:
+        """
+        将登录日志放入批量写入队列
+
+        :param login_log: 登录日志对象
+        :return: 是否成功放入队列
+        """
+        return await login_log_writer.put(login_log)
+
+    @classmethod
+    def add_job_log(cls, job_log: JobLogModel) -> bool:
+        """
+        将定时任务日志放入批量写入队列，不等待，需在事件循环线程中调用
+
+        :param job_log: 定时任务日志对象
+        :return: 是否成功放入队列
+        """
+        return job_log_writer.put_nowait(job_log)
+
+    @classmethod
+    def get_log_writer_stats(cls) -> dict[str, dict[str, int]]:
+        """
+        获取日志批量写入统计信息，包括入队、写入、丢弃及溢出条数
+
+        :return: 日志批量写入统计信息
+        """
+        return {
+            writer.name: {**writer.stats, 'pending': writer.qsize()}
+            for writer in (operation_log_writer, login_log_writer, job_log_writer)
+        }
@@ -7,6 +7,7 @@ from config.database import AsyncSessionLocal
 from config.env import RedisConfig
 from module_admin.service.config_service import ConfigService
 from module_admin.service.dict_service import DictDataService
+from module_admin.service.online_service import OnlineService
 from utils.log_util import logger
 
 
@@ -78,3 +79,14 @@ class RedisUtil:
         """
         async with AsyncSessionLocal() as session:
             await ConfigService.init_cache_sys_config_services(session, redis)
+
+    @classmethod
+    async def init_online_session(cls, redis: aioredis.Redis) -> None:
+        """
+        应用启动时补全在线用户会话信息及索引
+
+        :param redis: redis对象
+        :return:
+        """
+        session_count = await OnlineService.init_online_session_services(redis)
+        logger.info(f'✅️ 在线用户会话信息初始化成功，补全{session_count}个会话')
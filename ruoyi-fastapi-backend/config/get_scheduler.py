@@ -1,3 +1,4 @@
+import asyncio
 import importlib
 import json
 from asyncio import iscoroutinefunction
@@ -5,7 +6,8 @@ from collections.abc import Callable
 from datetime import datetime, timedelta
 from typing import Any
 
-from apscheduler.events import EVENT_ALL, SchedulerEvent
+from apscheduler import events
+from apscheduler.events import EVENT_JOB_REMOVED, SchedulerEvent
 from apscheduler.executors.asyncio import AsyncIOExecutor
 from apscheduler.executors.pool import ProcessPoolExecutor
 from apscheduler.job import Job
@@ -17,14 +19,13 @@ from apscheduler.triggers.combining import OrTrigger
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from sqlalchemy.engine import create_engine
-from sqlalchemy.orm import sessionmaker
 
 import module_task  # noqa: F401
 from config.database import AsyncSessionLocal, quote_plus
-from config.env import DataBaseConfig, RedisConfig
+from config.env import DataBaseConfig, LogConfig, RedisConfig
+from config.get_log_writer import LogWriterUtil
 from module_admin.dao.job_dao import JobDao
 from module_admin.entity.vo.job_vo import JobLogModel, JobModel
-from module_admin.service.job_log_service import JobLogService
 from utils.log_util import logger
 
 
@@ -103,7 +104,6 @@ engine = create_engine(
     pool_recycle=DataBaseConfig.db_pool_recycle,
     pool_timeout=DataBaseConfig.db_pool_timeout,
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 redis_config = {
     'host': RedisConfig.redis_host,
     'port': RedisConfig.redis_port,
@@ -125,8 +125,14 @@ scheduler.configure(jobstores=job_stores, executors=executors, job_defaults=job_
 class SchedulerUtil:
     """
     定时任务相关方法
+
+    调度事件监听器可能在执行器线程中被调用，因此不在监听器中访问任务存储及数据库：
+    任务日志所需的任务信息在添加任务时缓存，日志对象通过call_soon_threadsafe交给事件循环线程放入批量写入队列
     """
 
+    _event_loop: asyncio.AbstractEventLoop | None = None
+    _job_log_info: dict[str, dict[str, Any]] = {}
+
     @classmethod
     async def init_system_scheduler(cls) -> None:
         """
@@ -135,13 +141,14 @@ class SchedulerUtil:
         :return:
         """
         logger.info('🔎 开始启动定时任务...')
+        cls._event_loop = asyncio.get_running_loop()
         scheduler.start()
         async with AsyncSessionLocal() as session:
             job_list = await JobDao.get_job_list_for_scheduler(session)
             for item in job_list:
                 cls.remove_scheduler_job(job_id=str(item.job_id))
                 cls.add_scheduler_job(item)
-        scheduler.add_listener(cls.scheduler_event_listener, EVENT_ALL)
+        scheduler.add_listener(cls.scheduler_event_listener, cls._get_job_log_event_mask())
         logger.info('✅️ 系统初始定时任务加载成功')
 
     @classmethod
@@ -154,6 +161,43 @@ class SchedulerUtil:
         scheduler.shutdown()
         logger.info('✅️ 关闭定时任务成功')
 
+    @classmethod
+    def _get_job_log_event_mask(cls) -> int:
+        """
+        根据日志配置获取需要写入定时任务日志的调度事件掩码
+
+        :return: 调度事件掩码
+        """
+        mask = 0
+        for event_name in filter(None, (item.strip() for item in LogConfig.log_job_events.split(','))):
+            event_code = getattr(events, event_name, None)
+            if not isinstance(event_code, int) or not event_name.startswith('EVENT_'):
+                logger.warning(f'定时任务日志事件类型{event_name}不存在，已忽略')
+                continue
+            mask |= event_code
+
+        return mask
+
+    @classmethod
+    def _cache_job_log_info(cls, job: Job, job_group: str) -> None:
+        """
+        缓存写入定时任务日志所需的任务信息
+
+        :param job: 任务对象
+        :param job_group: 任务组名
+        :return:
+        """
+        job_state = job.__getstate__()
+        cls._job_log_info[job.id] = {
+            'jobName': job_state.get('name'),
+            'jobGroup': job_group,
+            'jobExecutor': job_state.get('executor'),
+            'invokeTarget': job_state.get('func'),
+            'jobArgs': ','.join(job_state.get('args')),
+            'jobKwargs': json.dumps(job_state.get('kwargs')),
+            'jobTrigger': str(job_state.get('trigger')),
+        }
+
     @classmethod
     def _import_function(cls, func_path: str) -> Callable[..., Any]:
         """
@@ -190,7 +234,7 @@ class SchedulerUtil:
         job_executor = job_info.job_executor
         if iscoroutinefunction(job_func):
             job_executor = 'default'
-        scheduler.add_job(
+        job = scheduler.add_job(
             func=job_func,
             trigger=MyCronTrigger.from_crontab(job_info.cron_expression),
             args=job_info.job_args.split(',') if job_info.job_args else None,
@@ -203,6 +247,7 @@ class SchedulerUtil:
             jobstore=job_info.job_group,
             executor=job_executor,
         )
+        cls._cache_job_log_info(job, job_info.job_group)
 
     @classmethod
     def execute_scheduler_job_once(cls, job_info: JobModel) -> None:
@@ -219,7 +264,7 @@ class SchedulerUtil:
         job_trigger = DateTrigger()
         if job_info.status == '0':
             job_trigger = OrTrigger(triggers=[DateTrigger(), MyCronTrigger.from_crontab(job_info.cron_expression)])
-        scheduler.add_job(
+        job = scheduler.add_job(
             func=job_func,
             trigger=job_trigger,
             args=job_info.job_args.split(',') if job_info.job_args else None,
@@ -232,6 +277,7 @@ class SchedulerUtil:
             jobstore=job_info.job_group,
             executor=job_executor,
         )
+        cls._cache_job_log_info(job, job_info.job_group)
 
     @classmethod
     def remove_scheduler_job(cls, job_id: str | int) -> None:
@@ -241,13 +287,30 @@ class SchedulerUtil:
         :param job_id: 任务id
         :return:
         """
+        cls._job_log_info.pop(str(job_id), None)
         query_job = cls.get_scheduler_job(job_id=job_id)
         if query_job:
             scheduler.remove_job(job_id=str(job_id))
 
     @classmethod
     def scheduler_event_listener(cls, event: SchedulerEvent) -> None:
-        # 获取事件类型和任务ID
+        """
+        调度事件监听器，将任务相关事件构造为定时任务日志并放入批量写入队列
+
+        :param event: 调度事件
+        :return:
+        """
+        job_id = getattr(event, 'job_id', None)
+        job_log_info = cls._job_log_info.get(job_id) if job_id is not None else None
+        # 任务被移除时任务信息缓存需保留至任务执行完成，移除事件本身不写入日志
+        if (
+            job_log_info is None
+            or event.code == EVENT_JOB_REMOVED
+            or cls._event_loop is None
+            or cls._event_loop.is_closed()
+        ):
+            return
+        # 获取事件类型
         event_type = event.__class__.__name__
         # 获取任务执行异常信息
         status = '0'
@@ -255,40 +318,14 @@ class SchedulerUtil:
         if event_type == 'JobExecutionEvent' and event.exception:
             exception_info = str(event.exception)
             status = '1'
-        if hasattr(event, 'job_id'):
-            job_id = event.job_id
-            query_job = cls.get_scheduler_job(job_id=job_id)
-            if query_job:
-                query_job_info = query_job.__getstate__()
-                # 获取任务名称
-                job_name = query_job_info.get('name')
-                # 获取任务组名
-                job_group = query_job._jobstore_alias
-                # 获取任务执行器
-                job_executor = query_job_info.get('executor')
-                # 获取调用目标字符串
-                invoke_target = query_job_info.get('func')
-                # 获取调用函数位置参数
-                job_args = ','.join(query_job_info.get('args'))
-                # 获取调用函数关键字参数
-                job_kwargs = json.dumps(query_job_info.get('kwargs'))
-                # 获取任务触发器
-                job_trigger = str(query_job_info.get('trigger'))
-                # 构造日志消息
-                job_message = f'事件类型: {event_type}, 任务ID: {job_id}, 任务名称: {job_name}, 执行于{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
-                job_log = JobLogModel(
-                    jobName=job_name,
-                    jobGroup=job_group,
-                    jobExecutor=job_executor,
-                    invokeTarget=invoke_target,
-                    jobArgs=job_args,
-                    jobKwargs=job_kwargs,
-                    jobTrigger=job_trigger,
-                    jobMessage=job_message,
-                    status=status,
-                    exceptionInfo=exception_info,
-                    createTime=datetime.now(),
-                )
-                session = SessionLocal()
-                JobLogService.add_job_log_services(session, job_log)
-                session.close()
+        now = datetime.now()
+        # 构造日志消息
+        job_message = f'事件类型: {event_type}, 任务ID: {job_id}, 任务名称: {job_log_info["jobName"]}, 执行于{now.strftime("%Y-%m-%d %H:%M:%S")}'
+        job_log = JobLogModel(
+            **job_log_info,
+            jobMessage=job_message,
+            status=status,
+            exceptionInfo=exception_info,
+            createTime=now,
+        )
+        cls._event_loop.call_soon_threadsafe(LogWriterUtil.add_job_log, job_log)
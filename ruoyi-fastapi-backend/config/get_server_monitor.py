@@ -0,0 +1,58 @@
+import asyncio
+import contextlib
+
+from config.env import AppConfig
+from module_admin.service.server_service import ServerService
+from utils.log_util import logger
+
+
+class ServerMonitorUtil:
+    """
+    服务监控后台采样相关方法
+    """
+
+    _task: asyncio.Task | None = None
+
+    @classmethod
+    async def init_server_monitor(cls) -> None:
+        """
+        应用启动时启动服务监控后台采样任务
+
+        :return:
+        """
+        cls._task = asyncio.create_task(cls._run(), name='server-monitor-sampler')
+        logger.info('✅️ 服务监控采样任务启动成功')
+
+    @classmethod
+    async def close_server_monitor(cls) -> None:
+        """
+        应用关闭时停止服务监控后台采样任务
+
+        :return:
+        """
+        if cls._task is None:
+            return
+        cls._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await cls._task
+        cls._task = None
+        logger.info('✅️ 关闭服务监控采样任务成功')
+
+    @classmethod
+    async def _run(cls) -> None:
+        """
+        后台采样任务，按采样间隔采集服务器监控信息，并以实际唤醒时间与预期唤醒时间之差作为事件循环延迟
+
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        interval = AppConfig.app_monitor_sample_interval
+        loop_lag = 0.0
+        while True:
+            try:
+                await ServerService.sample_server_monitor_services(loop_lag)
+            except Exception as e:
+                logger.error(f'服务监控采样失败，详细错误信息：{e}')
+            expected_time = loop.time() + interval
+            await asyncio.sleep(interval)
+            loop_lag = max(loop.time() - expected_time, 0) * 1000
@@ -0,0 +1,23 @@
+from fastapi import FastAPI
+
+from common.router import RouterRegister
+from utils.log_util import logger
+
+
+def generate_router_manifest() -> None:
+    """
+    导入全部controller模块并生成路由清单，应用启动时按清单注册路由，可通过--env参数指定运行环境，如python generate_router_manifest.py --env=prod
+
+    :return:
+    """
+    router_register = RouterRegister(FastAPI())
+    manifest = router_register.write_manifest()
+    router_count = sum(len(module_entry['routers']) for module_entry in manifest['modules'])
+    logger.info(
+        f'✅️ 路由清单生成成功，共包含{len(manifest["modules"])}个模块、{router_count}个路由，'
+        f'已写入{router_register.manifest_path}'
+    )
+
+
+if __name__ == '__main__':
+    generate_router_manifest()
@@ -1,7 +1,7 @@
 from typing import Annotated
 
-from fastapi import BackgroundTasks, File, Query, Request, Response, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi import File, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse
 
 from common.aspect.pre_auth import PreAuthDependency
 from common.router import APIRouterPro
@@ -31,10 +31,10 @@ async def common_upload(request: Request, file: Annotated[UploadFile, File(...)]
     '/download',
     summary='通用文件下载接口',
     description='用于下载下载目录中的文件',
-    response_class=StreamingResponse,
+    response_class=FileResponse,
     responses={
         200: {
-            'description': '流式返回文件',
+            'description': '返回文件，支持Range断点续传',
             'content': {
                 'application/octet-stream': {},
             },
@@ -43,24 +43,23 @@ async def common_upload(request: Request, file: Annotated[UploadFile, File(...)]
 )
 async def common_download(
     request: Request,
-    background_tasks: BackgroundTasks,
     file_name: Annotated[str, Query(alias='fileName')],
     delete: Annotated[bool, Query()],
 ) -> Response:
-    download_result = await CommonService.download_services(background_tasks, file_name, delete)
+    download_result = await CommonService.download_services(file_name)
     logger.info(download_result.message)
 
-    return ResponseUtil.streaming(data=download_result.result)
+    return ResponseUtil.file(request=request, path=download_result.result, delete_after_send=delete)
 
 
 @common_controller.get(
     '/download/resource',
     summary='通用资源文件下载接口',
     description='用于下载上传目录中的资源文件',
-    response_class=StreamingResponse,
+    response_class=FileResponse,
     responses={
         200: {
-            'description': '流式返回文件',
+            'description': '返回文件，支持Range断点续传',
             'content': {
                 'application/octet-stream': {},
             },
@@ -71,4 +70,4 @@ async def common_download_resource(request: Request, resource: Annotated[str, Qu
     download_resource_result = await CommonService.download_resource_services(resource)
     logger.info(download_resource_result.message)
 
-    return ResponseUtil.streaming(data=download_resource_result.result)
+    return ResponseUtil.file(request=request, path=download_resource_result.result)
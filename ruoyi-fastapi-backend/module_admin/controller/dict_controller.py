@@ -24,6 +24,7 @@ from module_admin.entity.vo.dict_vo import (
 from module_admin.entity.vo.user_vo import CurrentUserModel
 from module_admin.service.dict_service import DictDataService, DictTypeService
 from utils.common_util import bytes2file_response
+from utils.excel_util import ExcelUtil, ExportFormat
 from utils.log_util import logger
 from utils.response_util import ResponseUtil
 
@@ -349,12 +350,19 @@ async def export_system_dict_data_list(
     request: Request,
     dict_data_page_query: Annotated[DictDataPageQueryModel, Form()],
     query_db: Annotated[AsyncSession, DBSessionDependency()],
+    export_format: Annotated[
+        ExportFormat, Query(alias='exportFormat', description='导出格式，可选的有xlsx及csv，默认为xlsx')
+    ] = 'xlsx',
 ) -> Response:
-    # 获取全量数据
+    # 以数据流的形式获取全量数据
     dict_data_query_result = await DictDataService.get_dict_data_list_services(
-        query_db, dict_data_page_query, is_page=False
+        query_db, dict_data_page_query, is_stream=True
     )
-    dict_data_export_result = await DictDataService.export_dict_data_list_services(dict_data_query_result)
+    dict_data_export_file = await DictDataService.export_dict_data_list_services(dict_data_query_result, export_format)
     logger.info('导出成功')
 
-    return ResponseUtil.streaming(data=bytes2file_response(dict_data_export_result))
+    return ResponseUtil.streaming(
+        data=ExcelUtil.iter_file(dict_data_export_file),
+        headers=ExcelUtil.get_export_headers('dict_data', export_format),
+        media_type=ExcelUtil.media_types[export_format],
+    )
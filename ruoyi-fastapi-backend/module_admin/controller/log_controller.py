@@ -22,6 +22,7 @@ from module_admin.entity.vo.log_vo import (
 )
 from module_admin.service.log_service import LoginLogService, OperationLogService
 from utils.common_util import bytes2file_response
+from utils.excel_util import ExcelUtil, ExportFormat
 from utils.log_util import logger
 from utils.response_util import ResponseUtil
 
@@ -110,17 +111,24 @@ async def export_system_operation_log_list(
     request: Request,
     operation_log_page_query: Annotated[OperLogPageQueryModel, Form()],
     query_db: Annotated[AsyncSession, DBSessionDependency()],
+    export_format: Annotated[
+        ExportFormat, Query(alias='exportFormat', description='导出格式，可选的有xlsx及csv，默认为xlsx')
+    ] = 'xlsx',
 ) -> Response:
-    # 获取全量数据
+    # 以数据流的形式获取全量数据
     operation_log_query_result = await OperationLogService.get_operation_log_list_services(
-        query_db, operation_log_page_query, is_page=False
+        query_db, operation_log_page_query, is_stream=True
     )
-    operation_log_export_result = await OperationLogService.export_operation_log_list_services(
-        request, operation_log_query_result
+    operation_log_export_file = await OperationLogService.export_operation_log_list_services(
+        request, operation_log_query_result, export_format
     )
     logger.info('导出成功')
 
-    return ResponseUtil.streaming(data=bytes2file_response(operation_log_export_result))
+    return ResponseUtil.streaming(
+        data=ExcelUtil.iter_file(operation_log_export_file),
+        headers=ExcelUtil.get_export_headers('oper_log', export_format),
+        media_type=ExcelUtil.media_types[export_format],
+    )
 
 
 @log_controller.get(
@@ -16,6 +16,7 @@ from config.env import AppConfig, JwtConfig
 from module_admin.entity.vo.login_vo import LoginToken, RouterModel, Token, UserLogin, UserRegister
 from module_admin.entity.vo.user_vo import CurrentUserModel, EditUserModel
 from module_admin.service.login_service import CustomOAuth2PasswordRequestForm, LoginService, oauth2_scheme
+from module_admin.service.online_service import OnlineService
 from module_admin.service.user_service import UserService
 from utils.log_util import logger
 from utils.response_util import ResponseUtil
@@ -49,31 +50,24 @@ async def login(
     result = await LoginService.authenticate_user(request, query_db, user)
     access_token_expires = timedelta(minutes=JwtConfig.jwt_expire_minutes)
     session_id = str(uuid.uuid4())
-    access_token = await LoginService.create_access_token(
-        data={
-            'user_id': str(result[0].user_id),
-            'user_name': result[0].user_name,
-            'dept_name': result[1].dept_name if result[1] else None,
-            'session_id': session_id,
-            'login_info': user.login_info,
-        },
-        expires_delta=access_token_expires,
+    token_data = {
+        'user_id': str(result[0].user_id),
+        'user_name': result[0].user_name,
+        'dept_name': result[1].dept_name if result[1] else None,
+        'session_id': session_id,
+        'login_info': user.login_info,
+    }
+    access_token = await LoginService.create_access_token(data=token_data, expires_delta=access_token_expires)
+    # 不允许账号同时登录时以用户id作为会话编号，可实现同一账号同一时间只能登录一次
+    await OnlineService.add_online_session_services(
+        request.app.state.redis,
+        session_id if AppConfig.app_same_time_login else str(result[0].user_id),
+        access_token,
+        token_data,
+        ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
     )
-    if AppConfig.app_same_time_login:
-        await request.app.state.redis.set(
-            f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}',
-            access_token,
-            ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
-        )
-    else:
-        # 此方法可实现同一账号同一时间只能登录一次
-        await request.app.state.redis.set(
-            f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{result[0].user_id}',
-            access_token,
-            ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
-        )
     await UserService.edit_user_services(
-        query_db, EditUserModel(userId=result[0].user_id, loginDate=datetime.now(), type='status')
+        request, query_db, EditUserModel(userId=result[0].user_id, loginDate=datetime.now(), type='status')
     )
     logger.info('登录成功')
     # 判断请求是否来自于api文档，如果是返回指定格式的结果，用于修复api文档认证成功后token显示undefined的bug
@@ -93,9 +87,13 @@ async def login(
 async def get_login_user_info(
     request: Request, current_user: Annotated[CurrentUserModel, CurrentUserDependency()]
 ) -> Response:
+    etag = ResponseUtil.get_etag(current_user)
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if ResponseUtil.is_etag_match(request.headers.get('If-None-Match'), etag):
+        return ResponseUtil.not_modified(headers=headers)
     logger.info('获取成功')
 
-    return ResponseUtil.success(model_content=current_user)
+    return ResponseUtil.success(model_content=current_user, headers=headers)
 
 
 @login_controller.get(
@@ -109,10 +107,13 @@ async def get_login_user_routers(
     current_user: Annotated[CurrentUserModel, CurrentUserDependency()],
     query_db: Annotated[AsyncSession, DBSessionDependency()],
 ) -> Response:
+    etag, user_routers = await LoginService.get_current_user_routers(request, current_user, query_db)
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if ResponseUtil.is_etag_match(request.headers.get('If-None-Match'), etag):
+        return ResponseUtil.not_modified(headers=headers)
     logger.info('获取成功')
-    user_routers = await LoginService.get_current_user_routers(current_user.user.user_id, query_db)
 
-    return ResponseUtil.success(data=user_routers)
+    return ResponseUtil.success(data=user_routers, headers=headers)
 
 
 @login_controller.post(
@@ -1,10 +1,16 @@
-from fastapi import Request, Response
+from typing import Annotated
+
+from fastapi import Query, Request, Response
 
 from common.aspect.interface_auth import UserInterfaceAuthDependency
 from common.aspect.pre_auth import PreAuthDependency
 from common.router import APIRouterPro
 from common.vo import DataResponseModel
-from module_admin.entity.vo.server_vo import ServerMonitorModel
+from module_admin.entity.vo.server_vo import (
+    ServerMonitorHistoryModel,
+    ServerMonitorHistoryQueryModel,
+    ServerMonitorModel,
+)
 from module_admin.service.server_service import ServerService
 from utils.log_util import logger
 from utils.response_util import ResponseUtil
@@ -27,3 +33,20 @@ async def get_monitor_server_info(request: Request) -> Response:
     logger.info('获取成功')
 
     return ResponseUtil.success(data=server_info_query_result)
+
+
+@server_controller.get(
+    '/history',
+    summary='获取服务器监控指标趋势接口',
+    description='用于获取最近一段时间内降采样后的服务器监控指标',
+    response_model=DataResponseModel[ServerMonitorHistoryModel],
+    dependencies=[UserInterfaceAuthDependency('monitor:server:list')],
+)
+async def get_monitor_server_history(
+    request: Request,
+    history_query: Annotated[ServerMonitorHistoryQueryModel, Query()],
+) -> Response:
+    server_history_query_result = await ServerService.get_server_monitor_history_services(history_query)
+    logger.info('获取成功')
+
+    return ResponseUtil.success(data=server_history_query_result)
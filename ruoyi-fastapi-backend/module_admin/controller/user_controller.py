@@ -1,9 +1,8 @@
 import os
 from datetime import datetime
-from typing import Annotated, Literal
+from typing import Annotated, Any, Literal
 
-import aiofiles
-from fastapi import File, Form, Path, Query, Request, Response, UploadFile
+from fastapi import BackgroundTasks, File, Form, Path, Query, Request, Response, UploadFile
 from fastapi.responses import StreamingResponse
 from pydantic_validation_decorator import ValidateFields
 from sqlalchemy import ColumnElement
@@ -43,6 +42,7 @@ from module_admin.service.dept_service import DeptService
 from module_admin.service.role_service import RoleService
 from module_admin.service.user_service import UserService
 from utils.common_util import bytes2file_response
+from utils.excel_util import ExcelUtil, ExportFormat
 from utils.log_util import logger
 from utils.pwd_util import PwdUtil
 from utils.response_util import ResponseUtil
@@ -115,7 +115,7 @@ async def add_system_user(
         await RoleService.check_role_data_scope_services(
             query_db, ','.join([str(item) for item in add_user.role_ids]), role_data_scope_sql
         )
-    add_user.password = PwdUtil.get_password_hash(add_user.password)
+    add_user.password = await PwdUtil.get_password_hash_async(add_user.password)
     add_user.create_by = current_user.user.user_name
     add_user.create_time = datetime.now()
     add_user.update_by = current_user.user.user_name
@@ -153,7 +153,7 @@ async def edit_system_user(
         )
     edit_user.update_by = current_user.user.user_name
     edit_user.update_time = datetime.now()
-    edit_user_result = await UserService.edit_user_services(query_db, edit_user)
+    edit_user_result = await UserService.edit_user_services(request, query_db, edit_user)
     logger.info(edit_user_result.message)
 
     return ResponseUtil.success(msg=edit_user_result.message)
@@ -185,7 +185,7 @@ async def delete_system_user(
             if not current_user.user.admin:
                 await UserService.check_user_data_scope_services(query_db, int(user_id), data_scope_sql)
     delete_user = DeleteUserModel(userIds=user_ids, updateBy=current_user.user.user_name, updateTime=datetime.now())
-    delete_user_result = await UserService.delete_user_services(query_db, delete_user)
+    delete_user_result = await UserService.delete_user_services(request, query_db, delete_user)
     logger.info(delete_user_result.message)
 
     return ResponseUtil.success(msg=delete_user_result.message)
@@ -211,13 +211,13 @@ async def reset_system_user_pwd(
         await UserService.check_user_data_scope_services(query_db, reset_user.user_id, data_scope_sql)
     edit_user = EditUserModel(
         userId=reset_user.user_id,
-        password=PwdUtil.get_password_hash(reset_user.password),
+        password=await PwdUtil.get_password_hash_async(reset_user.password),
         pwdUpdateDate=datetime.now(),
         updateBy=current_user.user.user_name,
         updateTime=datetime.now(),
         type='pwd',
     )
-    edit_user_result = await UserService.edit_user_services(query_db, edit_user)
+    edit_user_result = await UserService.edit_user_services(request, query_db, edit_user)
     logger.info(edit_user_result.message)
 
     return ResponseUtil.success(msg=edit_user_result.message)
@@ -248,7 +248,7 @@ async def change_system_user_status(
         updateTime=datetime.now(),
         type='status',
     )
-    edit_user_result = await UserService.edit_user_services(query_db, edit_user)
+    edit_user_result = await UserService.edit_user_services(request, query_db, edit_user)
     logger.info(edit_user_result.message)
 
     return ResponseUtil.success(msg=edit_user_result.message)
@@ -314,18 +314,12 @@ async def change_system_user_profile_avatar(
     current_user: Annotated[CurrentUserModel, CurrentUserDependency()],
 ) -> Response:
     if avatarfile:
-        relative_path = (
-            f'avatar/{datetime.now().strftime("%Y")}/{datetime.now().strftime("%m")}/{datetime.now().strftime("%d")}'
+        now = datetime.now()
+        relative_path = UploadUtil.get_upload_dir('avatar', now)
+        avatar_name = f'avatar_{now.strftime("%Y%m%d%H%M%S")}{UploadConfig.UPLOAD_MACHINE}{UploadUtil.generate_random_number()}.png'
+        await UploadUtil.save_upload_bytes(
+            avatarfile, os.path.join(UploadConfig.UPLOAD_PATH, relative_path, avatar_name)
         )
-        dir_path = os.path.join(UploadConfig.UPLOAD_PATH, relative_path)
-        try:
-            os.makedirs(dir_path)
-        except FileExistsError:
-            pass
-        avatar_name = f'avatar_{datetime.now().strftime("%Y%m%d%H%M%S")}{UploadConfig.UPLOAD_MACHINE}{UploadUtil.generate_random_number()}.png'
-        avatar_path = os.path.join(dir_path, avatar_name)
-        async with aiofiles.open(avatar_path, 'wb') as f:
-            await f.write(avatarfile)
         edit_user = EditUserModel(
             userId=current_user.user.user_id,
             avatar=f'{UploadConfig.UPLOAD_PREFIX}/{relative_path}/{avatar_name}',
@@ -333,8 +327,18 @@ async def change_system_user_profile_avatar(
             updateTime=datetime.now(),
             type='avatar',
         )
-        edit_user_result = await UserService.edit_user_services(query_db, edit_user)
+        edit_user_result = await UserService.edit_user_services(request, query_db, edit_user)
         logger.info(edit_user_result.message)
+        # 删除原头像文件，原头像的存储文件不再被引用时一并删除
+        old_avatar = current_user.user.avatar
+        avatar_prefix = f'{UploadConfig.UPLOAD_PREFIX}/avatar/'
+        if (
+            edit_user_result.is_success
+            and old_avatar
+            and old_avatar.startswith(avatar_prefix)
+            and '..' not in old_avatar
+        ):
+            await UploadUtil.delete_file(old_avatar.replace(UploadConfig.UPLOAD_PREFIX, UploadConfig.UPLOAD_PATH, 1))
 
         return ResponseUtil.success(model_content=AvatarModel(imgUrl=edit_user.avatar), msg=edit_user_result.message)
     return ResponseUtil.failure(msg='上传图片异常，请联系管理员')
@@ -363,7 +367,7 @@ async def change_system_user_profile_info(
         postIds=current_user.user.post_ids.split(',') if current_user.user.post_ids else [],
         role=current_user.user.role,
     )
-    edit_user_result = await UserService.edit_user_services(query_db, edit_user)
+    edit_user_result = await UserService.edit_user_services(request, query_db, edit_user)
     logger.info(edit_user_result.message)
 
     return ResponseUtil.success(msg=edit_user_result.message)
@@ -390,7 +394,7 @@ async def reset_system_user_password(
         updateBy=current_user.user.user_name,
         updateTime=datetime.now(),
     )
-    reset_user_result = await UserService.reset_user_services(query_db, reset_user)
+    reset_user_result = await UserService.reset_user_services(request, query_db, reset_user)
     logger.info(reset_user_result.message)
 
     return ResponseUtil.success(msg=reset_user_result.message)
@@ -400,25 +404,45 @@ async def reset_system_user_password(
     '/importData',
     summary='批量导入用户接口',
     description='用于批量导入用户数据',
-    response_model=ResponseBaseModel,
+    response_model=DataResponseModel[str],
     dependencies=[UserInterfaceAuthDependency('system:user:import')],
 )
 @Log(title='用户管理', business_type=BusinessType.IMPORT)
 async def batch_import_system_user(
     request: Request,
+    background_tasks: BackgroundTasks,
     file: Annotated[UploadFile, File(...)],
     update_support: Annotated[bool, Query(alias='updateSupport')],
-    query_db: Annotated[AsyncSession, DBSessionDependency()],
     current_user: Annotated[CurrentUserModel, CurrentUserDependency()],
     user_data_scope_sql: Annotated[ColumnElement, DataScopeDependency(SysUser)],
     dept_data_scope_sql: Annotated[ColumnElement, DataScopeDependency(SysDept)],
 ) -> Response:
     batch_import_result = await UserService.batch_import_user_services(
-        request, query_db, file, update_support, current_user, user_data_scope_sql, dept_data_scope_sql
+        request, background_tasks, file, update_support, current_user, user_data_scope_sql, dept_data_scope_sql
     )
     logger.info(batch_import_result.message)
 
-    return ResponseUtil.success(msg=batch_import_result.message)
+    return ResponseUtil.success(msg=batch_import_result.message, data=batch_import_result.result)
+
+
+@user_controller.get(
+    '/importData/{task_id}',
+    summary='获取用户导入进度接口',
+    description='用于获取批量导入用户任务的进度及导入结果，导入结果中包含每行数据的错误信息',
+    response_model=DataResponseModel[dict[str, Any]],
+    dependencies=[UserInterfaceAuthDependency('system:user:import')],
+)
+async def get_system_user_import_progress(
+    request: Request,
+    task_id: Annotated[str, Path(description='导入任务id')],
+    current_user: Annotated[CurrentUserModel, CurrentUserDependency()],
+) -> Response:
+    import_progress_result = await UserService.get_import_user_progress_services(
+        request.app.state.redis, task_id, current_user
+    )
+    logger.info('获取成功')
+
+    return ResponseUtil.success(data=import_progress_result)
 
 
 @user_controller.post(
@@ -466,15 +490,22 @@ async def export_system_user_list(
     user_page_query: Annotated[UserPageQueryModel, Form()],
     query_db: Annotated[AsyncSession, DBSessionDependency()],
     data_scope_sql: Annotated[ColumnElement, DataScopeDependency(SysUser)],
+    export_format: Annotated[
+        ExportFormat, Query(alias='exportFormat', description='导出格式，可选的有xlsx及csv，默认为xlsx')
+    ] = 'xlsx',
 ) -> Response:
-    # 获取全量数据
+    # 以数据流的形式获取全量数据
     user_query_result = await UserService.get_user_list_services(
-        query_db, user_page_query, data_scope_sql, is_page=False
+        query_db, user_page_query, data_scope_sql, is_stream=True
     )
-    user_export_result = await UserService.export_user_list_services(user_query_result)
+    user_export_file = await UserService.export_user_list_services(user_query_result, export_format)
     logger.info('导出成功')
 
-    return ResponseUtil.streaming(data=bytes2file_response(user_export_result))
+    return ResponseUtil.streaming(
+        data=ExcelUtil.iter_file(user_export_file),
+        headers=ExcelUtil.get_export_headers('user', export_format),
+        media_type=ExcelUtil.media_types[export_format],
+    )
 
 
 @user_controller.get(
@@ -519,7 +550,7 @@ async def update_system_role_user(
         await UserService.check_user_data_scope_services(query_db, user_id, user_data_scope_sql)
         await RoleService.check_role_data_scope_services(query_db, role_ids, role_data_scope_sql)
     add_user_role_result = await UserService.add_user_role_services(
-        query_db, CrudUserRoleModel(userId=user_id, roleIds=role_ids)
+        request, query_db, CrudUserRoleModel(userId=user_id, roleIds=role_ids)
     )
     logger.info(add_user_role_result.message)
 
@@ -1,10 +1,11 @@
 from collections.abc import Sequence
 
-from sqlalchemy import ColumnElement, bindparam, func, select, update
+from sqlalchemy import ColumnElement, bindparam, delete, func, insert, literal, select, true, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from sqlalchemy.util import immutabledict
 
-from module_admin.entity.do.dept_do import SysDept
+from module_admin.entity.do.dept_do import SysDept, SysDeptClosure
 from module_admin.entity.do.user_do import SysUser
 from module_admin.entity.vo.dept_vo import DeptModel
 
@@ -88,7 +89,7 @@ class DeptDao:
                     .where(
                         SysDept.dept_id != dept_info.dept_id,
                         ~SysDept.dept_id.in_(
-                            select(SysDept.dept_id).where(func.find_in_set(dept_info.dept_id, SysDept.ancestors))
+                            select(SysDeptClosure.descendant_id).where(SysDeptClosure.ancestor_id == dept_info.dept_id)
                         ),
                         SysDept.del_flag == '0',
                         SysDept.status == '0',
@@ -114,7 +115,15 @@ class DeptDao:
         :return: 子部门信息列表
         """
         dept_result = (
-            (await db.execute(select(SysDept).where(func.find_in_set(dept_id, SysDept.ancestors)))).scalars().all()
+            (
+                await db.execute(
+                    select(SysDept)
+                    .join(SysDeptClosure, SysDeptClosure.descendant_id == SysDept.dept_id)
+                    .where(SysDeptClosure.ancestor_id == dept_id, SysDeptClosure.depth > 0)
+                )
+            )
+            .scalars()
+            .all()
         )
 
         return dept_result
@@ -232,6 +241,131 @@ class DeptDao:
             execution_options=immutabledict({'synchronize_session': None}),
         )
 
+    @classmethod
+    async def add_dept_closure_dao(cls, db: AsyncSession, dept_id: int, parent_id: int) -> None:
+        """
+        新增部门时写入部门闭包关系数据库操作
+
+        :param db: orm对象
+        :param dept_id: 新增的部门id
+        :param parent_id: 父部门id
+        :return:
+        """
+        await db.execute(insert(SysDeptClosure).values(ancestor_id=dept_id, descendant_id=dept_id, depth=0))
+        await db.execute(
+            insert(SysDeptClosure).from_select(
+                ['ancestor_id', 'descendant_id', 'depth'],
+                select(SysDeptClosure.ancestor_id, literal(dept_id), SysDeptClosure.depth + 1).where(
+                    SysDeptClosure.descendant_id == parent_id
+                ),
+            )
+        )
+
+    @classmethod
+    async def move_dept_closure_dao(cls, db: AsyncSession, dept_id: int, parent_id: int) -> None:
+        """
+        部门更换父部门时更新当前部门及其子部门的闭包关系数据库操作
+
+        :param db: orm对象
+        :param dept_id: 部门id
+        :param parent_id: 新的父部门id
+        :return:
+        """
+        # 嵌套一层不可合并的子查询，避免mysql不允许在删除语句的子查询中直接引用目标表
+        subtree = (
+            select(SysDeptClosure.descendant_id)
+            .where(SysDeptClosure.ancestor_id == dept_id)
+            .distinct()
+            .subquery('subtree')
+        )
+        subtree_ids = select(subtree.c.descendant_id)
+        await db.execute(
+            delete(SysDeptClosure).where(
+                SysDeptClosure.descendant_id.in_(subtree_ids), SysDeptClosure.ancestor_id.not_in(subtree_ids)
+            )
+        )
+        ancestor = aliased(SysDeptClosure)
+        descendant = aliased(SysDeptClosure)
+        await db.execute(
+            insert(SysDeptClosure).from_select(
+                ['ancestor_id', 'descendant_id', 'depth'],
+                select(ancestor.ancestor_id, descendant.descendant_id, ancestor.depth + descendant.depth + 1)
+                .select_from(ancestor)
+                .join(descendant, true())
+                .where(ancestor.descendant_id == parent_id, descendant.ancestor_id == dept_id),
+            )
+        )
+
+    @classmethod
+    async def is_descendant_dept_dao(cls, db: AsyncSession, ancestor_id: int, dept_id: int) -> bool:
+        """
+        判断部门是否为指定部门或其子部门
+
+        :param db: orm对象
+        :param ancestor_id: 祖先部门id
+        :param dept_id: 部门id
+        :return: 判断结果
+        """
+        closure = (
+            await db.execute(
+                select(SysDeptClosure.depth).where(
+                    SysDeptClosure.ancestor_id == ancestor_id, SysDeptClosure.descendant_id == dept_id
+                )
+            )
+        ).first()
+
+        return closure is not None
+
+    @classmethod
+    async def count_dept_closure_dao(cls, db: AsyncSession) -> int:
+        """
+        查询部门闭包关系数量
+
+        :param db: orm对象
+        :return: 部门闭包关系数量
+        """
+        return (await db.execute(select(func.count('*')).select_from(SysDeptClosure))).scalar()
+
+    @classmethod
+    async def rebuild_dept_closure_dao(cls, db: AsyncSession, batch_size: int = 5000) -> int:
+        """
+        根据部门表的父部门id重建部门闭包表数据库操作
+
+        :param db: orm对象
+        :param batch_size: 每批写入的闭包关系数量
+        :return: 写入的闭包关系数量
+        """
+        parent_map = dict((await db.execute(select(SysDept.dept_id, SysDept.parent_id))).all())
+        ancestors_map: dict[int, list[int]] = {}
+        for dept_id in parent_map:
+            # 沿父部门向上查找至已计算过祖先的部门，父部门不存在或出现环时停止
+            chain = []
+            current_id = dept_id
+            while current_id in parent_map and current_id not in ancestors_map and current_id not in chain:
+                chain.append(current_id)
+                current_id = parent_map[current_id]
+            ancestors = ancestors_map.get(current_id, [])
+            for chain_id in reversed(chain):
+                ancestors = [chain_id, *ancestors]
+                ancestors_map[chain_id] = ancestors
+        await db.execute(delete(SysDeptClosure))
+        count = 0
+        batch = []
+        for dept_id, ancestors in ancestors_map.items():
+            batch.extend(
+                {'ancestor_id': ancestor_id, 'descendant_id': dept_id, 'depth': depth}
+                for depth, ancestor_id in enumerate(ancestors)
+            )
+            if len(batch) >= batch_size:
+                await db.execute(insert(SysDeptClosure), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            await db.execute(insert(SysDeptClosure), batch)
+            count += len(batch)
+
+        return count
+
     @classmethod
     async def update_dept_status_normal_dao(cls, db: AsyncSession, dept_id_list: list) -> None:
         """
@@ -271,7 +405,13 @@ class DeptDao:
             await db.execute(
                 select(func.count('*'))
                 .select_from(SysDept)
-                .where(SysDept.status == '0', SysDept.del_flag == '0', func.find_in_set(dept_id, SysDept.ancestors))
+                .join(SysDeptClosure, SysDeptClosure.descendant_id == SysDept.dept_id)
+                .where(
+                    SysDept.status == '0',
+                    SysDept.del_flag == '0',
+                    SysDeptClosure.ancestor_id == dept_id,
+                    SysDeptClosure.depth > 0,
+                )
             )
         ).scalar()
 
@@ -297,6 +437,28 @@ class DeptDao:
 
         return children_dept_count
 
+    @classmethod
+    async def get_dept_ids_in_data_scope(
+        cls, db: AsyncSession, dept_ids: Sequence[int], data_scope_sql: ColumnElement
+    ) -> set[int]:
+        """
+        从部门id列表中筛选出有数据权限的部门id
+
+        :param db: orm对象
+        :param dept_ids: 部门id列表
+        :param data_scope_sql: 数据权限对应的查询sql语句
+        :return: 有数据权限的部门id集合
+        """
+        if not dept_ids:
+            return set()
+        dept_id_list = (
+            await db.execute(
+                select(SysDept.dept_id).where(SysDept.del_flag == '0', SysDept.dept_id.in_(dept_ids), data_scope_sql)
+            )
+        ).scalars()
+
+        return set(dept_id_list)
+
     @classmethod
     async def count_dept_user_dao(cls, db: AsyncSession, dept_id: int) -> int | None:
         """
@@ -1,4 +1,4 @@
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
 from datetime import datetime, time
 from typing import Any
 
@@ -185,14 +185,15 @@ class DictDataDao:
 
     @classmethod
     async def get_dict_data_list(
-        cls, db: AsyncSession, query_object: DictDataPageQueryModel, is_page: bool = False
-    ) -> PageModel | list[dict[str, Any]]:
+        cls, db: AsyncSession, query_object: DictDataPageQueryModel, is_page: bool = False, is_stream: bool = False
+    ) -> PageModel | list[dict[str, Any]] | AsyncIterator[dict[str, Any]]:
         """
         根据查询参数获取字典数据列表信息
 
         :param db: orm对象
         :param query_object: 查询参数对象
         :param is_page: 是否开启分页
+        :param is_stream: 是否以异步数据流的形式逐条返回，用于导出
         :return: 字典数据列表信息对象
         """
         query = (
@@ -205,6 +206,8 @@ class DictDataDao:
             .order_by(SysDictData.dict_sort)
             .distinct()
         )
+        if is_stream:
+            return PageUtil.stream(db, query)
         dict_data_list: PageModel | list[dict[str, Any]] = await PageUtil.paginate(
             db, query, query_object.page_num, query_object.page_size, is_page
         )
@@ -1,9 +1,8 @@
 from datetime import datetime, time
 from typing import Any
 
-from sqlalchemy import delete, desc, select
+from sqlalchemy import delete, desc, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from common.vo import PageModel
 from module_admin.entity.do.job_do import SysJobLog
@@ -45,25 +44,29 @@ class JobLogDao:
             .distinct()
         )
         job_log_list: PageModel | list[dict[str, Any]] = await PageUtil.paginate(
-            db, query, query_object.page_num, query_object.page_size, is_page
+            db,
+            query,
+            query_object.page_num,
+            query_object.page_size,
+            is_page,
+            cursor=query_object.cursor,
+            cursor_columns=[SysJobLog.create_time, SysJobLog.job_log_id],
+            cursor_desc=True,
+            count_mode='approximate',
         )
 
         return job_log_list
 
     @classmethod
-    def add_job_log_dao(cls, db: Session, job_log: JobLogModel) -> SysJobLog:
+    async def add_job_log_batch_dao(cls, db: AsyncSession, job_log_list: list[JobLogModel]) -> None:
         """
-        新增定时任务日志数据库操作
+        批量新增定时任务日志数据库操作
 
         :param db: orm对象
-        :param job_log: 定时任务日志对象
+        :param job_log_list: 定时任务日志对象列表
         :return:
         """
-        db_job_log = SysJobLog(**job_log.model_dump())
-        db.add(db_job_log)
-        db.flush()
-
-        return db_job_log
+        await db.execute(insert(SysJobLog).values([item.model_dump(exclude={'job_log_id'}) for item in job_log_list]))
 
     @classmethod
     async def delete_job_log_dao(cls, db: AsyncSession, job_log: JobLogModel) -> None:
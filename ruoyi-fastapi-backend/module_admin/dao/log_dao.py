@@ -1,13 +1,14 @@
+from collections.abc import AsyncIterator
 from datetime import datetime, time
 from typing import Any
 
-from sqlalchemy import asc, delete, desc, select
+from sqlalchemy import asc, delete, desc, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common.vo import PageModel
 from module_admin.entity.do.log_do import SysLogininfor, SysOperLog
 from module_admin.entity.vo.log_vo import LogininforModel, LoginLogPageQueryModel, OperLogModel, OperLogPageQueryModel
-from utils.common_util import SnakeCaseUtil
+from utils.common_util import SnakeCaseUtil, SqlalchemyUtil
 from utils.page_util import PageUtil
 from utils.time_format_util import TimeFormatUtil
 
@@ -19,26 +20,26 @@ class OperationLogDao:
 
     @classmethod
     async def get_operation_log_list(
-        cls, db: AsyncSession, query_object: OperLogPageQueryModel, is_page: bool = False
-    ) -> PageModel | list[dict[str, Any]]:
+        cls, db: AsyncSession, query_object: OperLogPageQueryModel, is_page: bool = False, is_stream: bool = False
+    ) -> PageModel | list[dict[str, Any]] | AsyncIterator[dict[str, Any]]:
         """
         根据查询参数获取操作日志列表信息
 
         :param db: orm对象
         :param query_object: 查询参数对象
         :param is_page: 是否开启分页
+        :param is_stream: 是否以异步数据流的形式逐条返回，用于导出
         :return: 操作日志列表信息对象
         """
-        if query_object.is_asc == 'ascending':
-            order_by_column = asc(getattr(SysOperLog, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None))
-        elif query_object.is_asc == 'descending':
-            order_by_column = desc(
-                getattr(SysOperLog, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
-            )
-        else:
-            order_by_column = desc(SysOperLog.oper_time)
+        sort_column = SysOperLog.oper_time
+        is_desc = True
+        # 仅识别升序及降序两种排序方式，其余情况按默认排序
+        if query_object.is_asc in ('ascending', 'descending'):
+            sort_column = getattr(SysOperLog, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
+            is_desc = query_object.is_asc == 'descending'
+        order_by_column = desc(sort_column) if is_desc else asc(sort_column)
         query = (
-            select(SysOperLog)
+            select(*SqlalchemyUtil.get_model_columns(SysOperLog))
             .where(
                 SysOperLog.title.like(f'%{query_object.title}%') if query_object.title else True,
                 SysOperLog.oper_name.like(f'%{query_object.oper_name}%') if query_object.oper_name else True,
@@ -54,8 +55,18 @@ class OperationLogDao:
             .distinct()
             .order_by(order_by_column)
         )
+        if is_stream:
+            return PageUtil.stream(db, query)
         operation_log_list: PageModel | list[dict[str, Any]] = await PageUtil.paginate(
-            db, query, query_object.page_num, query_object.page_size, is_page
+            db,
+            query,
+            query_object.page_num,
+            query_object.page_size,
+            is_page,
+            cursor=query_object.cursor,
+            cursor_columns=[sort_column] if sort_column is SysOperLog.oper_id else [sort_column, SysOperLog.oper_id],
+            cursor_desc=is_desc,
+            count_mode='approximate',
         )
 
         return operation_log_list
@@ -75,6 +86,19 @@ class OperationLogDao:
 
         return db_operation_log
 
+    @classmethod
+    async def add_operation_log_batch_dao(cls, db: AsyncSession, operation_log_list: list[OperLogModel]) -> None:
+        """
+        批量新增操作日志数据库操作
+
+        :param db: orm对象
+        :param operation_log_list: 操作日志对象列表
+        :return:
+        """
+        await db.execute(
+            insert(SysOperLog).values([item.model_dump(exclude={'oper_id'}) for item in operation_log_list])
+        )
+
     @classmethod
     async def delete_operation_log_dao(cls, db: AsyncSession, operation_log: OperLogModel) -> None:
         """
@@ -114,18 +138,15 @@ class LoginLogDao:
         :param is_page: 是否开启分页
         :return: 登录日志列表信息对象
         """
-        if query_object.is_asc == 'ascending':
-            order_by_column = asc(
-                getattr(SysLogininfor, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
-            )
-        elif query_object.is_asc == 'descending':
-            order_by_column = desc(
-                getattr(SysLogininfor, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
-            )
-        else:
-            order_by_column = desc(SysLogininfor.login_time)
+        sort_column = SysLogininfor.login_time
+        is_desc = True
+        # 仅识别升序及降序两种排序方式，其余情况按默认排序
+        if query_object.is_asc in ('ascending', 'descending'):
+            sort_column = getattr(SysLogininfor, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
+            is_desc = query_object.is_asc == 'descending'
+        order_by_column = desc(sort_column) if is_desc else asc(sort_column)
         query = (
-            select(SysLogininfor)
+            select(*SqlalchemyUtil.get_model_columns(SysLogininfor))
             .where(
                 SysLogininfor.ipaddr.like(f'%{query_object.ipaddr}%') if query_object.ipaddr else True,
                 SysLogininfor.user_name.like(f'%{query_object.user_name}%') if query_object.user_name else True,
@@ -141,7 +162,17 @@ class LoginLogDao:
             .order_by(order_by_column)
         )
         login_log_list: PageModel | list[dict[str, Any]] = await PageUtil.paginate(
-            db, query, query_object.page_num, query_object.page_size, is_page
+            db,
+            query,
+            query_object.page_num,
+            query_object.page_size,
+            is_page,
+            cursor=query_object.cursor,
+            cursor_columns=[sort_column]
+            if sort_column is SysLogininfor.info_id
+            else [sort_column, SysLogininfor.info_id],
+            cursor_desc=is_desc,
+            count_mode='approximate',
         )
 
         return login_log_list
@@ -161,6 +192,19 @@ class LoginLogDao:
 
         return db_login_log
 
+    @classmethod
+    async def add_login_log_batch_dao(cls, db: AsyncSession, login_log_list: list[LogininforModel]) -> None:
+        """
+        批量新增登录日志数据库操作
+
+        :param db: orm对象
+        :param login_log_list: 登录日志对象列表
+        :return:
+        """
+        await db.execute(
+            insert(SysLogininfor).values([item.model_dump(exclude={'info_id'}) for item in login_log_list])
+        )
+
     @classmethod
     async def delete_login_log_dao(cls, db: AsyncSession, login_log: LogininforModel) -> None:
         """
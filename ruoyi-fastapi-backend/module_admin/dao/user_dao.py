@@ -1,12 +1,15 @@
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
 from datetime import datetime, time
 from typing import Any
 
-from sqlalchemy import ColumnElement, and_, delete, desc, func, or_, select, update
+from dateutil.parser import isoparse
+from sqlalchemy import ColumnElement, DateTime, and_, case, delete, desc, insert, null, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common.vo import PageModel
-from module_admin.entity.do.dept_do import SysDept
+from config.database import Base
+from config.env import DataBaseConfig
+from module_admin.entity.do.dept_do import SysDept, SysDeptClosure
 from module_admin.entity.do.menu_do import SysMenu
 from module_admin.entity.do.post_do import SysPost
 from module_admin.entity.do.role_do import SysRole, SysRoleMenu
@@ -19,6 +22,7 @@ from module_admin.entity.vo.user_vo import (
     UserRolePageQueryModel,
     UserRoleQueryModel,
 )
+from utils.common_util import SqlalchemyUtil
 from utils.page_util import PageUtil
 
 
@@ -89,103 +93,7 @@ class UserDao:
         :param user_id: 用户id
         :return: 当前user_id的用户信息对象
         """
-        query_user_basic_info = (
-            (
-                await db.execute(
-                    select(SysUser)
-                    .where(SysUser.status == '0', SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .distinct()
-                )
-            )
-            .scalars()
-            .first()
-        )
-        query_user_dept_info = (
-            (
-                await db.execute(
-                    select(SysDept)
-                    .select_from(SysUser)
-                    .where(SysUser.status == '0', SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(
-                        SysDept,
-                        and_(SysUser.dept_id == SysDept.dept_id, SysDept.status == '0', SysDept.del_flag == '0'),
-                    )
-                    .distinct()
-                )
-            )
-            .scalars()
-            .first()
-        )
-        query_user_role_info = (
-            (
-                await db.execute(
-                    select(SysRole)
-                    .select_from(SysUser)
-                    .where(SysUser.status == '0', SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(SysUserRole, SysUser.user_id == SysUserRole.user_id, isouter=True)
-                    .join(
-                        SysRole,
-                        and_(SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'),
-                    )
-                    .distinct()
-                )
-            )
-            .scalars()
-            .all()
-        )
-        query_user_post_info = (
-            (
-                await db.execute(
-                    select(SysPost)
-                    .select_from(SysUser)
-                    .where(SysUser.status == '0', SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(SysUserPost, SysUser.user_id == SysUserPost.user_id, isouter=True)
-                    .join(SysPost, and_(SysUserPost.post_id == SysPost.post_id, SysPost.status == '0'))
-                    .distinct()
-                )
-            )
-            .scalars()
-            .all()
-        )
-        role_id_list = [item.role_id for item in query_user_role_info]
-        if 1 in role_id_list:
-            query_user_menu_info = (
-                (await db.execute(select(SysMenu).where(SysMenu.status == '0').distinct())).scalars().all()
-            )
-        else:
-            query_user_menu_info = (
-                (
-                    await db.execute(
-                        select(SysMenu)
-                        .select_from(SysUser)
-                        .where(SysUser.status == '0', SysUser.del_flag == '0', SysUser.user_id == user_id)
-                        .join(SysUserRole, SysUser.user_id == SysUserRole.user_id, isouter=True)
-                        .join(
-                            SysRole,
-                            and_(
-                                SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'
-                            ),
-                            isouter=True,
-                        )
-                        .join(SysRoleMenu, SysRole.role_id == SysRoleMenu.role_id, isouter=True)
-                        .join(SysMenu, and_(SysRoleMenu.menu_id == SysMenu.menu_id, SysMenu.status == '0'))
-                        .order_by(SysMenu.order_num)
-                        .distinct()
-                    )
-                )
-                .scalars()
-                .all()
-            )
-
-        results = {
-            'user_basic_info': query_user_basic_info,
-            'user_dept_info': query_user_dept_info,
-            'user_role_info': query_user_role_info,
-            'user_post_info': query_user_post_info,
-            'user_menu_info': query_user_menu_info,
-        }
-
-        return results
+        return await cls._get_user_profile(db, user_id, only_normal=True, with_permission=True)
 
     @classmethod
     async def get_user_detail_by_id(cls, db: AsyncSession, user_id: int) -> dict[str, Any]:
@@ -196,92 +104,128 @@ class UserDao:
         :param user_id: 用户id
         :return: 当前user_id的用户信息对象
         """
-        query_user_basic_info = (
-            (await db.execute(select(SysUser).where(SysUser.del_flag == '0', SysUser.user_id == user_id).distinct()))
-            .scalars()
-            .first()
-        )
-        query_user_dept_info = (
-            (
-                await db.execute(
-                    select(SysDept)
-                    .select_from(SysUser)
-                    .where(SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(
-                        SysDept,
-                        and_(SysUser.dept_id == SysDept.dept_id, SysDept.status == '0', SysDept.del_flag == '0'),
-                    )
-                    .distinct()
-                )
+        return await cls._get_user_profile(db, user_id, only_normal=False, with_permission=False)
+
+    @classmethod
+    async def _get_user_profile(
+        cls, db: AsyncSession, user_id: int, only_normal: bool, with_permission: bool
+    ) -> dict[str, Any]:
+        """
+        通过一次查询获取用户基本信息、部门信息、角色信息、岗位信息及权限标识
+
+        角色、岗位及权限标识通过json数组聚合的关联子查询返回，超级管理员直接使用全部权限标识，不再查询菜单表
+
+        :param db: orm对象
+        :param user_id: 用户id
+        :param only_normal: 是否仅查询状态正常的用户
+        :param with_permission: 是否查询权限标识
+        :return: 当前user_id的用户信息对象
+        """
+        dialect_name = DataBaseConfig.db_type
+        normal_role_ids = (
+            select(SysUserRole.role_id)
+            .join(
+                SysRole,
+                and_(SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'),
             )
-            .scalars()
-            .first()
+            .where(SysUserRole.user_id == SysUser.user_id)
+            .correlate(SysUser)
         )
-        query_user_role_info = (
-            (
-                await db.execute(
-                    select(SysRole)
-                    .select_from(SysUser)
-                    .where(SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(SysUserRole, SysUser.user_id == SysUserRole.user_id, isouter=True)
-                    .join(
-                        SysRole,
-                        and_(SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'),
-                    )
-                    .distinct()
-                )
-            )
-            .scalars()
-            .all()
+        role_info = (
+            select(SqlalchemyUtil.json_array_agg(dialect_name, *SysRole.__table__.columns))
+            .where(SysRole.role_id.in_(normal_role_ids))
+            .scalar_subquery()
         )
-        query_user_post_info = (
-            (
-                await db.execute(
-                    select(SysPost)
-                    .select_from(SysUser)
-                    .where(SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(SysUserPost, SysUser.user_id == SysUserPost.user_id, isouter=True)
-                    .join(SysPost, and_(SysUserPost.post_id == SysPost.post_id, SysPost.status == '0'))
-                    .distinct()
+        post_info = (
+            select(SqlalchemyUtil.json_array_agg(dialect_name, *SysPost.__table__.columns))
+            .join(SysUserPost, SysUserPost.post_id == SysPost.post_id)
+            .where(SysUserPost.user_id == SysUser.user_id, SysPost.status == '0')
+            .scalar_subquery()
+        )
+        columns = [SysUser, SysDept, role_info, post_info]
+        if with_permission:
+            is_admin = normal_role_ids.where(SysUserRole.role_id == 1).exists()
+            permission_info = (
+                select(SqlalchemyUtil.json_array_agg(dialect_name, SysMenu.perms))
+                .where(
+                    SysMenu.status == '0',
+                    SysMenu.menu_id.in_(
+                        select(SysRoleMenu.menu_id).where(SysRoleMenu.role_id.in_(normal_role_ids)).distinct()
+                    ),
                 )
+                .scalar_subquery()
             )
-            .scalars()
-            .all()
-        )
-        query_user_menu_info = (
-            (
-                await db.execute(
-                    select(SysMenu)
-                    .select_from(SysUser)
-                    .where(SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(SysUserRole, SysUser.user_id == SysUserRole.user_id, isouter=True)
-                    .join(
-                        SysRole,
-                        and_(SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'),
-                        isouter=True,
-                    )
-                    .join(SysRoleMenu, SysRole.role_id == SysRoleMenu.role_id, isouter=True)
-                    .join(SysMenu, and_(SysRoleMenu.menu_id == SysMenu.menu_id, SysMenu.status == '0'))
-                    .distinct()
+            columns.append(case((is_admin, null()), else_=permission_info))
+        query_user = (
+            await db.execute(
+                select(*columns)
+                .outerjoin(
+                    SysDept,
+                    and_(SysUser.dept_id == SysDept.dept_id, SysDept.status == '0', SysDept.del_flag == '0'),
+                )
+                .where(
+                    SysUser.status == '0' if only_normal else True,
+                    SysUser.del_flag == '0',
+                    SysUser.user_id == user_id,
                 )
             )
-            .scalars()
-            .all()
-        )
+        ).first()
+        if query_user is None:
+            results = {
+                'user_basic_info': None,
+                'user_dept_info': None,
+                'user_role_info': [],
+                'user_post_info': [],
+            }
+            if with_permission:
+                results['user_permission_info'] = []
+            return results
+
+        user_role_info = cls._load_json_rows(SysRole, query_user[2])
         results = {
-            'user_basic_info': query_user_basic_info,
-            'user_dept_info': query_user_dept_info,
-            'user_role_info': query_user_role_info,
-            'user_post_info': query_user_post_info,
-            'user_menu_info': query_user_menu_info,
+            'user_basic_info': query_user[0],
+            'user_dept_info': query_user[1],
+            'user_role_info': user_role_info,
+            'user_post_info': cls._load_json_rows(SysPost, query_user[3]),
         }
+        if with_permission:
+            if 1 in [item.role_id for item in user_role_info]:
+                results['user_permission_info'] = ['*:*:*']
+            else:
+                results['user_permission_info'] = query_user[4] or []
 
         return results
 
+    @classmethod
+    def _load_json_rows(cls, model: type[Base], rows: list[dict[str, Any]] | None) -> list[Any]:
+        """
+        将json数组聚合查询的结果转换为对应的orm对象列表
+
+        :param model: orm模型
+        :param rows: json数组聚合查询的结果
+        :return: orm对象列表
+        """
+        if not rows:
+            return []
+        datetime_columns = [column.name for column in model.__table__.columns if isinstance(column.type, DateTime)]
+        instances = []
+        for row in rows:
+            for column_name in datetime_columns:
+                if isinstance(row.get(column_name), str):
+                    row[column_name] = isoparse(row[column_name])
+            instances.append(model(**row))
+
+        return instances
+
     @classmethod
     async def get_user_list(
-        cls, db: AsyncSession, query_object: UserPageQueryModel, data_scope_sql: ColumnElement, is_page: bool = False
-    ) -> PageModel | list[list[dict[str, Any]]]:
+        cls,
+        db: AsyncSession,
+        query_object: UserPageQueryModel,
+        data_scope_sql: ColumnElement,
+        is_page: bool = False,
+        is_stream: bool = False,
+    ) -> PageModel | list[list[dict[str, Any]]] | AsyncIterator[list[dict[str, Any]]]:
         """
         根据查询参数获取用户列表信息
 
@@ -289,17 +233,15 @@ class UserDao:
         :param query_object: 查询参数对象
         :param data_scope_sql: 数据权限对应的查询sql语句
         :param is_page: 是否开启分页
+        :param is_stream: 是否以异步数据流的形式逐条返回，用于导出
         :return: 用户列表信息对象
         """
         query = (
             select(SysUser, SysDept)
             .where(
                 SysUser.del_flag == '0',
-                or_(
-                    SysUser.dept_id == query_object.dept_id,
-                    SysUser.dept_id.in_(
-                        select(SysDept.dept_id).where(func.find_in_set(query_object.dept_id, SysDept.ancestors))
-                    ),
+                SysUser.dept_id.in_(
+                    select(SysDeptClosure.descendant_id).where(SysDeptClosure.ancestor_id == query_object.dept_id)
                 )
                 if query_object.dept_id
                 else True,
@@ -326,8 +268,17 @@ class UserDao:
             .order_by(SysUser.user_id)
             .distinct()
         )
+        if is_stream:
+            return PageUtil.stream(db, query)
         user_list: PageModel | list[list[dict[str, Any]]] = await PageUtil.paginate(
-            db, query, query_object.page_num, query_object.page_size, is_page
+            db,
+            query,
+            query_object.page_num,
+            query_object.page_size,
+            is_page,
+            cursor=query_object.cursor,
+            cursor_columns=[SysUser.user_id],
+            count_mode='cached',
         )
 
         return user_list
@@ -358,6 +309,74 @@ class UserDao:
         """
         await db.execute(update(SysUser), [user])
 
+    @classmethod
+    async def get_user_id_map_by_user_names(cls, db: AsyncSession, user_names: Sequence[str]) -> dict[str, int]:
+        """
+        根据用户账号列表批量获取用户id
+
+        :param db: orm对象
+        :param user_names: 用户账号列表
+        :return: 用户账号与用户id的映射
+        """
+        if not user_names:
+            return {}
+        user_id_list = (
+            await db.execute(
+                select(SysUser.user_name, SysUser.user_id).where(
+                    SysUser.del_flag == '0', SysUser.user_name.in_(user_names)
+                )
+            )
+        ).all()
+
+        return {row.user_name: row.user_id for row in user_id_list}
+
+    @classmethod
+    async def get_user_ids_in_data_scope(
+        cls, db: AsyncSession, user_ids: Sequence[int], data_scope_sql: ColumnElement
+    ) -> set[int]:
+        """
+        从用户id列表中筛选出有数据权限的用户id
+
+        :param db: orm对象
+        :param user_ids: 用户id列表
+        :param data_scope_sql: 数据权限对应的查询sql语句
+        :return: 有数据权限的用户id集合
+        """
+        if not user_ids:
+            return set()
+        user_id_list = (
+            await db.execute(
+                select(SysUser.user_id).where(SysUser.del_flag == '0', SysUser.user_id.in_(user_ids), data_scope_sql)
+            )
+        ).scalars()
+
+        return set(user_id_list)
+
+    @classmethod
+    async def add_user_batch_dao(cls, db: AsyncSession, user_list: list[dict[str, Any]]) -> None:
+        """
+        批量新增用户数据库操作
+
+        :param db: orm对象
+        :param user_list: 需要新增的用户字典列表，所有字典的键需保持一致
+        :return:
+        """
+        if user_list:
+            await db.execute(insert(SysUser), user_list)
+
+    @classmethod
+    async def edit_user_batch_dao(cls, db: AsyncSession, user_list: list[dict[str, Any]]) -> None:
+        """
+        根据用户id批量编辑用户数据库操作
+
+        :param db: orm对象
+        :param user_list: 需要更新的用户字典列表，需包含user_id，各字典仅需包含需要更新的字段
+        :return:
+        """
+        if user_list:
+            # 按更新字段组合排序，使字段组合相同的数据合并为一次批量更新
+            await db.execute(update(SysUser), sorted(user_list, key=lambda user: sorted(user)))
+
     @classmethod
     async def delete_user_dao(cls, db: AsyncSession, user: UserModel) -> None:
         """
@@ -120,6 +120,9 @@ class JobLogPageQueryModel(JobLogQueryModel):
 
     page_num: int = Field(default=1, description='当前页码')
     page_size: int = Field(default=10, description='每页记录数')
+    cursor: str | None = Field(
+        default=None, description='分页游标，传入时使用游标分页，首页传入空字符串，后续传入上一页返回的nextCursor'
+    )
 
 
 class DeleteJobLogModel(BaseModel):
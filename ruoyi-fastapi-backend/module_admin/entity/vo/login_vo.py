@@ -4,7 +4,6 @@ from pydantic import BaseModel, ConfigDict, Field, model_validator
 from pydantic.alias_generators import to_camel
 
 from exceptions.exception import ModelValidatorException
-from module_admin.entity.vo.menu_vo import MenuModel
 
 
 class UserLogin(BaseModel):
@@ -62,10 +61,6 @@ class SmsCode(BaseModel):
     message: str | None = Field(default=None, description='响应信息')
 
 
-class MenuTreeModel(MenuModel):
-    children: list['MenuTreeModel'] | None | None = Field(default=None, description='子菜单')
-
-
 class MetaModel(BaseModel):
     model_config = ConfigDict(alias_generator=to_camel)
 
@@ -28,6 +28,8 @@ class OnlineQueryModel(OnlineModel):
 
     begin_time: str | None = Field(default=None, description='开始时间')
     end_time: str | None = Field(default=None, description='结束时间')
+    page_num: int | None = Field(default=None, description='当前页码，为空时不分页')
+    page_size: int | None = Field(default=None, description='每页记录数，为空时不分页')
 
 
 class OnlinePageResponseModel(BaseModel):
@@ -64,3 +64,28 @@ class ServerMonitorModel(BaseModel):
     mem: MemoryInfo | None = Field(description='內存相关信息')
     sys: SysInfo | None = Field(description='服务器相关信息')
     sys_files: list[SysFiles] | None = Field(description='磁盘相关信息')
+
+
+class ServerMonitorHistoryQueryModel(BaseModel):
+    """
+    服务监控指标趋势查询模型
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel)
+
+    minutes: int = Field(default=60, ge=1, le=1440, description='查询最近多少分钟的指标')
+    max_points: int = Field(default=120, ge=1, le=1000, description='最多返回的数据点数，超过时按时间均分后取平均值')
+
+
+class ServerMonitorHistoryModel(BaseModel):
+    """
+    服务监控指标趋势对应pydantic模型
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel)
+
+    interval: float = Field(description='采样间隔（单位：秒）')
+    times: list[str] = Field(description='采样时间')
+    metrics: dict[str, list[float]] = Field(
+        description='各项指标值，包括cpuUsed、cpuSys、memUsage、diskUsage（使用率最高的磁盘）、processCpu、processRss（单位：字节）及loopLag（事件循环延迟，单位：毫秒）'
+    )
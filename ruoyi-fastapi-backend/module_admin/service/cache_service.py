@@ -4,6 +4,7 @@ from common.enums import RedisInitKeyConfig
 from common.vo import CrudResponseModel
 from config.get_redis import RedisUtil
 from module_admin.entity.vo.cache_vo import CacheInfoModel, CacheMonitorModel
+from utils.redis_key_util import RedisKeyUtil
 
 
 class CacheService:
@@ -57,7 +58,7 @@ class CacheService:
         :param cache_name: 缓存名称
         :return: 缓存键名列表信息
         """
-        cache_keys: list[str] = await request.app.state.redis.keys(f'{cache_name}*')
+        cache_keys = await RedisKeyUtil.get_keys(request.app.state.redis, f'{cache_name}:*')
         cache_key_list = [key.split(':', 1)[1] for key in cache_keys if key.startswith(f'{cache_name}:')]
 
         return cache_key_list
@@ -87,9 +88,7 @@ class CacheService:
         :param cache_name: 缓存名称
         :return: 操作缓存响应信息
         """
-        cache_keys = await request.app.state.redis.keys(f'{cache_name}*')
-        if cache_keys:
-            await request.app.state.redis.delete(*cache_keys)
+        await RedisKeyUtil.unlink_by_pattern(request.app.state.redis, f'{cache_name}*')
 
         return CrudResponseModel(is_success=True, message=f'{cache_name}对应键值清除成功')
 
@@ -102,9 +101,7 @@ class CacheService:
         :param cache_key: 缓存键名
         :return: 操作缓存响应信息
         """
-        cache_keys = await request.app.state.redis.keys(f'*{cache_key}')
-        if cache_keys:
-            await request.app.state.redis.delete(*cache_keys)
+        await RedisKeyUtil.unlink_by_pattern(request.app.state.redis, f'*{cache_key}')
 
         return CrudResponseModel(is_success=True, message=f'{cache_key}清除成功')
 
@@ -116,9 +113,7 @@ class CacheService:
         :param request: Request对象
         :return: 操作缓存响应信息
         """
-        cache_keys = await request.app.state.redis.keys()
-        if cache_keys:
-            await request.app.state.redis.delete(*cache_keys)
+        await RedisKeyUtil.unlink_by_pattern(request.app.state.redis, '*')
 
         await RedisUtil.init_sys_dict(request.app.state.redis)
         await RedisUtil.init_sys_config(request.app.state.redis)
@@ -12,6 +12,7 @@ from module_admin.dao.config_dao import ConfigDao
 from module_admin.entity.vo.config_vo import ConfigModel, ConfigPageQueryModel, DeleteConfigModel
 from utils.common_util import CamelCaseUtil
 from utils.excel_util import ExcelUtil
+from utils.redis_key_util import RedisKeyUtil
 
 
 class ConfigService:
@@ -44,11 +45,8 @@ class ConfigService:
         :param redis: redis对象
         :return:
         """
-        # 获取以sys_config:开头的键列表
-        keys = await redis.keys(f'{RedisInitKeyConfig.SYS_CONFIG.key}:*')
-        # 删除匹配的键
-        if keys:
-            await redis.delete(*keys)
+        # 删除以sys_config:开头的键
+        await RedisKeyUtil.unlink_by_pattern(redis, f'{RedisInitKeyConfig.SYS_CONFIG.key}:*')
         config_all = await ConfigDao.get_config_list(query_db, ConfigPageQueryModel(), is_page=False)
         for config_obj in config_all:
             await redis.set(
@@ -0,0 +1,130 @@
+import json
+from collections.abc import Sequence
+from datetime import timedelta
+
+from redis import asyncio as aioredis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.enums import RedisInitKeyConfig
+from config.env import JwtConfig
+from module_admin.entity.do.dept_do import SysDeptClosure
+from module_admin.entity.do.role_do import SysRoleDept
+from module_admin.entity.vo.role_vo import RoleModel
+from utils.cache_util import LRUCache
+
+
+class DataScopeService:
+    """
+    数据权限模块服务层
+
+    用户可见的部门范围仅取决于用户所属部门及用户角色的数据权限，因此以部门id及排序后的角色id、数据范围作为键，
+    分进程内LRU缓存及Redis缓存两级缓存可见部门id列表。缓存键中包含数据权限版本号，角色或部门变更时递增版本号，所有进程中的旧缓存随即失效。
+    """
+
+    DATA_SCOPE_CUSTOM = '2'
+    DATA_SCOPE_DEPT = '3'
+    DATA_SCOPE_DEPT_AND_CHILD = '4'
+    DEPT_DATA_SCOPES = (DATA_SCOPE_CUSTOM, DATA_SCOPE_DEPT, DATA_SCOPE_DEPT_AND_CHILD)
+    VERSION_KEY = f'{RedisInitKeyConfig.DATA_SCOPE_VERSION.key}:global'
+    # 可见部门数量超过该值时不再缓存部门id列表，由调用方改用子查询
+    max_dept_ids = 1000
+    local_cache = LRUCache(maxsize=1024)
+
+    @classmethod
+    def get_scope_key(cls, dept_id: int | None, role: Sequence[RoleModel | None]) -> str:
+        """
+        获取部门及角色列表对应的缓存键
+
+        :param dept_id: 用户所属部门id
+        :param role: 用户角色列表信息
+        :return: 部门id及排序去重后的角色id、数据范围拼接而成的缓存键
+        """
+        role_keys = sorted(
+            {f'{item.role_id}-{item.data_scope}' for item in role if item and item.data_scope in cls.DEPT_DATA_SCOPES}
+        )
+        return f'{dept_id}:{",".join(role_keys)}'
+
+    @classmethod
+    async def get_data_scope_dept_ids_services(
+        cls, redis: aioredis.Redis, query_db: AsyncSession, dept_id: int | None, role: Sequence[RoleModel | None]
+    ) -> tuple[int, ...] | None:
+        """
+        获取用户角色数据权限范围内可见的部门id列表service，依次从进程内缓存、Redis缓存及数据库中获取
+
+        :param redis: redis对象
+        :param query_db: orm对象
+        :param dept_id: 用户所属部门id
+        :param role: 用户角色列表信息
+        :return: 排序后的可见部门id列表，可见部门数量超过max_dept_ids时返回None
+        """
+        version = await redis.get(cls.VERSION_KEY) or '0'
+        cache_key = f'{RedisInitKeyConfig.DATA_SCOPE.key}:{version}:{cls.get_scope_key(dept_id, role)}'
+        cache_item = cls.local_cache.get(cache_key)
+        if cache_item is not None:
+            return cache_item[0]
+        cache_value = await redis.get(cache_key)
+        if cache_value:
+            dept_ids = json.loads(cache_value).get('deptIds')
+            dept_ids = tuple(dept_ids) if dept_ids is not None else None
+        else:
+            dept_ids = await cls._query_data_scope_dept_ids(query_db, dept_id, role)
+            await redis.set(
+                cache_key,
+                json.dumps({'deptIds': dept_ids}),
+                ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
+            )
+        cls.local_cache.set(cache_key, (dept_ids,))
+
+        return dept_ids
+
+    @classmethod
+    async def clear_data_scope_cache_services(cls, redis: aioredis.Redis) -> None:
+        """
+        角色或部门变更后递增数据权限版本号，使所有可见部门缓存失效service
+
+        :param redis: redis对象
+        :return:
+        """
+        await redis.incr(cls.VERSION_KEY)
+        cls.local_cache.clear()
+
+    @classmethod
+    async def _query_data_scope_dept_ids(
+        cls, query_db: AsyncSession, dept_id: int | None, role: Sequence[RoleModel | None]
+    ) -> tuple[int, ...] | None:
+        """
+        从数据库中查询用户角色数据权限范围内可见的部门id列表
+
+        :param query_db: orm对象
+        :param dept_id: 用户所属部门id
+        :param role: 用户角色列表信息
+        :return: 排序后的可见部门id列表，可见部门数量超过max_dept_ids时返回None
+        """
+        data_scopes = {item.data_scope for item in role if item}
+        dept_ids = set()
+        custom_role_ids = [item.role_id for item in role if item and item.data_scope == cls.DATA_SCOPE_CUSTOM]
+        if custom_role_ids:
+            dept_ids.update(
+                (
+                    await query_db.execute(
+                        select(SysRoleDept.dept_id).where(SysRoleDept.role_id.in_(custom_role_ids)).distinct()
+                    )
+                )
+                .scalars()
+                .all()
+            )
+        if dept_id is not None and cls.DATA_SCOPE_DEPT_AND_CHILD in data_scopes:
+            dept_ids.update(
+                (
+                    await query_db.execute(
+                        select(SysDeptClosure.descendant_id).where(SysDeptClosure.ancestor_id == dept_id)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+        elif dept_id is not None and cls.DATA_SCOPE_DEPT in data_scopes:
+            dept_ids.add(dept_id)
+
+        return tuple(sorted(dept_ids)) if len(dept_ids) <= cls.max_dept_ids else None
@@ -1,7 +1,9 @@
 from collections.abc import Sequence
 from typing import Any
 
+from fastapi import Request
 from sqlalchemy import ColumnElement
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common.constant import CommonConstant
@@ -9,8 +11,12 @@ from common.vo import CrudResponseModel
 from exceptions.exception import ServiceException, ServiceWarning
 from module_admin.dao.dept_dao import DeptDao
 from module_admin.entity.do.dept_do import SysDept
-from module_admin.entity.vo.dept_vo import DeleteDeptModel, DeptModel, DeptTreeModel
+from module_admin.entity.vo.dept_vo import DeleteDeptModel, DeptModel
+from module_admin.service.data_scope_service import DataScopeService
+from module_admin.service.user_cache_service import UserCacheService
 from utils.common_util import CamelCaseUtil
+from utils.log_util import logger
+from utils.tree_util import TreeUtil
 
 
 class DeptService:
@@ -31,8 +37,7 @@ class DeptService:
         :return: 部门树信息对象
         """
         dept_list_result = await DeptDao.get_dept_list_for_tree(query_db, page_object, data_scope_sql)
-        dept_tree_model_result = cls.list_to_tree(dept_list_result)
-        dept_tree_result = [dept.model_dump(exclude_unset=True, by_alias=True) for dept in dept_tree_model_result]
+        dept_tree_result = cls.list_to_tree(dept_list_result)
 
         return dept_tree_result
 
@@ -103,10 +108,13 @@ class DeptService:
         return CommonConstant.UNIQUE
 
     @classmethod
-    async def add_dept_services(cls, query_db: AsyncSession, page_object: DeptModel) -> CrudResponseModel:
+    async def add_dept_services(
+        cls, request: Request, query_db: AsyncSession, page_object: DeptModel
+    ) -> CrudResponseModel:
         """
         新增部门信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 新增部门对象
         :return: 新增部门校验结果
@@ -118,18 +126,23 @@ class DeptService:
             raise ServiceException(message=f'部门{parent_info.dept_name}停用，不允许新增')
         page_object.ancestors = f'{parent_info.ancestors},{page_object.parent_id}'
         try:
-            await DeptDao.add_dept_dao(query_db, page_object)
+            add_dept = await DeptDao.add_dept_dao(query_db, page_object)
+            await DeptDao.add_dept_closure_dao(query_db, add_dept.dept_id, page_object.parent_id)
             await query_db.commit()
+            await DataScopeService.clear_data_scope_cache_services(request.app.state.redis)
             return CrudResponseModel(is_success=True, message='新增成功')
         except Exception as e:
             await query_db.rollback()
             raise e
 
     @classmethod
-    async def edit_dept_services(cls, query_db: AsyncSession, page_object: DeptModel) -> CrudResponseModel:
+    async def edit_dept_services(
+        cls, request: Request, query_db: AsyncSession, page_object: DeptModel
+    ) -> CrudResponseModel:
         """
         编辑部门信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑部门对象
         :return: 编辑部门校验结果
@@ -145,12 +158,21 @@ class DeptService:
             raise ServiceException(message=f'修改部门{page_object.dept_name}失败，该部门包含未停用的子部门')
         new_parent_dept = await DeptDao.get_dept_by_id(query_db, page_object.parent_id)
         old_dept = await DeptDao.get_dept_by_id(query_db, page_object.dept_id)
+        if (
+            new_parent_dept
+            and old_dept
+            and new_parent_dept.dept_id != old_dept.parent_id
+            and await DeptDao.is_descendant_dept_dao(query_db, page_object.dept_id, new_parent_dept.dept_id)
+        ):
+            raise ServiceException(message=f'修改部门{page_object.dept_name}失败，上级部门不能是自己的子部门')
         try:
             if new_parent_dept and old_dept:
                 new_ancestors = f'{new_parent_dept.ancestors},{new_parent_dept.dept_id}'
                 old_ancestors = old_dept.ancestors
                 page_object.ancestors = new_ancestors
-                await cls.update_dept_children(query_db, page_object.dept_id, new_ancestors, old_ancestors)
+                await cls.update_dept_children(
+                    query_db, page_object.dept_id, new_parent_dept.dept_id, new_ancestors, old_ancestors
+                )
             edit_dept = page_object.model_dump(exclude_unset=True)
             await DeptDao.edit_dept_dao(query_db, edit_dept)
             if (
@@ -160,16 +182,21 @@ class DeptService:
             ):
                 await cls.update_parent_dept_status_normal(query_db, page_object)
             await query_db.commit()
+            await UserCacheService.clear_all_user_cache_services(request.app.state.redis)
+            await DataScopeService.clear_data_scope_cache_services(request.app.state.redis)
             return CrudResponseModel(is_success=True, message='更新成功')
         except Exception as e:
             await query_db.rollback()
             raise e
 
     @classmethod
-    async def delete_dept_services(cls, query_db: AsyncSession, page_object: DeleteDeptModel) -> CrudResponseModel:
+    async def delete_dept_services(
+        cls, request: Request, query_db: AsyncSession, page_object: DeleteDeptModel
+    ) -> CrudResponseModel:
         """
         删除部门信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除部门对象
         :return: 删除部门校验结果
@@ -185,6 +212,8 @@ class DeptService:
 
                     await DeptDao.delete_dept_dao(query_db, DeptModel(deptId=dept_id))
                 await query_db.commit()
+                await UserCacheService.clear_all_user_cache_services(request.app.state.redis)
+                await DataScopeService.clear_data_scope_cache_services(request.app.state.redis)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -207,35 +236,28 @@ class DeptService:
         return result
 
     @classmethod
-    def list_to_tree(cls, permission_list: Sequence[SysDept]) -> list[DeptTreeModel]:
+    def list_to_tree(cls, permission_list: Sequence[SysDept]) -> list[dict[str, Any]]:
         """
         工具方法：根据部门列表信息生成树形嵌套数据
 
         :param permission_list: 部门列表信息
         :return: 部门树形嵌套数据
         """
-        _permission_list = [
-            DeptTreeModel(id=item.dept_id, label=item.dept_name, parentId=item.parent_id) for item in permission_list
-        ]
-        # 转成id为key的字典
-        mapping: dict[int, DeptTreeModel] = dict(zip([i.id for i in _permission_list], _permission_list, strict=False))
-
-        # 树容器
-        container: list[DeptTreeModel] = []
-
-        for d in _permission_list:
-            # 如果找不到父级项，则是根节点
-            parent = mapping.get(d.parent_id)
-            if parent is None:
-                container.append(d)
-            else:
-                children: list[DeptTreeModel] = parent.children
-                if not children:
-                    children = []
-                children.append(d)
-                parent.children = children
-
-        return container
+        return TreeUtil.list_to_tree(permission_list, cls._get_tree_node, 'dept_id')
+
+    @classmethod
+    def _get_tree_node(cls, item: SysDept, children: list[dict[str, Any]] | None) -> dict[str, Any]:
+        """
+        工具方法：生成部门树节点，无子节点时不返回children
+
+        :param item: 部门信息
+        :param children: 子节点列表
+        :return: 部门树节点
+        """
+        node = {'id': item.dept_id, 'label': item.dept_name, 'parentId': item.parent_id}
+        if children:
+            node['children'] = children
+        return node
 
     @classmethod
     async def replace_first(cls, original_str: str, old_str: str, new_str: str) -> str:
@@ -265,17 +287,21 @@ class DeptService:
 
     @classmethod
     async def update_dept_children(
-        cls, query_db: AsyncSession, dept_id: int, new_ancestors: str, old_ancestors: str
+        cls, query_db: AsyncSession, dept_id: int, parent_id: int, new_ancestors: str, old_ancestors: str
     ) -> None:
         """
-        更新子部门信息
+        更新子部门信息，祖级列表变更时同步更新当前部门及其子部门的闭包关系
 
         :param query_db: orm对象
         :param dept_id: 部门id
+        :param parent_id: 新的父部门id
         :param new_ancestors: 新的祖先
         :param old_ancestors: 旧的祖先
         :return:
         """
+        if new_ancestors == old_ancestors:
+            return
+        await DeptDao.move_dept_closure_dao(query_db, dept_id, parent_id)
         children = await DeptDao.get_children_dept_dao(query_db, dept_id)
         update_children = []
         for child in children:
@@ -283,3 +309,36 @@ class DeptService:
             update_children.append({'dept_id': child.dept_id, 'ancestors': child_ancestors})
         if children:
             await DeptDao.update_dept_children_dao(query_db, update_children)
+
+    @classmethod
+    async def rebuild_dept_closure_services(cls, query_db: AsyncSession) -> int:
+        """
+        根据部门表重建部门闭包表service
+
+        :param query_db: orm对象
+        :return: 写入的闭包关系数量
+        """
+        try:
+            count = await DeptDao.rebuild_dept_closure_dao(query_db)
+            await query_db.commit()
+            return count
+        except Exception as e:
+            await query_db.rollback()
+            raise e
+
+    @classmethod
+    async def init_dept_closure_services(cls, query_db: AsyncSession) -> None:
+        """
+        应用初始化：部门闭包表为空时根据部门表回填service
+
+        :param query_db: orm对象
+        :return:
+        """
+        if await DeptDao.count_dept_closure_dao(query_db):
+            return
+        try:
+            count = await cls.rebuild_dept_closure_services(query_db)
+            logger.info(f'✅️ 部门闭包表回填成功，共写入{count}条闭包关系')
+        except IntegrityError:
+            # 多个进程同时启动时，由其中一个进程完成回填
+            logger.info('部门闭包表已由其他进程回填')
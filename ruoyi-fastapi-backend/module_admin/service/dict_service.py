@@ -1,6 +1,6 @@
 import json
-from collections.abc import Sequence
-from typing import Any
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from typing import IO, Any
 
 from fastapi import Request
 from redis import asyncio as aioredis
@@ -21,7 +21,8 @@ from module_admin.entity.vo.dict_vo import (
     DictTypePageQueryModel,
 )
 from utils.common_util import CamelCaseUtil
-from utils.excel_util import ExcelUtil
+from utils.excel_util import ExcelUtil, ExportFormat
+from utils.redis_key_util import RedisKeyUtil
 
 
 class DictTypeService:
@@ -229,17 +230,22 @@ class DictDataService:
 
     @classmethod
     async def get_dict_data_list_services(
-        cls, query_db: AsyncSession, query_object: DictDataPageQueryModel, is_page: bool = False
-    ) -> PageModel | list[dict[str, Any]]:
+        cls,
+        query_db: AsyncSession,
+        query_object: DictDataPageQueryModel,
+        is_page: bool = False,
+        is_stream: bool = False,
+    ) -> PageModel | list[dict[str, Any]] | AsyncIterator[dict[str, Any]]:
         """
         获取字典数据列表信息service
 
         :param query_db: orm对象
         :param query_object: 查询参数对象
         :param is_page: 是否开启分页
+        :param is_stream: 是否以异步数据流的形式逐条返回，用于导出
         :return: 字典数据列表信息对象
         """
-        dict_data_list_result = await DictDataDao.get_dict_data_list(query_db, query_object, is_page)
+        dict_data_list_result = await DictDataDao.get_dict_data_list(query_db, query_object, is_page, is_stream)
 
         return dict_data_list_result
 
@@ -265,11 +271,8 @@ class DictDataService:
         :param redis: redis对象
         :return:
         """
-        # 获取以sys_dict:开头的键列表
-        keys = await redis.keys(f'{RedisInitKeyConfig.SYS_DICT.key}:*')
-        # 删除匹配的键
-        if keys:
-            await redis.delete(*keys)
+        # 删除以sys_dict:开头的键
+        await RedisKeyUtil.unlink_by_pattern(redis, f'{RedisInitKeyConfig.SYS_DICT.key}:*')
         dict_type_all = await DictTypeDao.get_all_dict_type(query_db)
         for dict_type_obj in [item for item in dict_type_all if item.status == '0']:
             dict_type = dict_type_obj.dict_type
@@ -425,12 +428,15 @@ class DictDataService:
         return result
 
     @staticmethod
-    async def export_dict_data_list_services(dict_data_list: list) -> bytes:
+    async def export_dict_data_list_services(
+        dict_data_list: AsyncIterable[dict[str, Any]], export_format: ExportFormat = 'xlsx'
+    ) -> IO[bytes]:
         """
         导出字典数据信息service
 
-        :param dict_data_list: 字典数据信息列表
-        :return: 字典数据信息对应excel的二进制数据
+        :param dict_data_list: 字典数据信息异步数据流
+        :param export_format: 导出格式
+        :return: 字典数据信息对应的导出文件
         """
         # 创建一个映射字典，将英文键映射到中文键
         mapping_dict = {
@@ -450,15 +456,18 @@ class DictDataService:
             'remark': '备注',
         }
 
-        for item in dict_data_list:
-            if item.get('status') == '0':
-                item['status'] = '正常'
-            else:
-                item['status'] = '停用'
-            if item.get('isDefault') == 'Y':
-                item['isDefault'] = '是'
-            else:
-                item['isDefault'] = '否'
-        binary_data = ExcelUtil.export_list2excel(dict_data_list, mapping_dict)
-
-        return binary_data
+        async def transform_dict_data_list() -> AsyncIterator[dict[str, Any]]:
+            async for item in dict_data_list:
+                if item.get('status') == '0':
+                    item['status'] = '正常'
+                else:
+                    item['status'] = '停用'
+                if item.get('isDefault') == 'Y':
+                    item['isDefault'] = '是'
+                else:
+                    item['isDefault'] = '否'
+                yield item
+
+        export_file = await ExcelUtil.export_stream2file(transform_dict_data_list(), mapping_dict, export_format)
+
+        return export_file
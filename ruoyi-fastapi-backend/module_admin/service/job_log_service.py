@@ -2,7 +2,6 @@ from typing import Any
 
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from common.vo import CrudResponseModel, PageModel
 from module_admin.dao.job_log_dao import JobLogDao
@@ -33,23 +32,23 @@ class JobLogService:
         return job_log_list_result
 
     @classmethod
-    def add_job_log_services(cls, query_db: Session, page_object: JobLogModel) -> CrudResponseModel:
+    async def add_job_log_batch_services(
+        cls, query_db: AsyncSession, job_log_list: list[JobLogModel]
+    ) -> CrudResponseModel:
         """
-        新增定时任务日志信息service
+        批量新增定时任务日志信息service
 
         :param query_db: orm对象
-        :param page_object: 新增定时任务日志对象
-        :return: 新增定时任务日志校验结果
+        :param job_log_list: 新增定时任务日志对象列表
+        :return: 批量新增定时任务日志校验结果
         """
         try:
-            JobLogDao.add_job_log_dao(query_db, page_object)
-            query_db.commit()
-            result = {'is_success': True, 'message': '新增成功'}
+            await JobLogDao.add_job_log_batch_dao(query_db, job_log_list)
+            await query_db.commit()
+            return CrudResponseModel(is_success=True, message='新增成功')
         except Exception as e:
-            query_db.rollback()
-            result = {'is_success': False, 'message': str(e)}
-
-        return CrudResponseModel(**result)
+            await query_db.rollback()
+            raise e
 
     @classmethod
     async def delete_job_log_services(cls, query_db: AsyncSession, page_object: DeleteJobLogModel) -> CrudResponseModel:
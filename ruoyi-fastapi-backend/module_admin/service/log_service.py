@@ -1,4 +1,5 @@
-from typing import Any
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import IO, Any
 
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,7 +17,7 @@ from module_admin.entity.vo.log_vo import (
     UnlockUser,
 )
 from module_admin.service.dict_service import DictDataService
-from utils.excel_util import ExcelUtil
+from utils.excel_util import ExcelUtil, ExportFormat
 
 
 class OperationLogService:
@@ -26,17 +27,20 @@ class OperationLogService:
 
     @classmethod
     async def get_operation_log_list_services(
-        cls, query_db: AsyncSession, query_object: OperLogPageQueryModel, is_page: bool = False
-    ) -> PageModel | list[dict[str, Any]]:
+        cls, query_db: AsyncSession, query_object: OperLogPageQueryModel, is_page: bool = False, is_stream: bool = False
+    ) -> PageModel | list[dict[str, Any]] | AsyncIterator[dict[str, Any]]:
         """
         获取操作日志列表信息service
 
         :param query_db: orm对象
         :param query_object: 查询参数对象
         :param is_page: 是否开启分页
+        :param is_stream: 是否以异步数据流的形式逐条返回，用于导出
         :return: 操作日志列表信息对象
         """
-        operation_log_list_result = await OperationLogDao.get_operation_log_list(query_db, query_object, is_page)
+        operation_log_list_result = await OperationLogDao.get_operation_log_list(
+            query_db, query_object, is_page, is_stream
+        )
 
         return operation_log_list_result
 
@@ -57,6 +61,25 @@ class OperationLogService:
             await query_db.rollback()
             raise e
 
+    @classmethod
+    async def add_operation_log_batch_services(
+        cls, query_db: AsyncSession, operation_log_list: list[OperLogModel]
+    ) -> CrudResponseModel:
+        """
+        批量新增操作日志service
+
+        :param query_db: orm对象
+        :param operation_log_list: 新增操作日志对象列表
+        :return: 批量新增操作日志校验结果
+        """
+        try:
+            await OperationLogDao.add_operation_log_batch_dao(query_db, operation_log_list)
+            await query_db.commit()
+            return CrudResponseModel(is_success=True, message='新增成功')
+        except Exception as e:
+            await query_db.rollback()
+            raise e
+
     @classmethod
     async def delete_operation_log_services(
         cls, query_db: AsyncSession, page_object: DeleteOperLogModel
@@ -98,13 +121,19 @@ class OperationLogService:
             raise e
 
     @classmethod
-    async def export_operation_log_list_services(cls, request: Request, operation_log_list: list) -> bytes:
+    async def export_operation_log_list_services(
+        cls,
+        request: Request,
+        operation_log_list: AsyncIterable[dict[str, Any]],
+        export_format: ExportFormat = 'xlsx',
+    ) -> IO[bytes]:
         """
         导出操作日志信息service
 
         :param request: Request对象
-        :param operation_log_list: 操作日志信息列表
-        :return: 操作日志信息对应excel的二进制数据
+        :param operation_log_list: 操作日志信息异步数据流
+        :param export_format: 导出格式
+        :return: 操作日志信息对应的导出文件
         """
         # 创建一个映射字典，将英文键映射到中文键
         mapping_dict = {
@@ -134,16 +163,19 @@ class OperationLogService:
         ]
         operation_type_option_dict = {item.get('value'): item for item in operation_type_option}
 
-        for item in operation_log_list:
-            if item.get('status') == 0:
-                item['status'] = '成功'
-            else:
-                item['status'] = '失败'
-            if str(item.get('businessType')) in operation_type_option_dict:
-                item['businessType'] = operation_type_option_dict.get(str(item.get('businessType'))).get('label')
-        binary_data = ExcelUtil.export_list2excel(operation_log_list, mapping_dict)
+        async def transform_operation_log_list() -> AsyncIterator[dict[str, Any]]:
+            async for item in operation_log_list:
+                if item.get('status') == 0:
+                    item['status'] = '成功'
+                else:
+                    item['status'] = '失败'
+                if str(item.get('businessType')) in operation_type_option_dict:
+                    item['businessType'] = operation_type_option_dict.get(str(item.get('businessType'))).get('label')
+                yield item
 
-        return binary_data
+        export_file = await ExcelUtil.export_stream2file(transform_operation_log_list(), mapping_dict, export_format)
+
+        return export_file
 
 
 class LoginLogService:
@@ -184,6 +216,25 @@ class LoginLogService:
             await query_db.rollback()
             raise e
 
+    @classmethod
+    async def add_login_log_batch_services(
+        cls, query_db: AsyncSession, login_log_list: list[LogininforModel]
+    ) -> CrudResponseModel:
+        """
+        批量新增登录日志service
+
+        :param query_db: orm对象
+        :param login_log_list: 新增登录日志对象列表
+        :return: 批量新增登录日志校验结果
+        """
+        try:
+            await LoginLogDao.add_login_log_batch_dao(query_db, login_log_list)
+            await query_db.commit()
+            return CrudResponseModel(is_success=True, message='新增成功')
+        except Exception as e:
+            await query_db.rollback()
+            raise e
+
     @classmethod
     async def delete_login_log_services(
         cls, query_db: AsyncSession, page_object: DeleteLoginLogModel
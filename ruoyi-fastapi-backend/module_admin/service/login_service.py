@@ -18,17 +18,21 @@ from config.env import AppConfig, JwtConfig
 from config.get_db import get_db
 from exceptions.exception import AuthException, LoginException, ServiceException
 from module_admin.dao.login_dao import login_by_account
+from module_admin.dao.menu_dao import MenuDao
 from module_admin.dao.user_dao import UserDao
 from module_admin.entity.do.dept_do import SysDept
 from module_admin.entity.do.menu_do import SysMenu
 from module_admin.entity.do.user_do import SysUser
-from module_admin.entity.vo.login_vo import MenuTreeModel, MetaModel, RouterModel, SmsCode, UserLogin, UserRegister
-from module_admin.entity.vo.user_vo import AddUserModel, CurrentUserModel, ResetUserModel, TokenData, UserInfoModel
+from module_admin.entity.vo.login_vo import MetaModel, RouterModel, SmsCode, UserLogin, UserRegister
+from module_admin.entity.vo.user_vo import AddUserModel, CurrentUserModel, ResetUserModel, TokenData
+from module_admin.service.online_service import OnlineService
+from module_admin.service.router_cache_service import RouterCacheService
+from module_admin.service.user_cache_service import UserCacheService
 from module_admin.service.user_service import UserService
-from utils.common_util import CamelCaseUtil
 from utils.log_util import logger
 from utils.message_util import message_service
 from utils.pwd_util import PwdUtil
+from utils.tree_util import TreeUtil
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='login')
 
@@ -105,7 +109,10 @@ class LoginService:
         if not user:
             logger.warning('用户不存在')
             raise LoginException(data='', message='用户不存在')
-        if not PwdUtil.verify_password(login_user.password, user[0].password):
+        password_verified, new_password_hash = await PwdUtil.verify_and_update_password(
+            login_user.password, user[0].password
+        )
+        if not password_verified:
             cache_password_error_count = await request.app.state.redis.get(
                 f'{RedisInitKeyConfig.PASSWORD_ERROR_COUNT.key}:{login_user.user_name}'
             )
@@ -135,6 +142,16 @@ class LoginService:
             logger.warning('用户已停用')
             raise LoginException(data='', message='用户已停用')
         await request.app.state.redis.delete(f'{RedisInitKeyConfig.PASSWORD_ERROR_COUNT.key}:{login_user.user_name}')
+        if new_password_hash:
+            # 密码计算成本配置变更后，使用新的计算成本重新加密密码并立即提交
+            try:
+                await UserDao.edit_user_dao(query_db, {'user_id': user[0].user_id, 'password': new_password_hash})
+                await query_db.commit()
+                await UserCacheService.clear_user_cache_services(request.app.state.redis, [user[0].user_id])
+            except Exception as e:
+                # 重新加密失败不影响本次登录，下次登录时会再次尝试
+                await query_db.rollback()
+                logger.warning(f'用户{user[0].user_name}的密码重新加密失败，详细错误信息：{e}')
         return user
 
     @classmethod
@@ -217,58 +234,46 @@ class LoginService:
         except InvalidTokenError as e:
             logger.warning('用户token已失效，请重新登录')
             raise AuthException(data='', message='用户token已失效，请重新登录') from e
-        query_user = await UserDao.get_user_by_id(query_db, user_id=token_data.user_id)
-        if query_user.get('user_basic_info') is None:
+        redis = request.app.state.redis
+        # 不允许账号同时登录时以用户id作为会话编号，此方法可实现同一账号同一时间只能登录一次
+        token_id = session_id if AppConfig.app_same_time_login else str(token_data.user_id)
+        # 令牌、会话信息、密码策略配置及用户信息缓存版本通过一次mget获取
+        (
+            redis_token,
+            online_session,
+            init_password_is_modify,
+            password_validate_days,
+            *user_cache_versions,
+        ) = await redis.mget(
+            f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}',
+            f'{RedisInitKeyConfig.ONLINE_SESSION.key}:{token_id}',
+            f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.initPasswordModify',
+            f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.passwordValidateDays',
+            *UserCacheService.get_version_keys(token_data.user_id),
+        )
+        current_user = await UserCacheService.get_current_user_services(
+            redis, query_db, token_data.user_id, user_cache_versions
+        )
+        if current_user is None:
             logger.warning('用户token不合法')
             raise AuthException(data='', message='用户token不合法')
-        if AppConfig.app_same_time_login:
-            redis_token = await request.app.state.redis.get(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}')
-        else:
-            # 此方法可实现同一账号同一时间只能登录一次
-            redis_token = await request.app.state.redis.get(
-                f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{query_user.get("user_basic_info").user_id}'
-            )
         if token == redis_token:
-            if AppConfig.app_same_time_login:
-                await request.app.state.redis.set(
-                    f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}',
-                    redis_token,
-                    ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
-                )
-            else:
-                await request.app.state.redis.set(
-                    f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{query_user.get("user_basic_info").user_id}',
-                    redis_token,
-                    ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
-                )
-
-            role_id_list = [item.role_id for item in query_user.get('user_role_info')]
-            if 1 in role_id_list:  # noqa: SIM108
-                permissions = ['*:*:*']
-            else:
-                permissions = [row.perms for row in query_user.get('user_menu_info')]
-            post_ids = ','.join([str(row.post_id) for row in query_user.get('user_post_info')])
-            role_ids = ','.join([str(row.role_id) for row in query_user.get('user_role_info')])
-            roles = [row.role_key for row in query_user.get('user_role_info')]
-            is_default_modify_pwd = await cls.__init_password_is_modify(
-                request, query_user.get('user_basic_info').pwd_update_date
+            await OnlineService.renew_online_session_services(
+                redis,
+                token_id,
+                redis_token,
+                online_session,
+                timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
             )
-            is_password_expired = await cls.__password_is_expired(
-                request, query_user.get('user_basic_info').pwd_update_date
-            )
-
-            current_user = CurrentUserModel(
-                permissions=permissions,
-                roles=roles,
-                user=UserInfoModel(
-                    **CamelCaseUtil.transform_result(query_user.get('user_basic_info')),
-                    postIds=post_ids,
-                    roleIds=role_ids,
-                    dept=CamelCaseUtil.transform_result(query_user.get('user_dept_info')),
-                    role=CamelCaseUtil.transform_result(query_user.get('user_role_info')),
-                ),
-                isDefaultModifyPwd=is_default_modify_pwd,
-                isPasswordExpired=is_password_expired,
+            current_user = current_user.model_copy(
+                update={
+                    'is_default_modify_pwd': cls.__init_password_is_modify(
+                        init_password_is_modify, current_user.user.pwd_update_date
+                    ),
+                    'is_password_expired': cls.__password_is_expired(
+                        password_validate_days, current_user.user.pwd_update_date
+                    ),
+                }
             )
             # 设置当前用户信息到上下文
             RequestContext.set_current_user(current_user)
@@ -277,31 +282,25 @@ class LoginService:
         raise AuthException(data='', message='用户token已失效，请重新登录')
 
     @classmethod
-    async def __init_password_is_modify(cls, request: Request, pwd_update_date: datetime) -> bool:
+    def __init_password_is_modify(cls, init_password_is_modify: str | None, pwd_update_date: datetime) -> bool:
         """
         判断当前用户是否初始密码登录
 
-        :param request: Request对象
+        :param init_password_is_modify: 参数配置中的初始密码修改策略
         :param pwd_update_date: 密码最后更新时间
         :return: 是否初始密码登录
         """
-        init_password_is_modify = await request.app.state.redis.get(
-            f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.initPasswordModify'
-        )
         return init_password_is_modify == '1' and pwd_update_date is None
 
     @classmethod
-    async def __password_is_expired(cls, request: Request, pwd_update_date: datetime) -> bool:
+    def __password_is_expired(cls, password_validate_days: str | None, pwd_update_date: datetime) -> bool:
         """
         判断当前用户密码是否过期
 
-        :param request: Request对象
+        :param password_validate_days: 参数配置中的密码有效天数
         :param pwd_update_date: 密码最后更新时间
         :return: 密码是否过期
         """
-        password_validate_days = await request.app.state.redis.get(
-            f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.passwordValidateDays'
-        )
         if password_validate_days and int(password_validate_days) > 0:
             if pwd_update_date is None:
                 return True
@@ -311,79 +310,65 @@ class LoginService:
         return False
 
     @classmethod
-    async def get_current_user_routers(cls, user_id: int, query_db: AsyncSession) -> list[dict[str, Any]]:
+    async def get_current_user_routers(
+        cls, request: Request, current_user: CurrentUserModel, query_db: AsyncSession
+    ) -> tuple[str, list[dict[str, Any]]]:
         """
-        根据用户id获取当前用户路由信息
+        根据当前用户信息获取当前用户路由信息，路由信息按用户角色缓存
 
-        :param user_id: 用户id
+        :param request: Request对象
+        :param current_user: 当前用户对象
         :param query_db: orm对象
-        :return: 当前用户路由信息对象
-        """
-        query_user = await UserDao.get_user_by_id(query_db, user_id=user_id)
-        user_router_menu = sorted(
-            [
-                row
-                for row in query_user.get('user_menu_info')
-                if row.menu_type in [MenuConstant.TYPE_DIR, MenuConstant.TYPE_MENU]
-            ],
-            key=lambda x: x.order_num,
-        )
-        menus = cls.__generate_menus(0, user_router_menu)
-        user_router = cls.__generate_user_router_menu(menus)
-        return [router.model_dump(exclude_unset=True, by_alias=True) for router in user_router]
-
-    @classmethod
-    def __generate_menus(cls, pid: int, permission_list: list[SysMenu]) -> list[MenuTreeModel]:
+        :return: 当前用户路由信息的ETag及路由信息对象
         """
-        工具方法：根据菜单信息生成菜单信息树形嵌套数据
 
-        :param pid: 菜单id
-        :param permission_list: 菜单列表信息
-        :return: 菜单信息树形嵌套数据
-        """
-        menu_list: list[MenuTreeModel] = []
-        for permission in permission_list:
-            if permission.parent_id == pid:
-                children = cls.__generate_menus(permission.menu_id, permission_list)
-                menu_list_data = MenuTreeModel(**CamelCaseUtil.transform_result(permission))
-                if children:
-                    menu_list_data.children = children
-                menu_list.append(menu_list_data)
+        async def build_user_routers() -> list[dict[str, Any]]:
+            menu_list = await MenuDao.get_menu_list_for_tree(
+                query_db, current_user.user.user_id, current_user.user.role
+            )
+            user_router_menu = sorted(
+                [row for row in menu_list if row.menu_type in [MenuConstant.TYPE_DIR, MenuConstant.TYPE_MENU]],
+                key=lambda x: x.order_num,
+            )
+            user_router = TreeUtil.list_to_tree(
+                user_router_menu, cls.__generate_user_router, 'menu_id', root_parent_id=0
+            )
+            return [router.model_dump(exclude_unset=True, by_alias=True) for router in user_router]
 
-        return menu_list
+        return await RouterCacheService.get_user_routers_services(
+            request.app.state.redis, current_user.user.role, build_user_routers
+        )
 
     @classmethod
-    def __generate_user_router_menu(cls, permission_list: list[MenuTreeModel]) -> list[RouterModel]:
-        """
-        工具方法：根据菜单树信息生成路由信息树形嵌套数据
-
-        :param permission_list: 菜单树列表信息
-        :return: 路由信息树形嵌套数据
-        """
-        router_list: list[RouterModel] = []
-        for permission in permission_list:
-            router = RouterModel(
-                hidden=permission.visible == '1',
-                name=RouterUtil.get_router_name(permission),
-                path=RouterUtil.get_router_path(permission),
-                component=RouterUtil.get_component(permission),
-                query=permission.query,
-                meta=MetaModel(
-                    title=permission.menu_name,
-                    icon=permission.icon,
-                    noCache=permission.is_cache == 1,
-                    link=permission.path if RouterUtil.is_http(permission.path) else None,
-                ),
-            )
-            c_menus = permission.children
-            if c_menus and permission.menu_type == MenuConstant.TYPE_DIR:
-                router.always_show = True
-                router.redirect = 'noRedirect'
-                router.children = cls.__generate_user_router_menu(c_menus)
-            elif RouterUtil.is_menu_frame(permission):
-                router.meta = None
-                children_list: list[RouterModel] = []
-                children = RouterModel(
+    def __generate_user_router(cls, permission: SysMenu, children: list[RouterModel] | None) -> RouterModel:
+        """
+        工具方法：根据菜单信息及已生成的子路由生成路由信息
+
+        :param permission: 菜单信息
+        :param children: 子菜单对应的路由信息
+        :return: 路由信息
+        """
+        router = RouterModel(
+            hidden=permission.visible == '1',
+            name=RouterUtil.get_router_name(permission),
+            path=RouterUtil.get_router_path(permission),
+            component=RouterUtil.get_component(permission),
+            query=permission.query,
+            meta=MetaModel(
+                title=permission.menu_name,
+                icon=permission.icon,
+                noCache=permission.is_cache == 1,
+                link=permission.path if RouterUtil.is_http(permission.path) else None,
+            ),
+        )
+        if children and permission.menu_type == MenuConstant.TYPE_DIR:
+            router.always_show = True
+            router.redirect = 'noRedirect'
+            router.children = children
+        elif RouterUtil.is_menu_frame(permission):
+            router.meta = None
+            router.children = [
+                RouterModel(
                     path=permission.path,
                     component=permission.component,
                     name=RouterUtil.get_route_name(permission.route_name, permission.path),
@@ -395,15 +380,13 @@ class LoginService:
                     ),
                     query=permission.query,
                 )
-                children_list.append(children)
-                router.children = children_list
-            elif permission.parent_id == 0 and RouterUtil.is_inner_link(permission):
-                router.meta = MetaModel(title=permission.menu_name, icon=permission.icon)
-                router.path = '/'
-                children_list: list[RouterModel] = []
-                router_path = RouterUtil.inner_link_replace_each(permission.path)
-                children = RouterModel(
-                    path=router_path,
+            ]
+        elif permission.parent_id == 0 and RouterUtil.is_inner_link(permission):
+            router.meta = MetaModel(title=permission.menu_name, icon=permission.icon)
+            router.path = '/'
+            router.children = [
+                RouterModel(
+                    path=RouterUtil.inner_link_replace_each(permission.path),
                     component=MenuConstant.INNER_LINK,
                     name=RouterUtil.get_route_name(permission.route_name, permission.path),
                     meta=MetaModel(
@@ -412,12 +395,9 @@ class LoginService:
                         link=permission.path if RouterUtil.is_http(permission.path) else None,
                     ),
                 )
-                children_list.append(children)
-                router.children = children_list
-
-            router_list.append(router)
+            ]
 
-        return router_list
+        return router
 
     @classmethod
     async def register_user_services(
@@ -451,7 +431,7 @@ class LoginService:
                 add_user = AddUserModel(
                     userName=user_register.username,
                     nickName=user_register.username,
-                    password=PwdUtil.get_password_hash(user_register.password),
+                    password=await PwdUtil.get_password_hash_async(user_register.password),
                     pwdUpdateDate=datetime.now(),
                 )
                 result = await UserService.add_user_services(query_db, add_user)
@@ -502,9 +482,9 @@ class LoginService:
             f'{RedisInitKeyConfig.SMS_CODE.key}:{forget_user.session_id}'
         )
         if forget_user.sms_code == redis_sms_result:
-            forget_user.password = PwdUtil.get_password_hash(forget_user.password)
+            forget_user.password = await PwdUtil.get_password_hash_async(forget_user.password)
             forget_user.user_id = (await UserDao.get_user_by_name(query_db, forget_user.user_name)).user_id
-            edit_result = await UserService.reset_user_services(query_db, forget_user)
+            edit_result = await UserService.reset_user_services(request, query_db, forget_user)
             result = edit_result.dict()
         elif not redis_sms_result:
             result = {'is_success': False, 'message': '短信验证码已过期'}
@@ -523,7 +503,7 @@ class LoginService:
         :param token_id: 令牌编号
         :return: 退出登录结果
         """
-        await request.app.state.redis.delete(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}')
+        await OnlineService.delete_online_session_services(request.app.state.redis, [token_id])
         # await request.app.state.redis.delete(f'{current_user.user.user_id}_access_token')
         # await request.app.state.redis.delete(f'{current_user.user.user_id}_session_id')
 
@@ -536,7 +516,7 @@ class RouterUtil:
     """
 
     @classmethod
-    def get_router_name(cls, menu: MenuTreeModel) -> str:
+    def get_router_name(cls, menu: SysMenu) -> str:
         """
         获取路由名称
 
@@ -562,7 +542,7 @@ class RouterUtil:
         return router_name.capitalize()
 
     @classmethod
-    def get_router_path(cls, menu: MenuTreeModel) -> str | None:
+    def get_router_path(cls, menu: SysMenu) -> str | None:
         """
         获取路由地址
 
@@ -582,7 +562,7 @@ class RouterUtil:
         return router_path
 
     @classmethod
-    def get_component(cls, menu: MenuTreeModel) -> str:
+    def get_component(cls, menu: SysMenu) -> str:
         """
         获取组件信息
 
@@ -599,7 +579,7 @@ class RouterUtil:
         return component
 
     @classmethod
-    def is_menu_frame(cls, menu: MenuTreeModel) -> bool:
+    def is_menu_frame(cls, menu: SysMenu) -> bool:
         """
         判断是否为菜单内部跳转
 
@@ -611,7 +591,7 @@ class RouterUtil:
         )
 
     @classmethod
-    def is_inner_link(cls, menu: MenuTreeModel) -> bool:
+    def is_inner_link(cls, menu: SysMenu) -> bool:
         """
         判断是否为内链组件
 
@@ -621,7 +601,7 @@ class RouterUtil:
         return menu.is_frame == MenuConstant.NO_FRAME and cls.is_http(menu.path)
 
     @classmethod
-    def is_parent_view(cls, menu: MenuTreeModel) -> bool:
+    def is_parent_view(cls, menu: SysMenu) -> bool:
         """
         判断是否为parent_view组件
 
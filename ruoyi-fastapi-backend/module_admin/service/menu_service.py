@@ -1,6 +1,7 @@
 from collections.abc import Sequence
 from typing import Any
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common.constant import CommonConstant, MenuConstant
@@ -9,11 +10,14 @@ from exceptions.exception import ServiceException, ServiceWarning
 from module_admin.dao.menu_dao import MenuDao
 from module_admin.dao.role_dao import RoleDao
 from module_admin.entity.do.menu_do import SysMenu
-from module_admin.entity.vo.menu_vo import DeleteMenuModel, MenuModel, MenuQueryModel, MenuTreeModel
+from module_admin.entity.vo.menu_vo import DeleteMenuModel, MenuModel, MenuQueryModel
 from module_admin.entity.vo.role_vo import RoleMenuQueryModel
 from module_admin.entity.vo.user_vo import CurrentUserModel
+from module_admin.service.router_cache_service import RouterCacheService
+from module_admin.service.user_cache_service import UserCacheService
 from utils.common_util import CamelCaseUtil
 from utils.string_util import StringUtil
+from utils.tree_util import TreeUtil
 
 
 class MenuService:
@@ -35,8 +39,7 @@ class MenuService:
         menu_list_result = await MenuDao.get_menu_list_for_tree(
             query_db, current_user.user.user_id, current_user.user.role
         )
-        menu_tree_model_result = cls.list_to_tree(menu_list_result)
-        menu_tree_result = [menu.model_dump(exclude_unset=True, by_alias=True) for menu in menu_tree_model_result]
+        menu_tree_result = cls.list_to_tree(menu_list_result)
 
         return menu_tree_result
 
@@ -97,10 +100,13 @@ class MenuService:
         return CommonConstant.UNIQUE
 
     @classmethod
-    async def add_menu_services(cls, query_db: AsyncSession, page_object: MenuModel) -> CrudResponseModel:
+    async def add_menu_services(
+        cls, request: Request, query_db: AsyncSession, page_object: MenuModel
+    ) -> CrudResponseModel:
         """
         新增菜单信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 新增菜单对象
         :return: 新增菜单校验结果
@@ -112,16 +118,20 @@ class MenuService:
         try:
             await MenuDao.add_menu_dao(query_db, page_object)
             await query_db.commit()
+            await RouterCacheService.clear_router_cache_services(request.app.state.redis)
             return CrudResponseModel(is_success=True, message='新增成功')
         except Exception as e:
             await query_db.rollback()
             raise e
 
     @classmethod
-    async def edit_menu_services(cls, query_db: AsyncSession, page_object: MenuModel) -> CrudResponseModel:
+    async def edit_menu_services(
+        cls, request: Request, query_db: AsyncSession, page_object: MenuModel
+    ) -> CrudResponseModel:
         """
         编辑菜单信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑部门对象
         :return: 编辑菜单校验结果
@@ -138,6 +148,8 @@ class MenuService:
             try:
                 await MenuDao.edit_menu_dao(query_db, edit_menu)
                 await query_db.commit()
+                await UserCacheService.clear_all_user_cache_services(request.app.state.redis)
+                await RouterCacheService.clear_router_cache_services(request.app.state.redis)
                 return CrudResponseModel(is_success=True, message='更新成功')
             except Exception as e:
                 await query_db.rollback()
@@ -146,10 +158,13 @@ class MenuService:
             raise ServiceException(message='菜单不存在')
 
     @classmethod
-    async def delete_menu_services(cls, query_db: AsyncSession, page_object: DeleteMenuModel) -> CrudResponseModel:
+    async def delete_menu_services(
+        cls, request: Request, query_db: AsyncSession, page_object: DeleteMenuModel
+    ) -> CrudResponseModel:
         """
         删除菜单信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除菜单对象
         :return: 删除菜单校验结果
@@ -164,6 +179,8 @@ class MenuService:
                         raise ServiceWarning(message='菜单已分配,不允许删除')
                     await MenuDao.delete_menu_dao(query_db, MenuModel(menuId=menu_id))
                 await query_db.commit()
+                await UserCacheService.clear_all_user_cache_services(request.app.state.redis)
+                await RouterCacheService.clear_router_cache_services(request.app.state.redis)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -186,32 +203,25 @@ class MenuService:
         return result
 
     @classmethod
-    def list_to_tree(cls, permission_list: Sequence[SysMenu]) -> list[MenuTreeModel]:
+    def list_to_tree(cls, permission_list: Sequence[SysMenu]) -> list[dict[str, Any]]:
         """
         工具方法：根据菜单列表信息生成树形嵌套数据
 
         :param permission_list: 菜单列表信息
         :return: 菜单树形嵌套数据
         """
-        _permission_list = [
-            MenuTreeModel(id=item.menu_id, label=item.menu_name, parentId=item.parent_id) for item in permission_list
-        ]
-        # 转成id为key的字典
-        mapping: dict[int, MenuTreeModel] = dict(zip([i.id for i in _permission_list], _permission_list, strict=False))
-
-        # 树容器
-        container: list[MenuTreeModel] = []
-
-        for d in _permission_list:
-            # 如果找不到父级项，则是根节点
-            parent = mapping.get(d.parent_id)
-            if parent is None:
-                container.append(d)
-            else:
-                children: list[MenuTreeModel] = parent.children
-                if not children:
-                    children = []
-                children.append(d)
-                parent.children = children
-
-        return container
+        return TreeUtil.list_to_tree(permission_list, cls._get_tree_node, 'menu_id')
+
+    @classmethod
+    def _get_tree_node(cls, item: SysMenu, children: list[dict[str, Any]] | None) -> dict[str, Any]:
+        """
+        工具方法：生成菜单树节点，无子节点时不返回children
+
+        :param item: 菜单信息
+        :param children: 子节点列表
+        :return: 菜单树节点
+        """
+        node = {'id': item.menu_id, 'label': item.menu_name, 'parentId': item.parent_id}
+        if children:
+            node['children'] = children
+        return node
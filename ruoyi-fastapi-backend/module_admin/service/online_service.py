@@ -1,23 +1,34 @@
+import json
+from collections.abc import Sequence
+from datetime import timedelta
 from typing import Any
 
 import jwt
 from fastapi import Request
+from redis import asyncio as aioredis
 
 from common.enums import RedisInitKeyConfig
 from common.vo import CrudResponseModel
-from config.env import AppConfig, JwtConfig
+from config.env import JwtConfig
 from exceptions.exception import ServiceException
-from module_admin.entity.vo.online_vo import DeleteOnlineModel, OnlineQueryModel
-from utils.common_util import CamelCaseUtil
+from module_admin.entity.vo.online_vo import DeleteOnlineModel, OnlinePageResponseModel, OnlineQueryModel
+from utils.redis_key_util import RedisKeyUtil
 
 
 class OnlineService:
     """
     在线用户管理模块服务层
+
+    每个会话除登录令牌外，还会保存一份已解析的会话信息（json字符串），并维护以下索引：
+    按过期时间排序的全部会话索引，以及按登录名称、登录地址筛选的会话索引，获取在线用户列表时无需遍历键空间及解析令牌。
     """
 
+    filter_fields = ('user_name', 'ipaddr')
+
     @classmethod
-    async def get_online_list_services(cls, request: Request, query_object: OnlineQueryModel) -> list[dict[str, Any]]:
+    async def get_online_list_services(
+        cls, request: Request, query_object: OnlineQueryModel
+    ) -> OnlinePageResponseModel:
         """
         获取在线用户表信息service
 
@@ -25,41 +36,30 @@ class OnlineService:
         :param query_object: 查询参数对象
         :return: 在线用户列表信息
         """
-        access_token_keys = await request.app.state.redis.keys(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}*')
-        if not access_token_keys:
-            access_token_keys = []
-        access_token_values_list = [await request.app.state.redis.get(key) for key in access_token_keys]
-        online_info_list = []
-        for item in access_token_values_list:
-            payload = jwt.decode(item, JwtConfig.jwt_secret_key, algorithms=[JwtConfig.jwt_algorithm])
-            online_dict = {
-                'token_id': payload.get('session_id') if AppConfig.app_same_time_login else payload.get('user_id'),
-                'user_name': payload.get('user_name'),
-                'dept_name': payload.get('dept_name'),
-                'ipaddr': payload.get('login_info').get('ipaddr'),
-                'login_location': payload.get('login_info').get('loginLocation'),
-                'browser': payload.get('login_info').get('browser'),
-                'os': payload.get('login_info').get('os'),
-                'login_time': payload.get('login_info').get('loginTime'),
-            }
-            if query_object.user_name and not query_object.ipaddr:
-                if query_object.user_name == payload.get('user_name'):
-                    online_info_list = [online_dict]
-                    break
-            elif not query_object.user_name and query_object.ipaddr:
-                if query_object.ipaddr == payload.get('login_info').get('ipaddr'):
-                    online_info_list = [online_dict]
-                    break
-            elif query_object.user_name and query_object.ipaddr:
-                if query_object.user_name == payload.get('user_name') and query_object.ipaddr == payload.get(
-                    'login_info'
-                ).get('ipaddr'):
-                    online_info_list = [online_dict]
-                    break
-            else:
-                online_info_list.append(online_dict)
-
-        return CamelCaseUtil.transform_result(online_info_list)
+        redis = request.app.state.redis
+        offset = 0
+        limit = None
+        if query_object.page_num and query_object.page_size:
+            offset = (query_object.page_num - 1) * query_object.page_size
+            limit = query_object.page_size
+        filter_keys = [
+            cls._get_filter_index_key(field, getattr(query_object, field))
+            for field in cls.filter_fields
+            if getattr(query_object, field)
+        ]
+        if filter_keys:
+            token_ids = sorted(await redis.sinter(filter_keys))
+            online_info_list = await cls._get_online_sessions(redis, token_ids, filter_keys)
+            online_info_list.sort(key=lambda item: item.get('loginTime') or '', reverse=True)
+            total = len(online_info_list)
+            online_info_list = online_info_list[offset : offset + limit if limit is not None else None]
+        else:
+            total, token_ids = await RedisKeyUtil.get_index_page(
+                redis, RedisInitKeyConfig.ONLINE_SESSION.key, offset, limit
+            )
+            online_info_list = await cls._get_online_sessions(redis, token_ids)
+
+        return OnlinePageResponseModel(rows=online_info_list, total=total)
 
     @classmethod
     async def delete_online_services(cls, request: Request, page_object: DeleteOnlineModel) -> CrudResponseModel:
@@ -72,7 +72,206 @@ class OnlineService:
         """
         if page_object.token_ids:
             token_id_list = page_object.token_ids.split(',')
-            for token_id in token_id_list:
-                await request.app.state.redis.delete(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}')
+            await cls.delete_online_session_services(request.app.state.redis, token_id_list)
             return CrudResponseModel(is_success=True, message='强退成功')
         raise ServiceException(message='传入session_id为空')
+
+    @classmethod
+    async def add_online_session_services(
+        cls, redis: aioredis.Redis, token_id: str, access_token: str, session_info: dict[str, Any], ex: timedelta
+    ) -> None:
+        """
+        保存登录令牌及会话信息，并加入在线用户索引service
+
+        :param redis: redis对象
+        :param token_id: 会话编号
+        :param access_token: 登录令牌
+        :param session_info: 登录令牌中的会话信息，包括user_name、dept_name及login_info
+        :param ex: 过期时间
+        :return:
+        """
+        login_info = session_info.get('login_info') or {}
+        online_session = {
+            'tokenId': token_id,
+            'userName': session_info.get('user_name'),
+            'deptName': session_info.get('dept_name'),
+            'ipaddr': login_info.get('ipaddr'),
+            'loginLocation': login_info.get('loginLocation'),
+            'browser': login_info.get('browser'),
+            'os': login_info.get('os'),
+            'loginTime': login_info.get('loginTime'),
+        }
+        filter_keys = cls._get_session_filter_index_keys(online_session)
+        # 不允许账号同时登录时会覆盖同一会话编号的会话，需将其移出原登录地址等不再匹配的筛选索引
+        previous_session = await redis.get(f'{RedisInitKeyConfig.ONLINE_SESSION.key}:{token_id}')
+        stale_filter_keys = (
+            set(cls._get_session_filter_index_keys(json.loads(previous_session))) - set(filter_keys)
+            if previous_session
+            else set()
+        )
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}', access_token, ex=ex)
+            pipe.set(
+                f'{RedisInitKeyConfig.ONLINE_SESSION.key}:{token_id}',
+                json.dumps(online_session, ensure_ascii=False),
+                ex=ex,
+            )
+            RedisKeyUtil.add_to_index(pipe, RedisInitKeyConfig.ONLINE_SESSION.key, token_id, ex)
+            for filter_key in stale_filter_keys:
+                pipe.srem(filter_key, token_id)
+            for filter_key in filter_keys:
+                pipe.sadd(filter_key, token_id)
+                pipe.expire(filter_key, ex)
+            await pipe.execute()
+
+    @classmethod
+    async def renew_online_session_services(
+        cls,
+        redis: aioredis.Redis,
+        token_id: str,
+        access_token: str,
+        online_session: str | None,
+        ex: timedelta,
+    ) -> None:
+        """
+        滑动续期登录令牌，同时续期会话信息、在线用户索引及会话筛选索引，保证活跃用户不会从在线用户列表中消失service
+
+        :param redis: redis对象
+        :param token_id: 会话编号
+        :param access_token: 登录令牌
+        :param online_session: 会话信息（json字符串），不存在时仅续期登录令牌
+        :param ex: 过期时间
+        :return:
+        """
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}', access_token, ex=ex)
+            if online_session:
+                pipe.expire(f'{RedisInitKeyConfig.ONLINE_SESSION.key}:{token_id}', ex)
+                RedisKeyUtil.add_to_index(pipe, RedisInitKeyConfig.ONLINE_SESSION.key, token_id, ex)
+                for filter_key in cls._get_session_filter_index_keys(json.loads(online_session)):
+                    pipe.expire(filter_key, ex)
+            await pipe.execute()
+
+    @classmethod
+    async def delete_online_session_services(cls, redis: aioredis.Redis, token_ids: Sequence[str]) -> None:
+        """
+        删除登录令牌及会话信息，并移出在线用户索引service
+
+        :param redis: redis对象
+        :param token_ids: 会话编号列表
+        :return:
+        """
+        if not token_ids:
+            return
+        online_sessions = await RedisKeyUtil.mget(
+            redis, [f'{RedisInitKeyConfig.ONLINE_SESSION.key}:{token_id}' for token_id in token_ids]
+        )
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.unlink(
+                *[f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}' for token_id in token_ids],
+                *[f'{RedisInitKeyConfig.ONLINE_SESSION.key}:{token_id}' for token_id in token_ids],
+            )
+            RedisKeyUtil.remove_from_index(pipe, RedisInitKeyConfig.ONLINE_SESSION.key, token_ids)
+            for token_id, online_session in zip(token_ids, online_sessions, strict=True):
+                if online_session:
+                    for filter_key in cls._get_session_filter_index_keys(json.loads(online_session)):
+                        pipe.srem(filter_key, token_id)
+            await pipe.execute()
+
+    @classmethod
+    async def init_online_session_services(cls, redis: aioredis.Redis) -> int:
+        """
+        应用初始化：为没有会话信息的登录令牌补全会话信息及在线用户索引service
+
+        :param redis: redis对象
+        :return: 补全的会话数量
+        """
+        access_token_keys = await RedisKeyUtil.get_keys(redis, f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:*')
+        token_ids = [key.split(':', 1)[1] for key in access_token_keys]
+        online_sessions = await RedisKeyUtil.mget(
+            redis, [f'{RedisInitKeyConfig.ONLINE_SESSION.key}:{token_id}' for token_id in token_ids]
+        )
+        missing_token_ids = [
+            token_id for token_id, online_session in zip(token_ids, online_sessions, strict=True) if not online_session
+        ]
+        access_tokens = await RedisKeyUtil.mget(
+            redis, [f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}' for token_id in missing_token_ids]
+        )
+        count = 0
+        for token_id, access_token in zip(missing_token_ids, access_tokens, strict=True):
+            ttl = await redis.ttl(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}')
+            if not access_token or ttl <= 0:
+                continue
+            try:
+                payload = jwt.decode(access_token, JwtConfig.jwt_secret_key, algorithms=[JwtConfig.jwt_algorithm])
+            except jwt.InvalidTokenError:
+                continue
+            await cls.add_online_session_services(redis, token_id, access_token, payload, timedelta(seconds=ttl))
+            count += 1
+
+        return count
+
+    @classmethod
+    async def _get_online_sessions(
+        cls, redis: aioredis.Redis, token_ids: Sequence[str], filter_keys: Sequence[str] = ()
+    ) -> list[dict[str, Any]]:
+        """
+        批量获取会话信息，并将已失效的会话移出在线用户索引及本次查询使用的筛选索引，
+        会话信息与筛选索引不再匹配（如会话被覆盖后登录地址已变更）时将其移出不匹配的筛选索引，且不返回该会话
+
+        :param redis: redis对象
+        :param token_ids: 会话编号列表
+        :param filter_keys: 本次查询使用的会话筛选索引名称列表
+        :return: 会话信息列表
+        """
+        online_sessions = await RedisKeyUtil.mget(
+            redis, [f'{RedisInitKeyConfig.ONLINE_SESSION.key}:{token_id}' for token_id in token_ids]
+        )
+        online_info_list = []
+        expired_token_ids = []
+        mismatched_filter_keys: dict[str, list[str]] = {}
+        for token_id, online_session in zip(token_ids, online_sessions, strict=True):
+            if not online_session:
+                expired_token_ids.append(token_id)
+                continue
+            online_info = json.loads(online_session)
+            session_filter_keys = set(cls._get_session_filter_index_keys(online_info))
+            mismatched_keys = [filter_key for filter_key in filter_keys if filter_key not in session_filter_keys]
+            if mismatched_keys:
+                for filter_key in mismatched_keys:
+                    mismatched_filter_keys.setdefault(filter_key, []).append(token_id)
+                continue
+            online_info_list.append(online_info)
+        if expired_token_ids or mismatched_filter_keys:
+            async with redis.pipeline(transaction=False) as pipe:
+                if expired_token_ids:
+                    RedisKeyUtil.remove_from_index(pipe, RedisInitKeyConfig.ONLINE_SESSION.key, expired_token_ids)
+                    for filter_key in filter_keys:
+                        pipe.srem(filter_key, *expired_token_ids)
+                for filter_key, mismatched_token_ids in mismatched_filter_keys.items():
+                    pipe.srem(filter_key, *mismatched_token_ids)
+                await pipe.execute()
+
+        return online_info_list
+
+    @classmethod
+    def _get_filter_index_key(cls, field: str, value: str) -> str:
+        """
+        获取会话筛选索引名称
+
+        :param field: 筛选字段
+        :param value: 筛选值
+        :return: 会话筛选索引名称
+        """
+        return f'{RedisKeyUtil.get_index_key(RedisInitKeyConfig.ONLINE_SESSION.key)}:{field}:{value}'
+
+    @classmethod
+    def _get_session_filter_index_keys(cls, online_session: dict[str, Any]) -> list[str]:
+        """
+        获取会话所属的全部筛选索引名称
+
+        :param online_session: 会话信息
+        :return: 会话筛选索引名称列表
+        """
+        values = {'user_name': online_session.get('userName'), 'ipaddr': online_session.get('ipaddr')}
+        return [cls._get_filter_index_key(field, value) for field, value in values.items() if value]
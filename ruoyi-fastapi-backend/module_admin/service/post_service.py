@@ -1,5 +1,6 @@
 from typing import Any
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common.constant import CommonConstant
@@ -7,6 +8,7 @@ from common.vo import CrudResponseModel, PageModel
 from exceptions.exception import ServiceException
 from module_admin.dao.post_dao import PostDao
 from module_admin.entity.vo.post_vo import DeletePostModel, PostModel, PostPageQueryModel
+from module_admin.service.user_cache_service import UserCacheService
 from utils.common_util import CamelCaseUtil
 from utils.excel_util import ExcelUtil
 
@@ -84,10 +86,13 @@ class PostService:
             raise e
 
     @classmethod
-    async def edit_post_services(cls, query_db: AsyncSession, page_object: PostModel) -> CrudResponseModel:
+    async def edit_post_services(
+        cls, request: Request, query_db: AsyncSession, page_object: PostModel
+    ) -> CrudResponseModel:
         """
         编辑岗位信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑岗位对象
         :return: 编辑岗位校验结果
@@ -102,6 +107,7 @@ class PostService:
             try:
                 await PostDao.edit_post_dao(query_db, edit_post)
                 await query_db.commit()
+                await UserCacheService.clear_all_user_cache_services(request.app.state.redis)
                 return CrudResponseModel(is_success=True, message='更新成功')
             except Exception as e:
                 await query_db.rollback()
@@ -110,10 +116,13 @@ class PostService:
             raise ServiceException(message='岗位不存在')
 
     @classmethod
-    async def delete_post_services(cls, query_db: AsyncSession, page_object: DeletePostModel) -> CrudResponseModel:
+    async def delete_post_services(
+        cls, request: Request, query_db: AsyncSession, page_object: DeletePostModel
+    ) -> CrudResponseModel:
         """
         删除岗位信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除岗位对象
         :return: 删除岗位校验结果
@@ -127,6 +136,7 @@ class PostService:
                         raise ServiceException(message=f'{post.post_name}已分配，不能删除')
                     await PostDao.delete_post_dao(query_db, PostModel(postId=post_id))
                 await query_db.commit()
+                await UserCacheService.clear_all_user_cache_services(request.app.state.redis)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
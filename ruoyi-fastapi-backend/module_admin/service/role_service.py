@@ -1,5 +1,6 @@
 from typing import Any
 
+from fastapi import Request
 from sqlalchemy import ColumnElement
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -18,6 +19,9 @@ from module_admin.entity.vo.role_vo import (
     RolePageQueryModel,
 )
 from module_admin.entity.vo.user_vo import UserInfoModel, UserRolePageQueryModel
+from module_admin.service.data_scope_service import DataScopeService
+from module_admin.service.router_cache_service import RouterCacheService
+from module_admin.service.user_cache_service import UserCacheService
 from utils.common_util import CamelCaseUtil
 from utils.excel_util import ExcelUtil
 
@@ -167,10 +171,13 @@ class RoleService:
             raise e
 
     @classmethod
-    async def edit_role_services(cls, query_db: AsyncSession, page_object: AddRoleModel) -> CrudResponseModel:
+    async def edit_role_services(
+        cls, request: Request, query_db: AsyncSession, page_object: AddRoleModel
+    ) -> CrudResponseModel:
         """
         编辑角色信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑角色对象
         :return: 编辑角色校验结果
@@ -197,6 +204,9 @@ class RoleService:
                                 query_db, RoleMenuModel(roleId=page_object.role_id, menuId=menu)
                             )
                 await query_db.commit()
+                await UserCacheService.clear_all_user_cache_services(request.app.state.redis)
+                await DataScopeService.clear_data_scope_cache_services(request.app.state.redis)
+                await RouterCacheService.clear_router_cache_services(request.app.state.redis)
                 return CrudResponseModel(is_success=True, message='更新成功')
             except Exception as e:
                 await query_db.rollback()
@@ -205,10 +215,13 @@ class RoleService:
             raise ServiceException(message='角色不存在')
 
     @classmethod
-    async def role_datascope_services(cls, query_db: AsyncSession, page_object: AddRoleModel) -> CrudResponseModel:
+    async def role_datascope_services(
+        cls, request: Request, query_db: AsyncSession, page_object: AddRoleModel
+    ) -> CrudResponseModel:
         """
         分配角色数据权限service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 角色数据权限对象
         :return: 分配角色数据权限结果
@@ -225,6 +238,8 @@ class RoleService:
                             query_db, RoleDeptModel(roleId=page_object.role_id, deptId=dept)
                         )
                 await query_db.commit()
+                await UserCacheService.clear_all_user_cache_services(request.app.state.redis)
+                await DataScopeService.clear_data_scope_cache_services(request.app.state.redis)
                 return CrudResponseModel(is_success=True, message='分配成功')
             except Exception as e:
                 await query_db.rollback()
@@ -233,10 +248,13 @@ class RoleService:
             raise ServiceException(message='角色不存在')
 
     @classmethod
-    async def delete_role_services(cls, query_db: AsyncSession, page_object: DeleteRoleModel) -> CrudResponseModel:
+    async def delete_role_services(
+        cls, request: Request, query_db: AsyncSession, page_object: DeleteRoleModel
+    ) -> CrudResponseModel:
         """
         删除角色信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除角色对象
         :return: 删除角色校验结果
@@ -257,6 +275,9 @@ class RoleService:
                     await RoleDao.delete_role_dept_dao(query_db, RoleDeptModel(**role_id_dict))
                     await RoleDao.delete_role_dao(query_db, RoleModel(**role_id_dict))
                 await query_db.commit()
+                await UserCacheService.clear_all_user_cache_services(request.app.state.redis)
+                await DataScopeService.clear_data_scope_cache_services(request.app.state.redis)
+                await RouterCacheService.clear_router_cache_services(request.app.state.redis)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -0,0 +1,83 @@
+import json
+from collections.abc import Callable, Coroutine, Sequence
+from datetime import timedelta
+from typing import Any
+
+from redis import asyncio as aioredis
+
+from common.enums import RedisInitKeyConfig
+from config.env import JwtConfig
+from module_admin.entity.vo.role_vo import RoleModel
+from utils.cache_util import LRUCache
+from utils.response_util import ResponseUtil
+
+
+class RouterCacheService:
+    """
+    用户路由信息缓存模块服务层
+
+    用户路由信息仅取决于用户拥有的角色，因此以排序后的角色id作为键，分进程内LRU缓存及Redis缓存两级缓存序列化后的路由信息及其ETag。
+    缓存键中包含路由版本号，菜单或角色变更时递增版本号，所有进程中的旧缓存随即失效。
+    """
+
+    VERSION_KEY = f'{RedisInitKeyConfig.USER_ROUTERS_VERSION.key}:global'
+    local_cache = LRUCache(maxsize=256)
+
+    @classmethod
+    def get_role_set_key(cls, role: Sequence[RoleModel | None]) -> str:
+        """
+        获取角色列表对应的缓存键
+
+        :param role: 用户角色列表信息
+        :return: 排序去重后以英文逗号拼接的角色id
+        """
+        return ','.join(str(role_id) for role_id in sorted({item.role_id for item in role if item}))
+
+    @classmethod
+    async def get_user_routers_services(
+        cls,
+        redis: aioredis.Redis,
+        role: Sequence[RoleModel | None],
+        build_func: Callable[[], Coroutine[Any, Any, list[dict[str, Any]]]],
+    ) -> tuple[str, list[dict[str, Any]]]:
+        """
+        获取用户路由信息service，依次从进程内缓存、Redis缓存及生成函数中获取
+
+        :param redis: redis对象
+        :param role: 用户角色列表信息
+        :param build_func: 路由信息生成函数
+        :return: 路由信息的ETag及路由信息
+        """
+        version = await redis.get(cls.VERSION_KEY) or '0'
+        role_set_key = cls.get_role_set_key(role)
+        cache_key = f'{RedisInitKeyConfig.USER_ROUTERS.key}:{version}:{role_set_key}'
+        cache_item = cls.local_cache.get(cache_key)
+        if cache_item is not None:
+            return cache_item
+        cache_value = await redis.get(cache_key)
+        if cache_value:
+            cache_value = json.loads(cache_value)
+            cache_item = (cache_value.get('etag'), cache_value.get('routers'))
+        else:
+            user_routers = await build_func()
+            etag = ResponseUtil.get_etag(user_routers)
+            cache_item = (etag, user_routers)
+            await redis.set(
+                cache_key,
+                json.dumps({'etag': etag, 'routers': user_routers}, ensure_ascii=False, default=str),
+                ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
+            )
+        cls.local_cache.set(cache_key, cache_item)
+
+        return cache_item
+
+    @classmethod
+    async def clear_router_cache_services(cls, redis: aioredis.Redis) -> None:
+        """
+        菜单或角色变更后递增路由版本号，使所有用户路由信息缓存失效service
+
+        :param redis: redis对象
+        :return:
+        """
+        await redis.incr(cls.VERSION_KEY)
+        cls.local_cache.clear()
@@ -1,76 +1,139 @@
+import asyncio
 import os
 import platform
 import socket
 import time
+from datetime import datetime
 
 import psutil
 
-from module_admin.entity.vo.server_vo import CpuInfo, MemoryInfo, PyInfo, ServerMonitorModel, SysFiles, SysInfo
-from utils.common_util import bytes2human
+from config.env import AppConfig
+from module_admin.entity.vo.server_vo import (
+    CpuInfo,
+    MemoryInfo,
+    PyInfo,
+    ServerMonitorHistoryModel,
+    ServerMonitorHistoryQueryModel,
+    ServerMonitorModel,
+    SysFiles,
+    SysInfo,
+)
+from utils.common_util import CamelCaseUtil, bytes2human
+from utils.ring_buffer_util import RingBuffer
 
 
 class ServerService:
     """
     服务监控模块服务层
+
+    服务器监控信息由应用生命周期内的后台采样任务按固定间隔采集，psutil调用及主机IP查询等阻塞操作在线程池中执行，
+    接口直接返回最近一次的采样结果；各项指标同时写入定长环形缓冲，用于查询最近一段时间的指标变化趋势。
     """
 
-    @staticmethod
-    async def get_server_monitor_info() -> ServerMonitorModel:
-        # CPU信息
-        # 获取CPU总核心数
-        cpu_num = psutil.cpu_count(logical=True)
+    metrics_columns = (
+        'cpu_used',
+        'cpu_sys',
+        'mem_usage',
+        'disk_usage',
+        'process_cpu',
+        'process_rss',
+        'loop_lag',
+    )
+    metrics_history = RingBuffer(AppConfig.app_monitor_history_size, metrics_columns)
+    _server_monitor_info: ServerMonitorModel | None = None
+    _sys_info: SysInfo | None = None
+    _current_process: psutil.Process | None = None
+
+    @classmethod
+    async def get_server_monitor_info(cls) -> ServerMonitorModel:
+        """
+        获取服务器监控信息service，返回最近一次的采样结果，采样任务未运行时立即采集一次
+
+        :return: 服务器监控信息
+        """
+        if cls._server_monitor_info is None:
+            await cls.sample_server_monitor_services()
+
+        return cls._server_monitor_info
+
+    @classmethod
+    async def get_server_monitor_history_services(
+        cls, query_object: ServerMonitorHistoryQueryModel
+    ) -> ServerMonitorHistoryModel:
+        """
+        获取最近一段时间的服务器监控指标service
+
+        :param query_object: 查询参数对象
+        :return: 降采样后的服务器监控指标
+        """
+        # 按单调时钟截取时间范围，系统时间跳变不影响截取结果，采样时的系统时间仅用于展示
+        _timestamps, wall_times, values = cls.metrics_history.downsample(
+            time.monotonic() - query_object.minutes * 60, query_object.max_points
+        )
+        metrics = {
+            CamelCaseUtil.snake_to_camel(column): values[:, index].round(2).tolist()
+            for index, column in enumerate(cls.metrics_columns)
+        }
+
+        return ServerMonitorHistoryModel(
+            interval=AppConfig.app_monitor_sample_interval,
+            times=[datetime.fromtimestamp(wall_time).strftime('%Y-%m-%d %H:%M:%S') for wall_time in wall_times],
+            metrics=metrics,
+        )
+
+    @classmethod
+    async def sample_server_monitor_services(cls, loop_lag: float = 0) -> None:
+        """
+        在线程池中采集一次服务器监控信息，并将各项指标写入环形缓冲service
+
+        :param loop_lag: 事件循环延迟（单位：毫秒）
+        :return:
+        """
+        server_monitor_info, metrics = await asyncio.to_thread(cls._collect_server_monitor_info)
+        cls._server_monitor_info = server_monitor_info
+        cls.metrics_history.append(time.monotonic(), [*metrics, loop_lag], wall_time=time.time())
+
+    @classmethod
+    def _collect_server_monitor_info(cls) -> tuple[ServerMonitorModel, list[float]]:
+        """
+        采集服务器监控信息，包含阻塞操作，需在线程池中执行
+
+        :return: 服务器监控信息及除事件循环延迟外的各项指标值
+        """
+        # CPU信息，与上一次采集之间的平均使用率
         cpu_usage_percent = psutil.cpu_times_percent()
-        cpu_used = cpu_usage_percent.user
-        cpu_sys = cpu_usage_percent.system
-        cpu_free = cpu_usage_percent.idle
-        cpu = CpuInfo(cpuNum=cpu_num, used=cpu_used, sys=cpu_sys, free=cpu_free)
+        cpu = CpuInfo(
+            cpuNum=psutil.cpu_count(logical=True),
+            used=cpu_usage_percent.user,
+            sys=cpu_usage_percent.system,
+            free=cpu_usage_percent.idle,
+        )
 
         # 内存信息
         memory_info = psutil.virtual_memory()
-        memory_total = bytes2human(memory_info.total)
-        memory_used = bytes2human(memory_info.used)
-        memory_free = bytes2human(memory_info.free)
-        memory_usage = memory_info.percent
-        mem = MemoryInfo(total=memory_total, used=memory_used, free=memory_free, usage=memory_usage)
-
-        # 主机信息
-        # 获取主机名
-        hostname = socket.gethostname()
-        # 获取IP
-        computer_ip = socket.gethostbyname(hostname)
-        os_name = platform.platform()
-        computer_name = platform.node()
-        os_arch = platform.machine()
-        user_dir = os.path.abspath(os.getcwd())
-        sys = SysInfo(
-            computerIp=computer_ip, computerName=computer_name, osArch=os_arch, osName=os_name, userDir=user_dir
+        mem = MemoryInfo(
+            total=bytes2human(memory_info.total),
+            used=bytes2human(memory_info.used),
+            free=bytes2human(memory_info.free),
+            usage=memory_info.percent,
         )
 
         # python解释器信息
-        current_pid = os.getpid()
-        current_process = psutil.Process(current_pid)
-        python_name = current_process.name()
-        python_version = platform.python_version()
-        python_home = current_process.exe()
+        current_process = cls._get_current_process()
         start_time_stamp = current_process.create_time()
-        start_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time_stamp))
-        current_time_stamp = time.time()
-        difference = current_time_stamp - start_time_stamp
+        difference = time.time() - start_time_stamp
         # 将时间差转换为天、小时和分钟数
         days = int(difference // (24 * 60 * 60))  # 每天的秒数
         hours = int((difference % (24 * 60 * 60)) // (60 * 60))  # 每小时的秒数
         minutes = int((difference % (60 * 60)) // 60)  # 每分钟的秒数
-        run_time = f'{days}天{hours}小时{minutes}分钟'
-        # 获取当前Python程序的pid
-        pid = os.getpid()
         # 获取该进程的内存信息
-        current_process_memory_info = psutil.Process(pid).memory_info()
+        current_process_memory_info = current_process.memory_info()
         py = PyInfo(
-            name=python_name,
-            version=python_version,
-            startTime=start_time,
-            runTime=run_time,
-            home=python_home,
+            name=current_process.name(),
+            version=platform.python_version(),
+            startTime=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time_stamp)),
+            runTime=f'{days}天{hours}小时{minutes}分钟',
+            home=current_process.exe(),
             total=bytes2human(memory_info.available),
             used=bytes2human(current_process_memory_info.rss),
             free=bytes2human(memory_info.available - current_process_memory_info.rss),
@@ -78,25 +141,69 @@ class ServerService:
         )
 
         # 磁盘信息
-        io = psutil.disk_partitions()
         sys_files = []
-        for i in io:
+        disk_usage = 0.0
+        for partition in psutil.disk_partitions():
             try:
-                o = psutil.disk_usage(i.device)
-                disk_data = SysFiles(
-                    dirName=i.device,
-                    sysTypeName=i.fstype,
-                    typeName='本地固定磁盘（' + i.mountpoint.replace('\\', '') + '）',
-                    total=bytes2human(o.total),
-                    used=bytes2human(o.used),
-                    free=bytes2human(o.free),
-                    usage=f'{psutil.disk_usage(i.device).percent}%',
-                )
-                sys_files.append(disk_data)
-            except Exception:  # noqa: PERF203
+                usage = psutil.disk_usage(partition.mountpoint)
+            except Exception:
                 # 忽略所有异常，跳过有问题的磁盘
                 continue
+            disk_usage = max(disk_usage, usage.percent)
+            sys_files.append(
+                SysFiles(
+                    dirName=partition.device,
+                    sysTypeName=partition.fstype,
+                    typeName='本地固定磁盘（' + partition.mountpoint.replace('\\', '') + '）',
+                    total=bytes2human(usage.total),
+                    used=bytes2human(usage.used),
+                    free=bytes2human(usage.free),
+                    usage=f'{usage.percent}%',
+                )
+            )
+
+        server_monitor_info = ServerMonitorModel(cpu=cpu, mem=mem, sys=cls._get_sys_info(), py=py, sysFiles=sys_files)
+        metrics = [
+            cpu_usage_percent.user,
+            cpu_usage_percent.system,
+            memory_info.percent,
+            disk_usage,
+            current_process.cpu_percent(),
+            current_process_memory_info.rss,
+        ]
+
+        return server_monitor_info, metrics
 
-        result = ServerMonitorModel(cpu=cpu, mem=mem, sys=sys, py=py, sysFiles=sys_files)
+    @classmethod
+    def _get_current_process(cls) -> psutil.Process:
+        """
+        获取当前进程对象，复用同一对象以便计算两次采集之间的进程CPU使用率
+
+        :return: 当前进程对象
+        """
+        if cls._current_process is None or cls._current_process.pid != os.getpid():
+            cls._current_process = psutil.Process(os.getpid())
+
+        return cls._current_process
+
+    @classmethod
+    def _get_sys_info(cls) -> SysInfo:
+        """
+        获取主机信息，主机名解析IP为阻塞的DNS查询，因此仅在首次获取时查询
+
+        :return: 主机信息
+        """
+        if cls._sys_info is None:
+            try:
+                computer_ip = socket.gethostbyname(socket.gethostname())
+            except OSError:
+                computer_ip = '127.0.0.1'
+            cls._sys_info = SysInfo(
+                computerIp=computer_ip,
+                computerName=platform.node(),
+                osArch=platform.machine(),
+                osName=platform.platform(),
+                userDir=os.path.abspath(os.getcwd()),
+            )
 
-        return result
+        return cls._sys_info
@@ -0,0 +1,158 @@
+import json
+import uuid
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+
+from redis import asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.enums import RedisInitKeyConfig
+from config.env import JwtConfig
+from module_admin.dao.user_dao import UserDao
+from module_admin.entity.vo.user_vo import CurrentUserModel, UserInfoModel
+from utils.cache_util import LRUCache
+from utils.common_util import CamelCaseUtil
+
+
+class UserCacheService:
+    """
+    当前用户信息缓存模块服务层
+
+    缓存分为两级：进程内LRU缓存及Redis缓存，两者均以用户id为键，并通过版本号判断是否失效。
+    版本号由全局版本（角色、菜单、岗位、部门变更时刷新）及用户版本（用户自身信息变更时刷新）组成。
+    """
+
+    GLOBAL_VERSION_ID = 'global'
+    local_cache = LRUCache(maxsize=2048)
+
+    @classmethod
+    def get_version_keys(cls, user_id: int) -> list[str]:
+        """
+        获取用户信息缓存对应的全局版本键及用户版本键
+
+        :param user_id: 用户id
+        :return: 版本键列表
+        """
+        return [
+            f'{RedisInitKeyConfig.USER_INFO_VERSION.key}:{cls.GLOBAL_VERSION_ID}',
+            f'{RedisInitKeyConfig.USER_INFO_VERSION.key}:{user_id}',
+        ]
+
+    @classmethod
+    async def get_current_user_services(
+        cls, redis: aioredis.Redis, query_db: AsyncSession, user_id: int, versions: Sequence[str | None]
+    ) -> CurrentUserModel | None:
+        """
+        获取当前用户信息快照service，依次从进程内缓存、Redis缓存及数据库中获取
+
+        :param redis: redis对象
+        :param query_db: orm对象
+        :param user_id: 用户id
+        :param versions: 通过get_version_keys获取到的全局版本及用户版本
+        :return: 当前用户信息对象，用户不存在时返回None
+        """
+        global_version, user_version = versions
+        if global_version is None or user_version is None:
+            global_version, user_version = await cls._init_versions(redis, user_id)
+        version = f'{global_version}:{user_version}'
+        cache_item = cls.local_cache.get(user_id)
+        if cache_item and cache_item[0] == version:
+            return cache_item[1]
+        cache_key = f'{RedisInitKeyConfig.USER_INFO.key}:{user_id}'
+        cache_value = await redis.get(cache_key)
+        snapshot = json.loads(cache_value) if cache_value else None
+        if not snapshot or snapshot.get('version') != version:
+            snapshot = await cls._build_snapshot(query_db, user_id)
+            if snapshot is None:
+                return None
+            snapshot['version'] = version
+            await redis.set(
+                cache_key,
+                json.dumps(snapshot, ensure_ascii=False, default=str),
+                ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
+            )
+        current_user = CurrentUserModel(
+            permissions=snapshot.get('permissions'),
+            roles=snapshot.get('roles'),
+            user=UserInfoModel(**snapshot.get('user')),
+        )
+        cls.local_cache.set(user_id, (version, current_user))
+
+        return current_user
+
+    @classmethod
+    async def clear_user_cache_services(cls, redis: aioredis.Redis, user_ids: Sequence[int | str]) -> None:
+        """
+        用户信息变更后使对应用户的信息缓存失效service
+
+        :param redis: redis对象
+        :param user_ids: 用户id列表
+        :return:
+        """
+        if not user_ids:
+            return
+        async with redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.set(cls.get_version_keys(user_id)[1], uuid.uuid4().hex)
+                pipe.delete(f'{RedisInitKeyConfig.USER_INFO.key}:{user_id}')
+            await pipe.execute()
+        for user_id in user_ids:
+            cls.local_cache.pop(int(user_id))
+
+    @classmethod
+    async def clear_all_user_cache_services(cls, redis: aioredis.Redis) -> None:
+        """
+        角色、菜单、岗位、部门变更后使所有用户的信息缓存失效service
+
+        :param redis: redis对象
+        :return:
+        """
+        await redis.set(f'{RedisInitKeyConfig.USER_INFO_VERSION.key}:{cls.GLOBAL_VERSION_ID}', uuid.uuid4().hex)
+        cls.local_cache.clear()
+
+    @classmethod
+    async def _init_versions(cls, redis: aioredis.Redis, user_id: int) -> list[str]:
+        """
+        初始化不存在的版本号，并返回当前的全局版本及用户版本
+
+        :param redis: redis对象
+        :param user_id: 用户id
+        :return: 全局版本及用户版本
+        """
+        version_keys = cls.get_version_keys(user_id)
+        async with redis.pipeline(transaction=False) as pipe:
+            for version_key in version_keys:
+                pipe.set(version_key, uuid.uuid4().hex, nx=True)
+            pipe.mget(version_keys)
+            result = await pipe.execute()
+
+        return result[-1]
+
+    @classmethod
+    async def _build_snapshot(cls, query_db: AsyncSession, user_id: int) -> dict[str, Any] | None:
+        """
+        从数据库中查询并构建用户信息快照
+
+        :param query_db: orm对象
+        :param user_id: 用户id
+        :return: 用户信息快照，用户不存在时返回None
+        """
+        query_user = await UserDao.get_user_by_id(query_db, user_id=user_id)
+        if query_user.get('user_basic_info') is None:
+            return None
+        user_basic_info = CamelCaseUtil.transform_result(query_user.get('user_basic_info'))
+        # 密码不写入缓存
+        user_basic_info.pop('password', None)
+
+        return {
+            'permissions': query_user.get('user_permission_info'),
+            'roles': [row.role_key for row in query_user.get('user_role_info')],
+            'user': {
+                **user_basic_info,
+                'postIds': ','.join([str(row.post_id) for row in query_user.get('user_post_info')]),
+                'roleIds': ','.join([str(row.role_id) for row in query_user.get('user_role_info')]),
+                'dept': CamelCaseUtil.transform_result(query_user.get('user_dept_info')),
+                'role': CamelCaseUtil.transform_result(query_user.get('user_role_info')),
+            },
+        }
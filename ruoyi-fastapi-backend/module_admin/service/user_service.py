@@ -1,15 +1,25 @@
+import asyncio
 import io
+import json
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator
 from datetime import datetime
-from typing import Any
+from typing import IO, Any
 
 import pandas as pd
-from fastapi import Request, UploadFile
+from fastapi import BackgroundTasks, Request, UploadFile
+from pydantic import ValidationError
+from pydantic_validation_decorator import FieldValidationError
+from redis import asyncio as aioredis
 from sqlalchemy import ColumnElement
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common.constant import CommonConstant
+from common.enums import RedisInitKeyConfig
 from common.vo import CrudResponseModel, PageModel
+from config.database import AsyncSessionLocal
 from exceptions.exception import ServiceException
+from module_admin.dao.dept_dao import DeptDao
 from module_admin.dao.user_dao import UserDao
 from module_admin.entity.do.user_do import SysUserRole
 from module_admin.entity.vo.post_vo import PostPageQueryModel
@@ -33,11 +43,12 @@ from module_admin.entity.vo.user_vo import (
     UserRowModel,
 )
 from module_admin.service.config_service import ConfigService
-from module_admin.service.dept_service import DeptService
 from module_admin.service.post_service import PostService
 from module_admin.service.role_service import RoleService
+from module_admin.service.user_cache_service import UserCacheService
 from utils.common_util import CamelCaseUtil
-from utils.excel_util import ExcelUtil
+from utils.excel_util import ExcelUtil, ExportFormat
+from utils.log_util import logger
 from utils.pwd_util import PwdUtil
 
 
@@ -46,6 +57,14 @@ class UserService:
     用户管理模块服务层
     """
 
+    # 批量导入用户时每批处理的数据量
+    import_chunk_size = 1000
+    # 用户导入进度的保存时间（单位：秒）
+    import_progress_expire = 24 * 60 * 60
+    import_user_fields = frozenset(
+        {'dept_id', 'user_name', 'nick_name', 'email', 'phonenumber', 'sex', 'status', 'update_by', 'update_time'}
+    )
+
     @classmethod
     async def get_user_list_services(
         cls,
@@ -53,7 +72,8 @@ class UserService:
         query_object: UserPageQueryModel,
         data_scope_sql: ColumnElement,
         is_page: bool = False,
-    ) -> PageModel[UserRowModel] | list[dict[str, Any]]:
+        is_stream: bool = False,
+    ) -> PageModel[UserRowModel] | list[dict[str, Any]] | AsyncIterator[dict[str, Any]]:
         """
         获取用户列表信息service
 
@@ -61,9 +81,12 @@ class UserService:
         :param query_object: 查询参数对象
         :param data_scope_sql: 数据权限对应的查询sql语句
         :param is_page: 是否开启分页
+        :param is_stream: 是否以异步数据流的形式逐条返回，用于导出
         :return: 用户列表信息对象
         """
-        query_result = await UserDao.get_user_list(query_db, query_object, data_scope_sql, is_page)
+        query_result = await UserDao.get_user_list(query_db, query_object, data_scope_sql, is_page, is_stream)
+        if is_stream:
+            return ({**row[0], 'dept': row[1]} async for row in query_result)
         if is_page:
             user_list_result = PageModel[UserRowModel](
                 **{
@@ -200,10 +223,13 @@ class UserService:
             del edit_user['type']
 
     @classmethod
-    async def edit_user_services(cls, query_db: AsyncSession, page_object: EditUserModel) -> CrudResponseModel:
+    async def edit_user_services(
+        cls, request: Request, query_db: AsyncSession, page_object: EditUserModel
+    ) -> CrudResponseModel:
         """
         编辑用户信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑用户对象
         :return: 编辑用户校验结果
@@ -235,6 +261,7 @@ class UserService:
                                 query_db, UserPostModel(userId=page_object.user_id, postId=post)
                             )
                 await query_db.commit()
+                await UserCacheService.clear_user_cache_services(request.app.state.redis, [page_object.user_id])
                 return CrudResponseModel(is_success=True, message='更新成功')
             except Exception as e:
                 await query_db.rollback()
@@ -243,10 +270,13 @@ class UserService:
             raise ServiceException(message='用户不存在')
 
     @classmethod
-    async def delete_user_services(cls, query_db: AsyncSession, page_object: DeleteUserModel) -> CrudResponseModel:
+    async def delete_user_services(
+        cls, request: Request, query_db: AsyncSession, page_object: DeleteUserModel
+    ) -> CrudResponseModel:
         """
         删除用户信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除用户对象
         :return: 删除用户校验结果
@@ -264,6 +294,7 @@ class UserService:
                     await UserDao.delete_user_post_dao(query_db, UserPostModel(**user_id_dict))
                     await UserDao.delete_user_dao(query_db, UserModel(**user_id_dict))
                 await query_db.commit()
+                await UserCacheService.clear_user_cache_services(request.app.state.redis, user_id_list)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -333,10 +364,13 @@ class UserService:
         )
 
     @classmethod
-    async def reset_user_services(cls, query_db: AsyncSession, page_object: ResetUserModel) -> CrudResponseModel:
+    async def reset_user_services(
+        cls, request: Request, query_db: AsyncSession, page_object: ResetUserModel
+    ) -> CrudResponseModel:
         """
         重置用户密码service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 重置用户对象
         :return: 重置用户校验结果
@@ -344,73 +378,197 @@ class UserService:
         reset_user = page_object.model_dump(exclude_unset=True, exclude={'admin'})
         if page_object.old_password:
             user = (await UserDao.get_user_detail_by_id(query_db, user_id=page_object.user_id)).get('user_basic_info')
-            if not PwdUtil.verify_password(page_object.old_password, user.password):
+            if not await PwdUtil.verify_password_async(page_object.old_password, user.password):
                 raise ServiceException(message='修改密码失败，旧密码错误')
-            if PwdUtil.verify_password(page_object.password, user.password):
+            if await PwdUtil.verify_password_async(page_object.password, user.password):
                 raise ServiceException(message='新密码不能与旧密码相同')
             del reset_user['old_password']
         if page_object.sms_code and page_object.session_id:
             del reset_user['sms_code']
             del reset_user['session_id']
         try:
-            reset_user['password'] = PwdUtil.get_password_hash(page_object.password)
+            reset_user['password'] = await PwdUtil.get_password_hash_async(page_object.password)
             await UserDao.edit_user_dao(query_db, reset_user)
             await query_db.commit()
+            await UserCacheService.clear_user_cache_services(request.app.state.redis, [page_object.user_id])
             return CrudResponseModel(is_success=True, message='重置成功')
         except Exception as e:
             await query_db.rollback()
             raise e
 
     @classmethod
-    def _set_row_sex_value(cls, row: pd.Series) -> None:
+    async def batch_import_user_services(
+        cls,
+        request: Request,
+        background_tasks: BackgroundTasks,
+        file: UploadFile,
+        update_support: bool,
+        current_user: CurrentUserModel,
+        user_data_scope_sql: ColumnElement,
+        dept_data_scope_sql: ColumnElement,
+    ) -> CrudResponseModel:
         """
-        设置行性别值
+        批量导入用户service，读取导入文件后提交后台导入任务，导入进度及结果可通过导入任务id查询
 
-        :param row: 行数据
-        :return: None
+        :param request: Request对象
+        :param background_tasks: 后台任务对象
+        :param file: 用户导入文件对象
+        :param update_support: 用户存在时是否更新
+        :param current_user: 当前用户对象
+        :param user_data_scope_sql: 用户数据权限sql
+        :param dept_data_scope_sql: 部门数据权限sql
+        :return: 提交导入任务结果，result为导入任务id
         """
-        if row['sex'] == '男':
-            row['sex'] = '0'
-        if row['sex'] == '女':
-            row['sex'] = '1'
-        if row['sex'] == '未知':
-            row['sex'] = '2'
+        contents = await file.read()
+        await file.close()
+        task_id = uuid.uuid4().hex
+        await cls._set_import_user_progress(
+            request.app.state.redis,
+            task_id,
+            {**cls._init_import_user_progress(current_user.user.user_id), 'status': 'pending'},
+        )
+        background_tasks.add_task(
+            cls._run_import_user_task,
+            request.app.state.redis,
+            task_id,
+            contents,
+            update_support,
+            current_user,
+            user_data_scope_sql,
+            dept_data_scope_sql,
+        )
+
+        return CrudResponseModel(is_success=True, message='用户导入任务已提交，请稍后查看导入结果', result=task_id)
 
     @classmethod
-    def _set_row_status_value(cls, row: pd.Series) -> None:
+    async def get_import_user_progress_services(
+        cls, redis: aioredis.Redis, task_id: str, current_user: CurrentUserModel
+    ) -> dict[str, Any]:
         """
-        设置行状态值
+        获取用户导入进度service，仅允许提交导入任务的用户查询
 
-        :param row: 行数据
-        :return: None
+        :param redis: redis对象
+        :param task_id: 导入任务id
+        :param current_user: 当前用户对象
+        :return: 用户导入进度
         """
-        if row['status'] == '正常':
-            row['status'] = '0'
-        if row['status'] == '停用':
-            row['status'] = '1'
+        progress = await redis.get(f'{RedisInitKeyConfig.USER_IMPORT.key}:{task_id}')
+        if not progress:
+            raise ServiceException(message='导入任务不存在或已过期')
+        progress = json.loads(progress)
+        if progress.pop('userId', None) != current_user.user.user_id:
+            raise ServiceException(message='没有权限访问该导入任务')
+
+        return progress
 
     @classmethod
-    async def batch_import_user_services(
+    def _init_import_user_progress(cls, user_id: int) -> dict[str, Any]:
+        """
+        获取初始的用户导入进度
+
+        :param user_id: 提交导入任务的用户id
+        :return: 用户导入进度
+        """
+        return {
+            'userId': user_id,
+            'status': 'running',
+            'total': 0,
+            'processed': 0,
+            'successCount': 0,
+            'failureCount': 0,
+            'message': '',
+        }
+
+    @classmethod
+    async def _set_import_user_progress(cls, redis: aioredis.Redis, task_id: str, progress: dict[str, Any]) -> None:
+        """
+        保存用户导入进度
+
+        :param redis: redis对象
+        :param task_id: 导入任务id
+        :param progress: 用户导入进度
+        :return:
+        """
+        await redis.set(
+            f'{RedisInitKeyConfig.USER_IMPORT.key}:{task_id}',
+            json.dumps({'taskId': task_id, **progress}, ensure_ascii=False),
+            ex=cls.import_progress_expire,
+        )
+
+    @classmethod
+    async def _run_import_user_task(
         cls,
-        request: Request,
-        query_db: AsyncSession,
-        file: UploadFile,
+        redis: aioredis.Redis,
+        task_id: str,
+        contents: bytes,
         update_support: bool,
         current_user: CurrentUserModel,
         user_data_scope_sql: ColumnElement,
         dept_data_scope_sql: ColumnElement,
-    ) -> CrudResponseModel:
+    ) -> None:
         """
-        批量导入用户service
+        后台执行用户导入任务，初始密码只计算一次哈希，并按批次查询已存在用户及批量新增、更新用户，全部导入成功后统一提交
 
-        :param request: Request对象
-        :param query_db: orm对象
-        :param file: 用户导入文件对象
+        :param redis: redis对象
+        :param task_id: 导入任务id
+        :param contents: 用户导入文件内容
         :param update_support: 用户存在时是否更新
         :param current_user: 当前用户对象
         :param user_data_scope_sql: 用户数据权限sql
         :param dept_data_scope_sql: 部门数据权限sql
-        :return: 批量导入用户结果
+        :return:
+        """
+        progress = cls._init_import_user_progress(current_user.user.user_id)
+        error_result = []
+        edit_user_id_list = []
+        try:
+            df = await asyncio.to_thread(cls._read_import_user_file, contents)
+            progress['total'] = len(df)
+            await cls._set_import_user_progress(redis, task_id, progress)
+            init_password = await ConfigService.query_config_list_from_cache_services(redis, 'sys.user.initPassword')
+            password = await PwdUtil.get_password_hash_async(init_password)
+            async with AsyncSessionLocal() as query_db:
+                try:
+                    for start in range(0, len(df), cls.import_chunk_size):
+                        chunk = df.iloc[start : start + cls.import_chunk_size]
+                        chunk_error_result, chunk_edit_user_ids = await cls._import_user_chunk(
+                            query_db,
+                            chunk,
+                            password,
+                            update_support,
+                            current_user,
+                            user_data_scope_sql,
+                            dept_data_scope_sql,
+                        )
+                        error_result.extend(chunk_error_result)
+                        edit_user_id_list.extend(chunk_edit_user_ids)
+                        progress['processed'] += len(chunk)
+                        progress['failureCount'] = len(error_result)
+                        progress['successCount'] = progress['processed'] - progress['failureCount']
+                        await cls._set_import_user_progress(redis, task_id, progress)
+                    await query_db.commit()
+                except Exception:
+                    await query_db.rollback()
+                    raise
+            await UserCacheService.clear_user_cache_services(redis, edit_user_id_list)
+            progress['status'] = 'success'
+            progress['message'] = '\n'.join(error_result)
+            logger.info(
+                f'用户导入任务{task_id}执行完成，成功{progress["successCount"]}条，失败{progress["failureCount"]}条'
+            )
+        except Exception as e:
+            logger.exception(e)
+            progress['status'] = 'failed'
+            progress['message'] = f'用户导入失败：{e}'
+        await cls._set_import_user_progress(redis, task_id, progress)
+
+    @classmethod
+    def _read_import_user_file(cls, contents: bytes) -> pd.DataFrame:
+        """
+        读取用户导入文件，并对整列数据进行转换及文件内重复账号的校验
+
+        :param contents: 用户导入文件内容
+        :return: 转换后的用户导入数据，error列为文件内的校验错误信息
         """
         header_dict = {
             '部门编号': 'dept_id',
@@ -421,75 +579,112 @@ class UserService:
             '用户性别': 'sex',
             '帐号状态': 'status',
         }
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-        await file.close()
-        df.rename(columns=header_dict, inplace=True)
-        add_error_result = []
-        count = 0
-        try:
-            for _index, row in df.iterrows():
-                count = count + 1
-                cls._set_row_sex_value(row)
-                cls._set_row_status_value(row)
-                add_user = UserModel(
-                    deptId=row['dept_id'],
-                    userName=row['user_name'],
-                    password=PwdUtil.get_password_hash(
-                        await ConfigService.query_config_list_from_cache_services(
-                            request.app.state.redis, 'sys.user.initPassword'
-                        )
-                    ),
-                    nickName=row['nick_name'],
-                    email=row['email'],
-                    phonenumber=str(row['phonenumber']),
-                    sex=row['sex'],
-                    status=row['status'],
-                    createBy=current_user.user.user_name,
-                    createTime=datetime.now(),
+        df = pd.read_excel(io.BytesIO(contents), dtype=str)
+        df = df.rename(columns=header_dict).reindex(columns=list(header_dict.values())).astype(object)
+        df = df.apply(lambda column: column.str.strip())
+        df['sex'] = df['sex'].replace({'男': '0', '女': '1', '未知': '2'})
+        df['status'] = df['status'].replace({'正常': '0', '停用': '1'})
+        df = df.astype(object).where(df.notna(), None)
+        df['row_num'] = range(1, len(df) + 1)
+        df['error'] = None
+        duplicated = df['user_name'].notna() & df['user_name'].duplicated()
+        df.loc[duplicated, 'error'] = '用户账号' + df.loc[duplicated, 'user_name'] + '在导入文件中重复'
+
+        return df
+
+    @classmethod
+    async def _import_user_chunk(
+        cls,
+        query_db: AsyncSession,
+        chunk: pd.DataFrame,
+        password: str,
+        update_support: bool,
+        current_user: CurrentUserModel,
+        user_data_scope_sql: ColumnElement,
+        dept_data_scope_sql: ColumnElement,
+    ) -> tuple[list[str], list[int]]:
+        """
+        导入一批用户数据
+
+        :param query_db: orm对象
+        :param chunk: 当前批次的用户导入数据
+        :param password: 初始密码哈希值
+        :param update_support: 用户存在时是否更新
+        :param current_user: 当前用户对象
+        :param user_data_scope_sql: 用户数据权限sql
+        :param dept_data_scope_sql: 部门数据权限sql
+        :return: 当前批次的错误信息列表及更新的用户id列表
+        """
+        user_id_map = await UserDao.get_user_id_map_by_user_names(
+            query_db, chunk['user_name'].dropna().unique().tolist()
+        )
+        allowed_dept_ids = None
+        allowed_user_ids = None
+        if not current_user.user.admin:
+            dept_ids = pd.to_numeric(chunk['dept_id'], errors='coerce').dropna().astype(int).unique().tolist()
+            allowed_dept_ids = await DeptDao.get_dept_ids_in_data_scope(query_db, dept_ids, dept_data_scope_sql)
+            if update_support:
+                allowed_user_ids = await UserDao.get_user_ids_in_data_scope(
+                    query_db, list(user_id_map.values()), user_data_scope_sql
+                )
+        now = datetime.now()
+        add_user_list = []
+        edit_user_list = []
+        error_result = []
+        for row in chunk.itertuples(index=False):
+            user_id = user_id_map.get(row.user_name)
+            try:
+                if row.error:
+                    raise ServiceException(message=row.error)
+                if user_id is not None and not update_support:
+                    raise ServiceException(message=f'用户账号{row.user_name}已存在')
+                import_user = UserModel(
+                    userId=user_id,
+                    deptId=row.dept_id,
+                    userName=row.user_name,
+                    nickName=row.nick_name,
+                    email=row.email,
+                    phonenumber=row.phonenumber,
+                    sex=row.sex,
+                    status=row.status,
                     updateBy=current_user.user.user_name,
-                    updateTime=datetime.now(),
+                    updateTime=now,
                 )
-                user_info = await UserDao.get_user_by_info(query_db, UserModel(userName=row['user_name']))
-                if user_info:
-                    if update_support:
-                        edit_user_model = UserModel(
-                            userId=user_info.user_id,
-                            deptId=row['dept_id'],
-                            userName=row['user_name'],
-                            nickName=row['nick_name'],
-                            email=row['email'],
-                            phonenumber=str(row['phonenumber']),
-                            sex=row['sex'],
-                            status=row['status'],
-                            updateBy=current_user.user.user_name,
-                            updateTime=datetime.now(),
-                        )
-                        edit_user_model.validate_fields()
-                        await cls.check_user_allowed_services(edit_user_model)
-                        if not current_user.user.admin:
-                            await cls.check_user_data_scope_services(
-                                query_db, edit_user_model.user_id, user_data_scope_sql
-                            )
-                            await DeptService.check_dept_data_scope_services(
-                                query_db, edit_user_model.dept_id, dept_data_scope_sql
-                            )
-                        edit_user = edit_user_model.model_dump(exclude_unset=True)
-                        await UserDao.edit_user_dao(query_db, edit_user)
-                    else:
-                        add_error_result.append(f'{count}.用户账号{row["user_name"]}已存在')
-                else:
-                    add_user.validate_fields()
-                    if not current_user.user.admin:
-                        await DeptService.check_dept_data_scope_services(
-                            query_db, add_user.dept_id, dept_data_scope_sql
-                        )
-                    await UserDao.add_user_dao(query_db, add_user)
-            await query_db.commit()
-            return CrudResponseModel(is_success=True, message='\n'.join(add_error_result))
-        except Exception as e:
-            await query_db.rollback()
-            raise e
+                import_user.validate_fields()
+                if user_id is not None:
+                    await cls.check_user_allowed_services(import_user)
+                    if allowed_user_ids is not None and user_id not in allowed_user_ids:
+                        raise ServiceException(message='没有权限访问用户数据')
+                if (
+                    allowed_dept_ids is not None
+                    and import_user.dept_id is not None
+                    and import_user.dept_id not in allowed_dept_ids
+                ):
+                    raise ServiceException(message='没有权限访问部门数据')
+            except (ServiceException, FieldValidationError) as e:
+                error_result.append(f'{row.row_num}.{e.message}')
+                continue
+            except ValidationError:
+                error_result.append(f'{row.row_num}.用户账号{row.user_name}数据格式不正确')
+                continue
+            if user_id is None:
+                add_user_list.append(
+                    {
+                        **import_user.model_dump(include=cls.import_user_fields),
+                        'password': password,
+                        'create_by': current_user.user.user_name,
+                        'create_time': now,
+                    }
+                )
+            else:
+                # 导入文件中为空的单元格不更新，保留用户原有数据
+                edit_user_list.append(
+                    import_user.model_dump(include={'user_id', *cls.import_user_fields}, exclude_none=True)
+                )
+        await UserDao.add_user_batch_dao(query_db, add_user_list)
+        await UserDao.edit_user_batch_dao(query_db, edit_user_list)
+
+        return error_result, [user['user_id'] for user in edit_user_list]
 
     @staticmethod
     async def get_user_import_template_services() -> bytes:
@@ -508,12 +703,15 @@ class UserService:
         return binary_data
 
     @staticmethod
-    async def export_user_list_services(user_list: list) -> bytes:
+    async def export_user_list_services(
+        user_list: AsyncIterable[dict[str, Any]], export_format: ExportFormat = 'xlsx'
+    ) -> IO[bytes]:
         """
         导出用户信息service
 
-        :param user_list: 用户信息列表
-        :return: 用户信息对应excel的二进制数据
+        :param user_list: 用户信息异步数据流
+        :param export_format: 导出格式
+        :return: 用户信息对应的导出文件
         """
         # 创建一个映射字典，将英文键映射到中文键
         mapping_dict = {
@@ -532,21 +730,24 @@ class UserService:
             'remark': '备注',
         }
 
-        for item in user_list:
-            item['deptName'] = item.get('dept').get('deptName')
-            if item.get('status') == '0':
-                item['status'] = '正常'
-            else:
-                item['status'] = '停用'
-            if item.get('sex') == '0':
-                item['sex'] = '男'
-            elif item.get('sex') == '1':
-                item['sex'] = '女'
-            else:
-                item['sex'] = '未知'
-        binary_data = ExcelUtil.export_list2excel(user_list, mapping_dict)
+        async def transform_user_list() -> AsyncIterator[dict[str, Any]]:
+            async for item in user_list:
+                item['deptName'] = (item.get('dept') or {}).get('deptName')
+                if item.get('status') == '0':
+                    item['status'] = '正常'
+                else:
+                    item['status'] = '停用'
+                if item.get('sex') == '0':
+                    item['sex'] = '男'
+                elif item.get('sex') == '1':
+                    item['sex'] = '女'
+                else:
+                    item['sex'] = '未知'
+                yield item
 
-        return binary_data
+        export_file = await ExcelUtil.export_stream2file(transform_user_list(), mapping_dict, export_format)
+
+        return export_file
 
     @classmethod
     async def get_user_role_allocated_list_services(
@@ -581,10 +782,13 @@ class UserService:
         return result
 
     @classmethod
-    async def add_user_role_services(cls, query_db: AsyncSession, page_object: CrudUserRoleModel) -> CrudResponseModel:
+    async def add_user_role_services(
+        cls, request: Request, query_db: AsyncSession, page_object: CrudUserRoleModel
+    ) -> CrudResponseModel:
         """
         新增用户关联角色信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 新增用户关联角色对象
         :return: 新增用户关联角色校验结果
@@ -596,6 +800,7 @@ class UserService:
                 for role_id in role_id_list:
                     await UserDao.add_user_role_dao(query_db, UserRoleModel(userId=page_object.user_id, roleId=role_id))
                 await query_db.commit()
+                await UserCacheService.clear_user_cache_services(request.app.state.redis, [page_object.user_id])
                 return CrudResponseModel(is_success=True, message='分配成功')
             except Exception as e:
                 await query_db.rollback()
@@ -604,6 +809,7 @@ class UserService:
             try:
                 await UserDao.delete_user_role_by_user_and_role_dao(query_db, UserRoleModel(userId=page_object.user_id))
                 await query_db.commit()
+                await UserCacheService.clear_user_cache_services(request.app.state.redis, [page_object.user_id])
                 return CrudResponseModel(is_success=True, message='分配成功')
             except Exception as e:
                 await query_db.rollback()
@@ -619,6 +825,7 @@ class UserService:
                         continue
                     await UserDao.add_user_role_dao(query_db, UserRoleModel(userId=user_id, roleId=page_object.role_id))
                 await query_db.commit()
+                await UserCacheService.clear_user_cache_services(request.app.state.redis, user_id_list)
                 return CrudResponseModel(is_success=True, message='新增成功')
             except Exception as e:
                 await query_db.rollback()
@@ -628,11 +835,12 @@ class UserService:
 
     @classmethod
     async def delete_user_role_services(
-        cls, query_db: AsyncSession, page_object: CrudUserRoleModel
+        cls, request: Request, query_db: AsyncSession, page_object: CrudUserRoleModel
     ) -> CrudResponseModel:
         """
         删除用户关联角色信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除用户关联角色对象
         :return: 删除用户关联角色校验结果
@@ -644,6 +852,7 @@ class UserService:
                         query_db, UserRoleModel(userId=page_object.user_id, roleId=page_object.role_id)
                     )
                     await query_db.commit()
+                    await UserCacheService.clear_user_cache_services(request.app.state.redis, [page_object.user_id])
                     return CrudResponseModel(is_success=True, message='删除成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -656,6 +865,7 @@ class UserService:
                             query_db, UserRoleModel(userId=user_id, roleId=page_object.role_id)
                         )
                     await query_db.commit()
+                    await UserCacheService.clear_user_cache_services(request.app.state.redis, user_id_list)
                     return CrudResponseModel(is_success=True, message='删除成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -1,6 +1,6 @@
 from typing import Annotated
 
-from fastapi import Body, Path, Request, Response
+from fastapi import Body, Path, Query, Request, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -9,13 +9,14 @@ from common.aspect.db_seesion import DBSessionDependency
 from common.aspect.pre_auth import CurrentUserDependency, PreAuthDependency
 from common.enums import BusinessType
 from common.router import APIRouterPro
-from common.vo import DataResponseModel, ResponseBaseModel
+from common.vo import DataResponseModel, PageModel, PageResponseModel, ResponseBaseModel
 from module_admin.entity.vo.user_vo import CurrentUserModel
 from module_ai.entity.vo.ai_chat_vo import (
     AiChatConfigModel,
     AiChatRequestModel,
     AiChatSessionBaseModel,
     AiChatSessionModel,
+    AiChatSessionPageQueryModel,
 )
 from module_ai.service.ai_chat_service import AiChatService
 from utils.log_util import logger
@@ -47,7 +48,7 @@ async def send_chat_message(
     current_user: Annotated[CurrentUserModel, CurrentUserDependency()],
 ) -> StreamingResponse:
     user_id = current_user.user.user_id if current_user and current_user.user else 1
-    chat_stream = AiChatService.chat_services(query_db, chat_req, user_id)
+    chat_stream = AiChatService.chat_services(request, query_db, chat_req, user_id)
     logger.info(f'用户{user_id}发送对话消息成功')
 
     return StreamingResponse(content=chat_stream, media_type='text/event-stream')
@@ -95,15 +96,21 @@ async def save_user_chat_config(
     '/session/list',
     summary='获取会话列表',
     description='获取用户的会话列表',
-    response_model=DataResponseModel[list[AiChatSessionBaseModel]],
+    response_model=DataResponseModel[list[AiChatSessionBaseModel]] | PageResponseModel[AiChatSessionBaseModel],
 )
 async def get_chat_session_list(
     request: Request,
+    chat_session_page_query: Annotated[AiChatSessionPageQueryModel, Query()],
+    query_db: Annotated[AsyncSession, DBSessionDependency()],
     current_user: Annotated[CurrentUserModel, CurrentUserDependency()],
 ) -> Response:
-    result = await AiChatService.get_chat_session_list_services(current_user.user.user_id)
+    result = await AiChatService.get_chat_session_list_services(
+        query_db, current_user.user.user_id, chat_session_page_query
+    )
     logger.info('获取成功')
 
+    if isinstance(result, PageModel):
+        return ResponseUtil.success(model_content=result)
     return ResponseUtil.success(data=result)
 
 
@@ -119,7 +126,7 @@ async def delete_chat_session(
     session_id: Annotated[str, Path(description='会话ID')],
     query_db: Annotated[AsyncSession, DBSessionDependency()],
 ) -> Response:
-    delete_chat_session_result = await AiChatService.delete_chat_session_services(session_id)
+    delete_chat_session_result = await AiChatService.delete_chat_session_services(query_db, session_id)
     logger.info(delete_chat_session_result.message)
 
     return ResponseUtil.success(msg=delete_chat_session_result.message)
@@ -1,8 +1,14 @@
-from sqlalchemy import select, update
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from module_ai.entity.do.ai_chat_do import AiChatConfig
-from module_ai.entity.vo.ai_chat_vo import AiChatConfigModel
+from common.vo import PageModel
+from module_ai.entity.do.ai_chat_do import AiChatConfig, AiChatSession
+from module_ai.entity.vo.ai_chat_vo import AiChatConfigModel, AiChatSessionPageQueryModel
+from utils.page_util import PageUtil
 
 
 class AiChatConfigDao:
@@ -50,3 +56,106 @@ class AiChatConfigDao:
         :return:
         """
         await db.execute(update(AiChatConfig), [chat_config])
+
+
+class AiChatSessionDao:
+    """
+    AI对话会话索引数据库操作层
+    """
+
+    @classmethod
+    async def get_chat_session_list(
+        cls, db: AsyncSession, user_id: int, query_object: AiChatSessionPageQueryModel, is_page: bool = False
+    ) -> PageModel | list[dict[str, Any]]:
+        """
+        根据用户ID获取会话索引列表，按更新时间倒序排列
+
+        :param db: orm对象
+        :param user_id: 用户ID
+        :param query_object: 查询参数对象
+        :param is_page: 是否开启分页
+        :return: 会话索引列表信息对象
+        """
+        query = (
+            select(AiChatSession)
+            .where(AiChatSession.user_id == user_id)
+            .order_by(AiChatSession.updated_at.desc(), AiChatSession.session_id.desc())
+        )
+        chat_session_list: PageModel | list[dict[str, Any]] = await PageUtil.paginate(
+            db,
+            query,
+            query_object.page_num,
+            query_object.page_size,
+            is_page,
+            cursor=query_object.cursor,
+            cursor_columns=[AiChatSession.updated_at, AiChatSession.session_id],
+            cursor_desc=True,
+        )
+
+        return chat_session_list
+
+    @classmethod
+    async def increase_chat_session_message_count_dao(
+        cls, db: AsyncSession, session_id: str, message_count: int, updated_at: datetime
+    ) -> bool:
+        """
+        增加会话索引消息条数并刷新更新时间数据库操作
+
+        :param db: orm对象
+        :param session_id: 会话ID
+        :param message_count: 增加的消息条数
+        :param updated_at: 更新时间
+        :return: 会话索引是否存在
+        """
+        result = await db.execute(
+            update(AiChatSession)
+            .where(AiChatSession.session_id == session_id)
+            .values(message_count=AiChatSession.message_count + message_count, updated_at=updated_at)
+        )
+
+        return result.rowcount > 0
+
+    @classmethod
+    async def add_chat_session_dao(cls, db: AsyncSession, chat_session: dict[str, Any]) -> None:
+        """
+        新增会话索引数据库操作
+
+        :param db: orm对象
+        :param chat_session: 会话索引字典
+        :return:
+        """
+        db.add(AiChatSession(**chat_session))
+        await db.flush()
+
+    @classmethod
+    async def add_chat_session_batch_dao(cls, db: AsyncSession, chat_session_list: Sequence[dict[str, Any]]) -> None:
+        """
+        批量新增会话索引数据库操作
+
+        :param db: orm对象
+        :param chat_session_list: 会话索引字典列表
+        :return:
+        """
+        if chat_session_list:
+            await db.execute(insert(AiChatSession), list(chat_session_list))
+
+    @classmethod
+    async def delete_chat_session_dao(cls, db: AsyncSession, session_id: str) -> None:
+        """
+        删除会话索引数据库操作
+
+        :param db: orm对象
+        :param session_id: 会话ID
+        :return:
+        """
+        await db.execute(delete(AiChatSession).where(AiChatSession.session_id == session_id))
+
+    @classmethod
+    async def count_chat_session_dao(cls, db: AsyncSession) -> int:
+        """
+        获取会话索引总数数据库操作
+
+        :param db: orm对象
+        :return: 会话索引总数
+        """
+        return (await db.execute(select(func.count('*')).select_from(AiChatSession))).scalar()
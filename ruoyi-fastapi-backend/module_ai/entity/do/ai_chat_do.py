@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import CHAR, BigInteger, Column, DateTime, Float, Integer, Text
+from sqlalchemy import CHAR, BigInteger, Column, DateTime, Float, Index, Integer, String, Text
 
 from config.database import Base
 
@@ -24,3 +24,23 @@ class AiChatConfig(Base):
     image_max_size_mb = Column(Integer, nullable=True, comment='图片最大大小(MB)')
     create_time = Column(DateTime, nullable=True, default=datetime.now, comment='创建时间')
     update_time = Column(DateTime, nullable=True, default=datetime.now, comment='更新时间')
+
+
+class AiChatSession(Base):
+    """
+    AI对话会话索引表
+
+    会话内容由Agno存储，本表仅保存会话列表所需的摘要信息，在每次对话运行完成时更新
+    """
+
+    __tablename__ = 'ai_chat_session'
+    __table_args__ = {'comment': 'AI对话会话索引表'}
+
+    session_id = Column(String(64), primary_key=True, nullable=False, comment='会话ID')
+    user_id = Column(BigInteger, nullable=False, comment='用户ID')
+    session_title = Column(String(64), nullable=True, server_default="''", comment='会话标题')
+    message_count = Column(Integer, nullable=False, server_default='0', comment='消息条数')
+    created_at = Column(DateTime, nullable=False, default=datetime.now, comment='创建时间')
+    updated_at = Column(DateTime, nullable=False, default=datetime.now, comment='更新时间')
+
+    idx_ai_chat_session_user_updated = Index('idx_ai_chat_session_user_updated', user_id, updated_at, session_id)
@@ -50,10 +50,25 @@ class AiChatSessionBaseModel(BaseModel):
     session_title: str | None = Field(default=None, description='会话标题')
     session_type: str | None = Field(default=None, description='会话类型')
     user_id: str | None = Field(default=None, description='用户ID')
+    message_count: int | None = Field(default=None, description='消息条数')
     created_at: datetime | None = Field(default=None, description='创建时间')
     updated_at: datetime | None = Field(default=None, description='更新时间')
 
 
+class AiChatSessionPageQueryModel(BaseModel):
+    """
+    AI对话会话列表分页查询模型
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel)
+
+    page_num: int | None = Field(default=None, description='当前页码，与每页记录数均传入时开启分页')
+    page_size: int | None = Field(default=None, description='每页记录数，与当前页码均传入时开启分页')
+    cursor: str | None = Field(
+        default=None, description='分页游标，传入时使用游标分页，首页传入空字符串，后续传入上一页返回的nextCursor'
+    )
+
+
 class ModelInfoModel(BaseModel):
     """
     对话会话数据模型-模型信息模型
@@ -1,21 +1,24 @@
-import json
 import os
 import uuid
-from collections.abc import AsyncGenerator, AsyncIterator
+from collections.abc import AsyncGenerator
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
+import anyio
 from agno.agent import Agent
 from agno.db.base import SessionType
 from agno.media import Image
 from agno.run.agent import RunEvent, RunOutput, RunOutputEvent
 from agno.run.cancel import acancel_run
+from fastapi import Request
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from common.vo import CrudResponseModel
+from common.vo import CrudResponseModel, PageModel
+from config.database import AsyncSessionLocal
 from config.env import UploadConfig
 from exceptions.exception import ServiceException
-from module_ai.dao.ai_chat_dao import AiChatConfigDao
+from module_ai.dao.ai_chat_dao import AiChatConfigDao, AiChatSessionDao
 from module_ai.dao.ai_model_dao import AiModelDao
 from module_ai.entity.do.ai_chat_do import AiChatConfig
 from module_ai.entity.vo.ai_chat_vo import (
@@ -24,6 +27,7 @@ from module_ai.entity.vo.ai_chat_vo import (
     AiChatRequestModel,
     AiChatSessionBaseModel,
     AiChatSessionModel,
+    AiChatSessionPageQueryModel,
     ChatMessageModel,
     MessageMetrics,
     SessionDataModel,
@@ -33,6 +37,8 @@ from module_ai.entity.vo.ai_model_vo import AiModelModel
 from utils.ai_util import AiUtil
 from utils.common_util import CamelCaseUtil
 from utils.crypto_util import CryptoUtil
+from utils.log_util import logger
+from utils.stream_util import StreamFrameBuffer
 
 if TYPE_CHECKING:
     from agno.models.message import Message
@@ -46,6 +52,16 @@ class AiChatService:
     AI对话服务层
     """
 
+    # 会话标题截取长度
+    title_limit = 20
+    # 每次对话运行产生的消息条数（用户消息及模型回复）
+    run_message_count = 2
+    # 回填会话索引时每批读取的会话数量
+    session_index_batch_size = 100
+    # 流式响应合并文本片段的时间窗口（单位：秒）及单帧最大字符数
+    stream_flush_interval = 0.05
+    stream_flush_size = 1024
+
     @classmethod
     def _resolve_temperature(cls, user_config: AiChatConfigModel, model_config: AiModelModel) -> float:
         """
@@ -107,9 +123,9 @@ class AiChatService:
         :param num_history: 历史消息轮数
         :return: Agent对象
         """
-        real_api_key = CryptoUtil.decrypt(model_config.api_key)
+        real_api_key = CryptoUtil.decrypt_with_cache(model_config.api_key)
 
-        model = AiUtil.get_model_from_factory(
+        model = AiUtil.get_pooled_model(
             provider=model_config.provider,
             model_code=model_config.model_code,
             model_name=model_config.model_name,
@@ -198,69 +214,106 @@ class AiChatService:
 
         return result if result else None
 
+    @classmethod
+    def _get_chunk_frames(cls, frame_buffer: StreamFrameBuffer, chunk: RunOutputEvent, is_reasoning: bool) -> list[str]:
+        """
+        将Agent输出事件转换为需要立即输出的帧，文本片段先写入帧缓冲合并
+
+        :param frame_buffer: 流式响应帧缓冲
+        :param chunk: Agent输出事件
+        :param is_reasoning: 是否输出推理内容
+        :return: 需要立即输出的帧列表
+        """
+        frames = []
+        if chunk.event == RunEvent.run_started and chunk.run_id:
+            frames.append(frame_buffer.frame({'run_id': chunk.run_id, 'type': 'run_info'}))
+        if chunk.event == RunEvent.run_content:
+            reasoning = getattr(chunk, 'reasoning_content', None)
+            if reasoning and is_reasoning:
+                frames.extend(frame_buffer.append('reasoning', reasoning))
+            if chunk.content:
+                frames.extend(frame_buffer.append('content', chunk.content))
+        if chunk.event == RunEvent.run_completed:
+            frames.extend(frame_buffer.flush())
+            if chunk.metrics:
+                frames.append(
+                    frame_buffer.frame(
+                        {'metrics': CamelCaseUtil.transform_result(chunk.metrics.to_dict()), 'type': 'metrics'}
+                    )
+                )
+
+        return frames
+
     @classmethod
     async def _stream_agent(
         cls,
+        request: Request,
         agent: Agent,
         chat_req: AiChatRequestModel,
         run_kwargs: dict[str, Any],
         is_reasoning: bool,
         session_id: str,
+        user_id: int,
     ) -> AsyncGenerator[str, None]:
         """
-        将Agent输出流式转换为前端SSE消息
+        将Agent输出流式转换为前端SSE消息，连续的文本片段合并后输出，运行完成时更新会话索引，
+        客户端断开连接时取消本次运行
 
+        :param request: Request对象
         :param agent: Agent实例
         :param chat_req: 对话请求对象
         :param run_kwargs: 运行参数字典
         :param is_reasoning: 是否输出推理内容
         :param session_id: 会话ID
+        :param user_id: 用户ID
         :return: SSE消息生成器
         """
-        full_response = ''
-        full_reasoning = ''
+        frame_buffer = StreamFrameBuffer(cls.stream_flush_interval, cls.stream_flush_size)
+        response_stream: AsyncGenerator[RunOutputEvent, None] | None = None
+        run_id = None
+        is_completed = False
         try:
-            yield json.dumps({'session_id': session_id, 'type': 'meta'}) + '\n'
+            yield frame_buffer.frame({'session_id': session_id, 'type': 'meta'})
 
-            response_stream: AsyncIterator[RunOutputEvent] = agent.arun(chat_req.message, **run_kwargs)
+            response_stream = agent.arun(chat_req.message, **run_kwargs)
 
             async for chunk in response_stream:
-                content = None
-                reasoning = None
-
                 if chunk.event == RunEvent.run_started and chunk.run_id:
-                    yield json.dumps({'run_id': chunk.run_id, 'type': 'run_info'}) + '\n'
-
-                if chunk.event == RunEvent.run_content:
-                    content = chunk.content
-                    if hasattr(chunk, 'reasoning_content') and chunk.reasoning_content:
-                        reasoning = chunk.reasoning_content
-
-                if reasoning and is_reasoning:
-                    full_reasoning += reasoning
-                    yield json.dumps({'content': reasoning, 'type': 'reasoning'}) + '\n'
-
-                if chunk.event == RunEvent.run_completed and chunk.metrics:
-                    yield (
-                        json.dumps(
-                            {'metrics': CamelCaseUtil.transform_result(chunk.metrics.to_dict()), 'type': 'metrics'}
-                        )
-                        + '\n'
-                    )
-
-                if content:
-                    full_response += content
-                    yield json.dumps({'content': content, 'type': 'content'}) + '\n'
+                    run_id = chunk.run_id
+                if chunk.event == RunEvent.run_completed:
+                    is_completed = True
+                    await cls._record_chat_session(session_id, user_id, chat_req.message)
+                frames = cls._get_chunk_frames(frame_buffer, chunk, is_reasoning)
+                if frames:
+                    if await request.is_disconnected():
+                        return
+                    for frame in frames:
+                        yield frame
+            for frame in frame_buffer.flush():
+                yield frame
+            yield frame_buffer.frame({'metrics': frame_buffer.get_metrics(), 'type': 'stream_metrics'})
         except Exception as e:
-            yield json.dumps({'error': str(e), 'type': 'error'}) + '\n'
+            yield frame_buffer.frame({'error': str(e), 'type': 'error'})
+        finally:
+            # 客户端断开连接后所在任务会被取消，清理操作需屏蔽取消
+            with anyio.CancelScope(shield=True):
+                if run_id and not is_completed:
+                    await acancel_run(run_id)
+                if response_stream is not None:
+                    await response_stream.aclose()
+            logger.info(
+                f'会话{session_id}流式响应结束，{"已完成" if is_completed else "未完成"}，'
+                f'统计信息：{frame_buffer.get_metrics()}'
+            )
 
     @classmethod
     async def chat_services(
-        cls, query_db: AsyncSession, chat_req: AiChatRequestModel, user_id: int
+        cls, request: Request, query_db: AsyncSession, chat_req: AiChatRequestModel, user_id: int
     ) -> AsyncGenerator[str, None]:
         """
         流式对话
 
+        :param request: Request对象
         :param query_db: orm对象
         :param chat_req: 对话请求对象
         :param user_id: 用户ID
@@ -293,11 +346,13 @@ class AiChatService:
         )
         run_kwargs = cls._build_run_kwargs(chat_req, user_config)
         async for chunk in cls._stream_agent(
+            request=request,
             agent=agent,
             chat_req=chat_req,
             run_kwargs=run_kwargs,
             is_reasoning=is_reasoning,
             session_id=session_id,
+            user_id=user_id,
         ):
             yield chunk
 
@@ -350,45 +405,154 @@ class AiChatService:
         return CrudResponseModel(is_success=True, message='保存成功')
 
     @classmethod
-    async def get_chat_session_list_services(cls, user_id: int) -> list[AiChatSessionBaseModel]:
+    async def get_chat_session_list_services(
+        cls, query_db: AsyncSession, user_id: int, query_object: AiChatSessionPageQueryModel
+    ) -> PageModel | list[AiChatSessionBaseModel]:
         """
-        获取用户会话列表
+        从会话索引中获取用户会话列表，不读取会话内容
 
+        :param query_db: orm对象
         :param user_id: 用户ID
-        :return: 用户会话列表
+        :param query_object: 查询参数对象
+        :return: 用户会话列表，传入每页记录数时返回分页数据对象
         """
-        # 获取Agno会话列表
-        storage = AiUtil.get_storage_engine()
-        sessions: list[Session] = await storage.get_sessions(
-            user_id=str(user_id),
-            component_id='chat-agent',
-            session_type=SessionType.AGENT,
+        is_page = bool(query_object.page_size)
+        if is_page and not query_object.page_num:
+            query_object.page_num = 1
+        chat_session_list = await AiChatSessionDao.get_chat_session_list(query_db, user_id, query_object, is_page)
+        if is_page:
+            chat_session_list.rows = [cls._to_session_base_model(row) for row in chat_session_list.rows]
+            return chat_session_list
+
+        return [cls._to_session_base_model(row) for row in chat_session_list]
+
+    @classmethod
+    def _to_session_base_model(cls, chat_session: dict[str, Any]) -> AiChatSessionBaseModel:
+        """
+        将会话索引转换为会话基础模型
+
+        :param chat_session: 会话索引字典
+        :return: 会话基础模型
+        """
+        return AiChatSessionBaseModel(
+            sessionId=chat_session.get('sessionId'),
+            sessionTitle=chat_session.get('sessionTitle'),
+            userId=str(chat_session.get('userId')),
+            messageCount=chat_session.get('messageCount'),
+            createdAt=chat_session.get('createdAt'),
+            updatedAt=chat_session.get('updatedAt'),
         )
 
-        result = []
-        for s in sessions:
-            created_at = datetime.fromtimestamp(s.created_at) if s.created_at else None
-            updated_at = datetime.fromtimestamp(s.updated_at) if s.updated_at else None
-
-            title_limit = 20
-            session_title = s.runs[0].input.input_content[:title_limit] + '...' if s.runs else ''
-
-            result.append(
-                AiChatSessionBaseModel(
-                    sessionId=s.session_id,
-                    sessionTitle=session_title if len(session_title) <= title_limit else session_title[:title_limit],
-                    userId=s.user_id,
-                    createdAt=created_at,
-                    updatedAt=updated_at,
-                )
+    @classmethod
+    def _get_session_title(cls, input_content: str | None) -> str:
+        """
+        根据会话首条消息生成会话标题
+
+        :param input_content: 会话首条消息
+        :return: 会话标题
+        """
+        if input_content is None:
+            return ''
+        session_title = input_content[: cls.title_limit] + '...'
+
+        return session_title if len(session_title) <= cls.title_limit else session_title[: cls.title_limit]
+
+    @classmethod
+    async def _record_chat_session(cls, session_id: str, user_id: int, message: str) -> None:
+        """
+        对话运行完成后更新会话索引，会话索引不存在时以本次消息作为标题新增，更新失败不影响对话
+
+        :param session_id: 会话ID
+        :param user_id: 用户ID
+        :param message: 本次用户消息
+        :return:
+        """
+        now = datetime.now()
+        try:
+            async with AsyncSessionLocal() as session:
+                if not await AiChatSessionDao.increase_chat_session_message_count_dao(
+                    session, session_id, cls.run_message_count, now
+                ):
+                    try:
+                        await AiChatSessionDao.add_chat_session_dao(
+                            session,
+                            {
+                                'session_id': session_id,
+                                'user_id': user_id,
+                                'session_title': cls._get_session_title(message),
+                                'message_count': cls.run_message_count,
+                                'created_at': now,
+                                'updated_at': now,
+                            },
+                        )
+                    except IntegrityError:
+                        # 同一会话的并发运行已新增会话索引
+                        await session.rollback()
+                        await AiChatSessionDao.increase_chat_session_message_count_dao(
+                            session, session_id, cls.run_message_count, now
+                        )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f'更新会话{session_id}的会话索引失败：{e}')
+
+    @classmethod
+    async def init_chat_session_index_services(cls, query_db: AsyncSession) -> int:
+        """
+        应用初始化：会话索引为空时根据Agno存储的会话回填会话索引service
+
+        :param query_db: orm对象
+        :return: 回填的会话索引数量
+        """
+        if await AiChatSessionDao.count_chat_session_dao(query_db) > 0:
+            return 0
+        storage = AiUtil.get_storage_engine()
+        count = 0
+        page = 1
+        # 会话索引的创建及更新时间不能为空，Agno会话缺少时间时使用回填时间
+        now = datetime.now()
+        while True:
+            sessions: list[Session] = await storage.get_sessions(
+                component_id='chat-agent',
+                session_type=SessionType.AGENT,
+                limit=cls.session_index_batch_size,
+                page=page,
+                sort_by='created_at',
+                sort_order='asc',
             )
-        return result
+            chat_session_list = [
+                {
+                    'session_id': s.session_id,
+                    'user_id': int(s.user_id),
+                    'session_title': cls._get_session_title(s.runs[0].input.input_content) if s.runs else '',
+                    'message_count': len(s.runs or []) * cls.run_message_count,
+                    'created_at': datetime.fromtimestamp(s.created_at) if s.created_at else now,
+                    'updated_at': datetime.fromtimestamp(s.updated_at or s.created_at)
+                    if s.updated_at or s.created_at
+                    else now,
+                }
+                for s in sessions
+                if s.user_id and s.user_id.isdigit()
+            ]
+            await AiChatSessionDao.add_chat_session_batch_dao(query_db, chat_session_list)
+            count += len(chat_session_list)
+            if len(sessions) < cls.session_index_batch_size:
+                break
+            page += 1
+        try:
+            await query_db.commit()
+        except IntegrityError:
+            # 多个进程同时启动时，会话索引可能已由其他进程回填
+            await query_db.rollback()
+            return 0
+
+        return count
 
     @classmethod
-    async def delete_chat_session_services(cls, session_id: str) -> CrudResponseModel:
+    async def delete_chat_session_services(cls, query_db: AsyncSession, session_id: str) -> CrudResponseModel:
         """
-        删除会话
+        删除会话及其会话索引
 
+        :param query_db: orm对象
         :param session_id: 会话ID
         :return: 删除结果
         """
@@ -396,6 +560,12 @@ class AiChatService:
         delete_result = await storage.delete_session(session_id=session_id)
         if not delete_result:
             raise ServiceException(message='删除会话失败')
+        try:
+            await AiChatSessionDao.delete_chat_session_dao(query_db, session_id)
+            await query_db.commit()
+        except Exception as e:
+            await query_db.rollback()
+            raise e
         return CrudResponseModel(is_success=True, message='删除成功')
 
     @classmethod
@@ -7,14 +7,19 @@ from fastapi.responses import HTMLResponse
 
 from common.router import auto_register_routers
 from config.env import AppConfig
-from config.get_db import init_create_table
+from config.get_db import init_ai_chat_session_index, init_create_table, init_dept_closure
+from config.get_log_writer import LogWriterUtil
 from config.get_redis import RedisUtil
 from config.get_scheduler import SchedulerUtil
+from config.get_server_monitor import ServerMonitorUtil
 from exceptions.handle import handle_exception
 from middlewares.handle import handle_middleware
 from sub_applications.handle import handle_sub_applications
+from utils.ai_util import AiUtil
 from utils.common_util import worship
+from utils.ip_location_util import IpLocationUtil
 from utils.log_util import logger
+from utils.pwd_util import PwdUtil
 
 
 # 生命周期事件
@@ -23,14 +28,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info(f'⏰️ {AppConfig.app_name}开始启动')
     worship()
     await init_create_table()
+    await init_dept_closure()
+    await init_ai_chat_session_index()
     app.state.redis = await RedisUtil.create_redis_pool()
     await RedisUtil.init_sys_dict(app.state.redis)
     await RedisUtil.init_sys_config(app.state.redis)
+    await RedisUtil.init_online_session(app.state.redis)
+    await LogWriterUtil.init_log_writer()
     await SchedulerUtil.init_system_scheduler()
+    await ServerMonitorUtil.init_server_monitor()
     logger.info(f'🚀 {AppConfig.app_name}启动成功')
     yield
-    await RedisUtil.close_redis_pool(app)
+    await ServerMonitorUtil.close_server_monitor()
     await SchedulerUtil.close_system_scheduler()
+    await LogWriterUtil.close_log_writer()
+    await IpLocationUtil.close()
+    await AiUtil.close()
+    PwdUtil.close()
+    await RedisUtil.close_redis_pool(app)
 
 
 def setup_docs_static_resources(
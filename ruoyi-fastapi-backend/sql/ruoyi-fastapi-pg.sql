@@ -50,6 +50,52 @@ insert into sys_dept values(107,  101, '0,100,101',  '运维部门',   5, '年
 insert into sys_dept values(108,  102, '0,100,102',  '市场部门',   1, '年糕', '15888888888', 'niangao@qq.com', '0', '0', 'admin', current_timestamp, '', null);
 insert into sys_dept values(109,  102, '0,100,102',  '财务部门',   2, '年糕', '15888888888', 'niangao@qq.com', '0', '0', 'admin', current_timestamp, '', null);
 
+-- ----------------------------
+-- 部门闭包表
+-- ----------------------------
+drop table if exists sys_dept_closure;
+create table sys_dept_closure (
+    ancestor_id bigint not null,
+    descendant_id bigint not null,
+    depth int4 not null default 0,
+    primary key (ancestor_id, descendant_id)
+);
+create index idx_sys_dept_closure_descendant on sys_dept_closure (descendant_id, depth);
+comment on column sys_dept_closure.ancestor_id is '祖先部门id';
+comment on column sys_dept_closure.descendant_id is '后代部门id';
+comment on column sys_dept_closure.depth is '层级距离（0代表自身）';
+comment on table sys_dept_closure is '部门闭包表';
+
+-- ----------------------------
+-- 初始化-部门闭包表数据
+-- ----------------------------
+insert into sys_dept_closure values(100, 100, 0);
+insert into sys_dept_closure values(101, 101, 0);
+insert into sys_dept_closure values(100, 101, 1);
+insert into sys_dept_closure values(102, 102, 0);
+insert into sys_dept_closure values(100, 102, 1);
+insert into sys_dept_closure values(103, 103, 0);
+insert into sys_dept_closure values(101, 103, 1);
+insert into sys_dept_closure values(100, 103, 2);
+insert into sys_dept_closure values(104, 104, 0);
+insert into sys_dept_closure values(101, 104, 1);
+insert into sys_dept_closure values(100, 104, 2);
+insert into sys_dept_closure values(105, 105, 0);
+insert into sys_dept_closure values(101, 105, 1);
+insert into sys_dept_closure values(100, 105, 2);
+insert into sys_dept_closure values(106, 106, 0);
+insert into sys_dept_closure values(101, 106, 1);
+insert into sys_dept_closure values(100, 106, 2);
+insert into sys_dept_closure values(107, 107, 0);
+insert into sys_dept_closure values(101, 107, 1);
+insert into sys_dept_closure values(100, 107, 2);
+insert into sys_dept_closure values(108, 108, 0);
+insert into sys_dept_closure values(102, 108, 1);
+insert into sys_dept_closure values(100, 108, 2);
+insert into sys_dept_closure values(109, 109, 0);
+insert into sys_dept_closure values(102, 109, 1);
+insert into sys_dept_closure values(100, 109, 2);
+
 -- ----------------------------
 -- 2、用户信息表
 -- ----------------------------
@@ -1089,6 +1135,29 @@ comment on column ai_chat_config.image_max_size_mb is '图片最大大小(MB)';
 comment on column ai_chat_config.create_time is '创建时间';
 comment on column ai_chat_config.update_time is '更新时间';
 
+
+-- ----------------------------
+-- 22、AI对话会话索引表
+-- ----------------------------
+drop table if exists ai_chat_session;
+create table ai_chat_session (
+  session_id              varchar(64)    not null,
+  user_id                 bigint         not null,
+  session_title           varchar(64)    default '',
+  message_count           int4           not null default 0,
+  created_at              timestamp(0)   not null,
+  updated_at              timestamp(0)   not null,
+  primary key (session_id)
+);
+create index idx_ai_chat_session_user_updated on ai_chat_session (user_id, updated_at, session_id);
+comment on table ai_chat_session is 'AI对话会话索引表';
+comment on column ai_chat_session.session_id is '会话ID';
+comment on column ai_chat_session.user_id is '用户ID';
+comment on column ai_chat_session.session_title is '会话标题';
+comment on column ai_chat_session.message_count is '消息条数';
+comment on column ai_chat_session.created_at is '创建时间';
+comment on column ai_chat_session.updated_at is '更新时间';
+
 CREATE OR REPLACE FUNCTION "find_in_set"(int8, varchar)
     RETURNS "pg_catalog"."bool" AS $BODY$
 DECLARE
@@ -34,6 +34,48 @@ insert into sys_dept values(107,  101, '0,100,101',  '运维部门',   5, '年
 insert into sys_dept values(108,  102, '0,100,102',  '市场部门',   1, '年糕', '15888888888', 'niangao@qq.com', '0', '0', 'admin', sysdate(), '', null);
 insert into sys_dept values(109,  102, '0,100,102',  '财务部门',   2, '年糕', '15888888888', 'niangao@qq.com', '0', '0', 'admin', sysdate(), '', null);
 
+-- ----------------------------
+-- 部门闭包表
+-- ----------------------------
+drop table if exists sys_dept_closure;
+create table sys_dept_closure (
+  ancestor_id       bigint(20)      not null                   comment '祖先部门id',
+  descendant_id     bigint(20)      not null                   comment '后代部门id',
+  depth             int(4)          not null default 0         comment '层级距离（0代表自身）',
+  primary key (ancestor_id, descendant_id),
+  key idx_sys_dept_closure_descendant (descendant_id, depth)
+) engine=innodb comment = '部门闭包表';
+
+-- ----------------------------
+-- 初始化-部门闭包表数据
+-- ----------------------------
+insert into sys_dept_closure values(100, 100, 0);
+insert into sys_dept_closure values(101, 101, 0);
+insert into sys_dept_closure values(100, 101, 1);
+insert into sys_dept_closure values(102, 102, 0);
+insert into sys_dept_closure values(100, 102, 1);
+insert into sys_dept_closure values(103, 103, 0);
+insert into sys_dept_closure values(101, 103, 1);
+insert into sys_dept_closure values(100, 103, 2);
+insert into sys_dept_closure values(104, 104, 0);
+insert into sys_dept_closure values(101, 104, 1);
+insert into sys_dept_closure values(100, 104, 2);
+insert into sys_dept_closure values(105, 105, 0);
+insert into sys_dept_closure values(101, 105, 1);
+insert into sys_dept_closure values(100, 105, 2);
+insert into sys_dept_closure values(106, 106, 0);
+insert into sys_dept_closure values(101, 106, 1);
+insert into sys_dept_closure values(100, 106, 2);
+insert into sys_dept_closure values(107, 107, 0);
+insert into sys_dept_closure values(101, 107, 1);
+insert into sys_dept_closure values(100, 107, 2);
+insert into sys_dept_closure values(108, 108, 0);
+insert into sys_dept_closure values(102, 108, 1);
+insert into sys_dept_closure values(100, 108, 2);
+insert into sys_dept_closure values(109, 109, 0);
+insert into sys_dept_closure values(102, 109, 1);
+insert into sys_dept_closure values(100, 109, 2);
+
 
 -- ----------------------------
 -- 2、用户信息表
@@ -809,3 +851,20 @@ create table ai_chat_config (
   update_time             datetime                                   comment '更新时间',
   primary key (chat_config_id)
 ) engine=innodb auto_increment=1 comment = 'AI对话配置表';
+
+
+
+-- ----------------------------
+-- 22、AI对话会话索引表
+-- ----------------------------
+drop table if exists ai_chat_session;
+create table ai_chat_session (
+  session_id              varchar(64)     not null                   comment '会话ID',
+  user_id                 bigint(20)      not null                   comment '用户ID',
+  session_title           varchar(64)     default ''                 comment '会话标题',
+  message_count           int(11)         not null default 0         comment '消息条数',
+  created_at              datetime        not null                   comment '创建时间',
+  updated_at              datetime        not null                   comment '更新时间',
+  primary key (session_id),
+  key idx_ai_chat_session_user_updated (user_id, updated_at, session_id)
+) engine=innodb comment = 'AI对话会话索引表';
\ No newline at end of file
@@ -0,0 +1,25 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 导入utils.ai_util后允许加载的模块总数，全部导入模型提供商及存储引擎时超过5000个
+AI_UTIL_MODULE_BUDGET = 1000
+# 首次使用时才允许导入的模块前缀
+AI_UTIL_LAZY_MODULE_PREFIXES = ('agno.models.', 'agno.db.')
+
+
+def test_ai_util_import_budget() -> None:
+    """
+    在独立进程中导入utils.ai_util，校验加载的模块数量不超过预算，且未提前导入模型提供商及存储引擎模块
+    """
+    code = 'import json, sys; import utils.ai_util; print(json.dumps(sorted(sys.modules)))'
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120, check=True
+    )
+    modules = json.loads(result.stdout.strip().splitlines()[-1])
+    eager_modules = [module for module in modules if module.startswith(AI_UTIL_LAZY_MODULE_PREFIXES)]
+
+    assert not eager_modules, f'以下模块应在首次使用时导入：{eager_modules}'
+    assert len(modules) <= AI_UTIL_MODULE_BUDGET, f'导入utils.ai_util加载了{len(modules)}个模块'
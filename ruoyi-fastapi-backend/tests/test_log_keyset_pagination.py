@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from module_admin.dao.log_dao import OperationLogDao
+from module_admin.entity.do.log_do import SysOperLog
+from module_admin.entity.vo.log_vo import OperLogPageQueryModel
+
+pytest.importorskip('aiosqlite')
+
+LOG_COUNT = 25
+PAGE_SIZE = 4
+
+
+def create_oper_logs() -> list[dict[str, Any]]:
+    """
+    生成操作日志测试数据，包含操作时间相同及操作时间为NULL的数据
+
+    :return: 操作日志数据列表
+    """
+    base_time = datetime(2024, 1, 1)
+    return [
+        {
+            'oper_id': index + 1,
+            'title': f'用户管理{index}',
+            'oper_time': None if index % 5 == 0 else base_time + timedelta(minutes=index // 3),
+        }
+        for index in range(LOG_COUNT)
+    ]
+
+
+async def fetch_all_pages(is_asc: str | None) -> tuple[list[int], list[tuple[str, Any]]]:
+    """
+    使用默认排序列按游标逐页查询全部操作日志
+
+    :param is_asc: 排序方式
+    :return: 按页查询到的操作日志id列表及执行的查询语句与参数
+    """
+    engine = create_async_engine('sqlite+aiosqlite://')
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        'before_cursor_execute',
+        lambda _conn, _cursor, statement, parameters, *_args: statements.append((statement, parameters)),
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(SysOperLog.__table__.create)
+        await conn.execute(insert(SysOperLog), create_oper_logs())
+    oper_ids = []
+    async with AsyncSession(engine) as db:
+        cursor = ''
+        for page_num in range(1, LOG_COUNT + 1):
+            query_object = OperLogPageQueryModel(
+                pageNum=page_num, pageSize=PAGE_SIZE, cursor=cursor, isAsc=is_asc, orderByColumn='operTime'
+            )
+            page = await OperationLogDao.get_operation_log_list(db, query_object, is_page=True)
+            assert page.total == LOG_COUNT
+            oper_ids.extend(row['operId'] for row in page.rows)
+            if not page.has_next:
+                break
+            assert page.next_cursor
+            cursor = page.next_cursor
+    await engine.dispose()
+    return oper_ids, statements
+
+
+@pytest.mark.parametrize('is_asc', [None, 'descending', 'ascending'])
+def test_oper_log_list_uses_keyset_pagination(is_asc: str | None) -> None:
+    """
+    默认的操作日志列表按可为NULL的操作时间排序时仍使用游标分页，逐页查询的结果与整体排序一致且不重复、不遗漏
+    """
+    oper_ids, statements = asyncio.run(fetch_all_pages(is_asc))
+    oper_logs = create_oper_logs()
+    is_desc = is_asc != 'ascending'
+    # SQLite排序时将NULL视为最小值
+    expected = sorted(
+        oper_logs,
+        key=lambda x: (x['oper_time'] is not None, x['oper_time'] or datetime.min, x['oper_id']),
+        reverse=is_desc,
+    )
+
+    assert oper_ids == [item['oper_id'] for item in expected]
+    # SQLite在LIMIT后固定附带OFFSET，游标分页时偏移量始终为0
+    assert all(parameters[-1] == 0 for statement, parameters in statements if statement.endswith('OFFSET ?'))
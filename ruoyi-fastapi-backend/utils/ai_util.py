@@ -1,106 +1,129 @@
-from agno.db.base import AsyncBaseDb
-from agno.db.mysql import AsyncMySQLDb
-from agno.db.postgres import AsyncPostgresDb
-from agno.models.aimlapi import AIMLAPI
-from agno.models.anthropic import Claude
-from agno.models.base import Model
-from agno.models.cerebras import Cerebras, CerebrasOpenAI
-from agno.models.cohere import Cohere
-from agno.models.cometapi import CometAPI
-from agno.models.dashscope import DashScope
-from agno.models.deepinfra import DeepInfra
-from agno.models.deepseek import DeepSeek
-from agno.models.fireworks import Fireworks
-from agno.models.google import Gemini
-from agno.models.groq import Groq
-from agno.models.huggingface import HuggingFace
-from agno.models.langdb import LangDB
-from agno.models.litellm import LiteLLM, LiteLLMOpenAI
-from agno.models.llama_cpp import LlamaCpp
-from agno.models.lmstudio import LMStudio
-from agno.models.meta import Llama
-from agno.models.mistral import MistralChat
-from agno.models.n1n import N1N
-from agno.models.nebius import Nebius
-from agno.models.nexus import Nexus
-from agno.models.nvidia import Nvidia
-from agno.models.ollama import Ollama
-from agno.models.openai import OpenAIChat
-from agno.models.openai.responses import OpenAIResponses
-from agno.models.openrouter import OpenRouter
-from agno.models.perplexity import Perplexity
-from agno.models.portkey import Portkey
-from agno.models.requesty import Requesty
-from agno.models.sambanova import Sambanova
-from agno.models.siliconflow import Siliconflow
-from agno.models.together import Together
-from agno.models.vercel import V0
-from agno.models.vllm import VLLM
-from agno.models.xai import xAI
+import hashlib
+import importlib
+import json
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from agno.utils.http import aclose_default_clients
 
 from config.database import async_engine
 from config.env import DataBaseConfig
+from utils.cache_util import LRUCache
+
+if TYPE_CHECKING:
+    from agno.db.base import AsyncBaseDb
+    from agno.models.base import Model
 
-provider_model_map: dict[str, type[Model]] = {
-    'AIMLAPI': AIMLAPI,
-    'Anthropic': Claude,
-    'Cerebras': Cerebras,
-    'CerebrasOpenAI': CerebrasOpenAI,
-    'Cohere': Cohere,
-    'CometAPI': CometAPI,
-    'DashScope': DashScope,
-    'DeepInfra': DeepInfra,
-    'DeepSeek': DeepSeek,
-    'Fireworks': Fireworks,
-    'Google': Gemini,
-    'Groq': Groq,
-    'HuggingFace': HuggingFace,
-    'LangDB': LangDB,
-    'LiteLLM': LiteLLM,
-    'LiteLLMOpenAI': LiteLLMOpenAI,
-    'LlamaCpp': LlamaCpp,
-    'LMStudio': LMStudio,
-    'Meta': Llama,
-    'Mistral': MistralChat,
-    'N1N': N1N,
-    'Nebius': Nebius,
-    'Nexus': Nexus,
-    'Nvidia': Nvidia,
-    'Ollama': Ollama,
-    'OpenAI': OpenAIChat,
-    'OpenAIResponses': OpenAIResponses,
-    'OpenRouter': OpenRouter,
-    'Perplexity': Perplexity,
-    'Portkey': Portkey,
-    'Requesty': Requesty,
-    'Sambanova': Sambanova,
-    'SiliconFlow': Siliconflow,
-    'Together': Together,
-    'Vercel': V0,
-    'VLLM': VLLM,
-    'xAI': xAI,
+# 提供商对应的模型类，以"模块路径:类名"的形式声明，首次使用时才导入对应的模型模块
+provider_model_map: dict[str, str] = {
+    'AIMLAPI': 'agno.models.aimlapi:AIMLAPI',
+    'Anthropic': 'agno.models.anthropic:Claude',
+    'Cerebras': 'agno.models.cerebras:Cerebras',
+    'CerebrasOpenAI': 'agno.models.cerebras:CerebrasOpenAI',
+    'Cohere': 'agno.models.cohere:Cohere',
+    'CometAPI': 'agno.models.cometapi:CometAPI',
+    'DashScope': 'agno.models.dashscope:DashScope',
+    'DeepInfra': 'agno.models.deepinfra:DeepInfra',
+    'DeepSeek': 'agno.models.deepseek:DeepSeek',
+    'Fireworks': 'agno.models.fireworks:Fireworks',
+    'Google': 'agno.models.google:Gemini',
+    'Groq': 'agno.models.groq:Groq',
+    'HuggingFace': 'agno.models.huggingface:HuggingFace',
+    'LangDB': 'agno.models.langdb:LangDB',
+    'LiteLLM': 'agno.models.litellm:LiteLLM',
+    'LiteLLMOpenAI': 'agno.models.litellm:LiteLLMOpenAI',
+    'LlamaCpp': 'agno.models.llama_cpp:LlamaCpp',
+    'LMStudio': 'agno.models.lmstudio:LMStudio',
+    'Meta': 'agno.models.meta:Llama',
+    'Mistral': 'agno.models.mistral:MistralChat',
+    'N1N': 'agno.models.n1n:N1N',
+    'Nebius': 'agno.models.nebius:Nebius',
+    'Nexus': 'agno.models.nexus:Nexus',
+    'Nvidia': 'agno.models.nvidia:Nvidia',
+    'Ollama': 'agno.models.ollama:Ollama',
+    'OpenAI': 'agno.models.openai:OpenAIChat',
+    'OpenAIResponses': 'agno.models.openai.responses:OpenAIResponses',
+    'OpenRouter': 'agno.models.openrouter:OpenRouter',
+    'Perplexity': 'agno.models.perplexity:Perplexity',
+    'Portkey': 'agno.models.portkey:Portkey',
+    'Requesty': 'agno.models.requesty:Requesty',
+    'Sambanova': 'agno.models.sambanova:Sambanova',
+    'SiliconFlow': 'agno.models.siliconflow:Siliconflow',
+    'Together': 'agno.models.together:Together',
+    'Vercel': 'agno.models.vercel:V0',
+    'VLLM': 'agno.models.vllm:VLLM',
+    'xAI': 'agno.models.xai:xAI',
 }
 
 
-storage_engine_map: dict[str, type[AsyncBaseDb]] = {
-    'mysql': AsyncMySQLDb,
-    'postgresql': AsyncPostgresDb,
+storage_engine_map: dict[str, str] = {
+    'mysql': 'agno.db.mysql:AsyncMySQLDb',
+    'postgresql': 'agno.db.postgres:AsyncPostgresDb',
 }
 
 
+default_provider_model = provider_model_map['OpenAI']
+default_storage_engine = storage_engine_map['mysql']
+
+
+# 每次响应结束后会关闭自身客户端的模型，不能在并发请求间共享
+unpoolable_providers = {'Google'}
+
+
 class AiUtil:
     """
     AI工具类
+
+    存储引擎在应用生命周期内只创建一次；模型实例按模型参数的哈希值放入进程内模型池复用，
+    模型持有的SDK客户端及其HTTP连接池随之复用，避免每次对话重新建立与提供商的连接。
     """
 
+    _storage_engine: 'AsyncBaseDb | None' = None
+    model_pool = LRUCache(maxsize=64)
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def import_class(cls, class_path: str) -> type[Any]:
+        """
+        根据"模块路径:类名"形式的字符串导入类，导入结果会被缓存
+
+        :param class_path: "模块路径:类名"形式的字符串
+        :return: 类对象
+        """
+        module_path, class_name = class_path.split(':', 1)
+
+        return getattr(importlib.import_module(module_path), class_name)
+
+    @classmethod
+    def get_model_class(cls, provider: str) -> type['Model']:
+        """
+        获取提供商对应的模型类，首次获取时才导入对应的模型模块，未知提供商使用OpenAIChat
+
+        :param provider: 提供商
+        :return: 模型类
+        """
+        return cls.import_class(provider_model_map.get(provider, default_provider_model))
+
     @classmethod
-    def get_storage_engine(cls) -> AsyncBaseDb:
+    def get_storage_engine(cls) -> 'AsyncBaseDb':
         """
-        获取存储引擎实例
+        获取存储引擎实例，首次获取时创建，之后复用同一实例
 
         :return: 存储引擎实例
         """
-        storage_engine_class = storage_engine_map.get(DataBaseConfig.db_type, AsyncMySQLDb)
+        if cls._storage_engine is None:
+            cls._storage_engine = cls._create_storage_engine()
+
+        return cls._storage_engine
+
+    @classmethod
+    def _create_storage_engine(cls) -> 'AsyncBaseDb':
+        """
+        创建存储引擎实例
+
+        :return: 存储引擎实例
+        """
+        storage_engine_class = cls.import_class(storage_engine_map.get(DataBaseConfig.db_type, default_storage_engine))
 
         return storage_engine_class(
             db_engine=async_engine,
@@ -128,7 +151,7 @@ class AiUtil:
         temperature: float | None = None,
         max_tokens: int | None = None,
         **kwargs,
-    ) -> Model:
+    ) -> 'Model':
         """
         从工厂获取模型实例
 
@@ -155,6 +178,59 @@ class AiUtil:
             params['host'] = base_url
         if provider == 'DashScope' and not base_url:
             params['base_url'] = 'https://dashscope.aliyuncs.com/compatible-mode/v1'
-        model_class = provider_model_map.get(provider, OpenAIChat)
+        model_class = cls.get_model_class(provider)
 
         return model_class(**params)
+
+    @classmethod
+    def get_pooled_model(
+        cls,
+        provider: str,
+        model_code: str,
+        model_name: str | None = None,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> 'Model':
+        """
+        从模型池获取模型实例，模型池中不存在时从工厂获取并放入模型池
+
+        :param provider: 提供商
+        :param model_code: 模型编码
+        :param model_name: 模型名称
+        :param api_key: API密钥
+        :param base_url: 基础URL
+        :param temperature: 温度
+        :param max_tokens: 最大令牌数
+        :return: 模型实例
+        """
+        params = {
+            'provider': provider,
+            'model_code': model_code,
+            'model_name': model_name,
+            'api_key': api_key,
+            'base_url': base_url,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+        }
+        if provider in unpoolable_providers:
+            return cls.get_model_from_factory(**params)
+        pool_key = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        model = cls.model_pool.get(pool_key)
+        if model is None:
+            model = cls.get_model_from_factory(**params)
+            cls.model_pool.set(pool_key, model)
+
+        return model
+
+    @classmethod
+    async def close(cls) -> None:
+        """
+        应用关闭时清空模型池及存储引擎实例，并关闭模型共用的HTTP客户端
+
+        :return:
+        """
+        cls.model_pool.clear()
+        cls._storage_engine = None
+        await aclose_default_clients()
@@ -0,0 +1,331 @@
+import asyncio
+import glob
+import os
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+import psutil
+from pydantic import BaseModel
+
+from utils.log_util import logger
+
+T = TypeVar('T', bound=BaseModel)
+
+_stop = object()
+
+
+class BatchWriter(Generic[T]):
+    """
+    异步批量写入工具类
+
+    写入请求先进入有界队列，由后台任务按条数或时间间隔批量取出后交给写入函数处理；
+    队列已满时在等待超时后丢弃数据，写入失败的数据会追加到磁盘溢出文件中，并在后续写入成功后重新写入；
+    启动时会一并重新写入上次运行中断时遗留的溢出数据
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: type[T],
+        flush_func: Callable[[list[T]], Awaitable[None]],
+        max_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval: int = 1000,
+        put_timeout: int = 50,
+        spill_path: str | None = None,
+    ) -> None:
+        """
+        初始化批量写入对象
+
+        :param name: 写入对象名称，同时作为溢出文件名称
+        :param model: 写入数据对应的pydantic模型，用于溢出文件的序列化及反序列化
+        :param flush_func: 批量写入函数
+        :param max_size: 队列最大长度
+        :param batch_size: 单次批量写入的最大条数
+        :param flush_interval: 批量写入的最大时间间隔（单位：毫秒）
+        :param put_timeout: 队列已满时的最大等待时间（单位：毫秒），超时后丢弃数据
+        :param spill_path: 溢出文件目录，为None时写入失败的数据直接丢弃
+        """
+        self.name = name
+        self.model = model
+        self.flush_func = flush_func
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval / 1000
+        self.put_timeout = put_timeout / 1000
+        self.spill_file = os.path.join(spill_path, f'{name}.jsonl') if spill_path else None
+        self.stats = {'enqueued': 0, 'written': 0, 'dropped': 0, 'spilled': 0, 'replayed': 0, 'failed_batches': 0}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        # 正在收集或写入的批次，关闭超时时写入溢出文件
+        self._batch: list[T] = []
+        # 溢出文件中是否存在待重新写入的数据
+        self._has_spill = False
+
+    def start(self) -> None:
+        """
+        启动后台写入任务
+
+        :return:
+        """
+        if self.spill_file:
+            os.makedirs(os.path.dirname(self.spill_file), exist_ok=True)
+            self._has_spill = os.path.exists(self.spill_file)
+        self._closed = False
+        self._task = asyncio.create_task(self._run(), name=f'batch-writer-{self.name}')
+
+    async def put(self, item: T) -> bool:
+        """
+        将数据放入写入队列，队列已满时最多等待put_timeout毫秒
+
+        :param item: 需要写入的数据
+        :return: 是否成功放入队列
+        """
+        if self._closed or self._task is None:
+            # 写入任务未启动或已关闭时直接写入
+            await self._write([item])
+            return True
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(item), self.put_timeout)
+            except asyncio.TimeoutError:
+                self._record_dropped('写入队列已满')
+                return False
+        self.stats['enqueued'] += 1
+        return True
+
+    def put_nowait(self, item: T) -> bool:
+        """
+        将数据放入写入队列且不等待，供事件循环线程中的同步代码调用，写入任务未运行或队列已满时直接丢弃数据
+
+        :param item: 需要写入的数据
+        :return: 是否成功放入队列
+        """
+        if self._closed or self._task is None:
+            self._record_dropped('写入任务未运行')
+            return False
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._record_dropped('写入队列已满')
+            return False
+        self.stats['enqueued'] += 1
+        return True
+
+    async def close(self, timeout: float = 10) -> None:
+        """
+        停止后台写入任务，并将队列中剩余的数据全部写入
+
+        :param timeout: 等待剩余数据写入的最大时间（单位：秒）
+        :return:
+        """
+        if self._task is None:
+            return
+        self._closed = True
+        try:
+            self._queue.put_nowait(_stop)
+            await asyncio.wait_for(self._task, timeout)
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            remaining = self._batch + [item for item in self._drain() if item is not _stop]
+            logger.error(f'{self.name}关闭超时，剩余{len(remaining)}条数据写入溢出文件')
+            await self._spill(remaining)
+        self._batch = []
+        self._task = None
+
+    def qsize(self) -> int:
+        """
+        获取当前队列中等待写入的数据条数
+
+        :return: 等待写入的数据条数
+        """
+        return self._queue.qsize()
+
+    async def _run(self) -> None:
+        """
+        后台写入任务，按条数或时间间隔批量取出队列中的数据并写入
+
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        await self._replay_spill(self._claim_orphan_replay_files())
+        stopped = False
+        while not stopped:
+            item = await self._queue.get()
+            if item is _stop:
+                break
+            batch = self._batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _stop:
+                    stopped = True
+                    break
+                batch.append(item)
+            written = await self._write(batch)
+            self._batch = []
+            if written and self._has_spill:
+                await self._replay_spill()
+
+    def _record_dropped(self, reason: str) -> None:
+        """
+        记录丢弃的数据条数，每丢弃1000条数据输出一次告警日志
+
+        :param reason: 丢弃原因
+        :return:
+        """
+        self.stats['dropped'] += 1
+        if self.stats['dropped'] % 1000 == 1:
+            logger.warning(f'{self.name}{reason}，累计丢弃{self.stats["dropped"]}条数据')
+
+    def _drain(self) -> list:
+        """
+        取出队列中的全部数据
+
+        :return: 队列中的全部数据
+        """
+        items = []
+        while not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        return items
+
+    async def _write(self, batch: list[T]) -> bool:
+        """
+        调用写入函数写入一批数据，失败时写入溢出文件
+
+        :param batch: 需要写入的数据
+        :return: 是否写入成功
+        """
+        try:
+            await self.flush_func(batch)
+            self.stats['written'] += len(batch)
+            return True
+        except Exception as e:
+            self.stats['failed_batches'] += 1
+            logger.error(f'{self.name}批量写入{len(batch)}条数据失败，详细错误信息：{e}')
+            await self._spill(batch)
+            return False
+
+    async def _spill(self, batch: list[T]) -> None:
+        """
+        将数据追加到溢出文件
+
+        :param batch: 需要写入溢出文件的数据
+        :return:
+        """
+        if not batch:
+            return
+        if not self.spill_file:
+            self.stats['dropped'] += len(batch)
+            return
+        lines = ''.join(f'{item.model_dump_json(by_alias=True)}\n' for item in batch)
+        try:
+            await asyncio.to_thread(self._append_file, self.spill_file, lines)
+            self._has_spill = True
+            self.stats['spilled'] += len(batch)
+        except OSError as e:
+            self.stats['dropped'] += len(batch)
+            logger.error(f'{self.name}写入溢出文件失败，已丢弃{len(batch)}条数据，详细错误信息：{e}')
+
+    def _claim_orphan_replay_files(self) -> list[str]:
+        """
+        认领上次运行中断时遗留的重新写入文件，所属进程仍在运行的文件由该进程处理，不会被认领
+
+        :return: 认领后的文件路径列表
+        """
+        if not self.spill_file:
+            return []
+        claimed_files = []
+        for replay_file in glob.glob(f'{glob.escape(self.spill_file)}.*.replay'):
+            pid = replay_file[len(self.spill_file) + 1 : -len('.replay')].split('.')[0]
+            if pid == str(os.getpid()):
+                # 当前进程启动前遗留的文件（如容器重启后进程号相同）
+                claimed_files.append(replay_file)
+                continue
+            if pid.isdigit() and psutil.pid_exists(int(pid)):
+                continue
+            # 重命名为当前进程的文件后再处理，多个进程同时认领同一文件时只有一个进程能够成功
+            claimed_file = f'{self.spill_file}.{os.getpid()}.{uuid.uuid4().hex}.replay'
+            try:
+                os.replace(replay_file, claimed_file)
+            except OSError:
+                continue
+            claimed_files.append(claimed_file)
+        return claimed_files
+
+    async def _replay_spill(self, orphan_files: list[str] | None = None) -> None:
+        """
+        重新写入溢出文件及遗留文件中的数据，写入失败的数据会重新追加到溢出文件
+
+        :param orphan_files: 需要一并重新写入的遗留文件路径列表
+        :return:
+        """
+        # 先处理遗留文件，避免与当前进程的重新写入文件同名时被覆盖
+        for orphan_file in orphan_files or []:
+            await self._replay_file(orphan_file)
+        if not self._has_spill:
+            return
+        replay_file = f'{self.spill_file}.{os.getpid()}.replay'
+        try:
+            os.replace(self.spill_file, replay_file)
+        except FileNotFoundError:
+            self._has_spill = False
+            return
+        except OSError as e:
+            logger.error(f'{self.name}读取溢出文件失败，详细错误信息：{e}')
+            return
+        self._has_spill = False
+        await self._replay_file(replay_file)
+
+    async def _replay_file(self, replay_file: str) -> None:
+        """
+        重新写入单个文件中的数据，处理完成后删除该文件
+
+        :param replay_file: 需要重新写入的文件路径
+        :return:
+        """
+        try:
+            lines = await asyncio.to_thread(self._read_lines, replay_file)
+        except OSError as e:
+            logger.error(f'{self.name}读取溢出文件失败，详细错误信息：{e}')
+            return
+        items = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                items.append(self.model.model_validate_json(line))
+            except ValueError as e:
+                self.stats['dropped'] += 1
+                logger.warning(f'{self.name}溢出文件中存在无法解析的数据，已丢弃，详细错误信息：{e}')
+        logger.info(f'{self.name}开始重新写入溢出文件中的{len(items)}条数据')
+        for index in range(0, len(items), self.batch_size):
+            batch = items[index : index + self.batch_size]
+            try:
+                await self.flush_func(batch)
+                self.stats['replayed'] += len(batch)
+            except Exception as e:
+                logger.error(f'{self.name}重新写入溢出文件数据失败，详细错误信息：{e}')
+                await self._spill(items[index:])
+                break
+        os.remove(replay_file)
+
+    @staticmethod
+    def _append_file(path: str, content: str) -> None:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(content)
+
+    @staticmethod
+    def _read_lines(path: str) -> list[str]:
+        with open(path, encoding='utf-8') as f:
+            return f.readlines()
@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+_missing = object()
+
+
+class LRUCache:
+    """
+    进程内LRU缓存工具类，支持容量上限及可选的过期时间
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None) -> None:
+        """
+        初始化LRU缓存
+
+        :param maxsize: 最大缓存条目数
+        :param ttl: 缓存过期时间（单位：秒），为None时不过期
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _missing) is not _missing
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        获取缓存值，命中时将其移动到队尾
+
+        :param key: 缓存键
+        :param default: 未命中时返回的默认值
+        :return: 缓存值
+        """
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expire_at, value = item
+        if expire_at is not None and expire_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """
+        设置缓存值，超出容量时淘汰最久未使用的条目
+
+        :param key: 缓存键
+        :param value: 缓存值
+        :param ttl: 当前条目的过期时间（单位：秒），为None时使用默认过期时间
+        :return:
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expire_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (expire_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        删除并返回缓存值
+
+        :param key: 缓存键
+        :param default: 未命中时返回的默认值
+        :return: 缓存值
+        """
+        item = self._data.pop(key, None)
+        if item is None:
+            return default
+        return item[1]
+
+    def clear(self) -> None:
+        """
+        清空缓存
+
+        :return:
+        """
+        self._data.clear()
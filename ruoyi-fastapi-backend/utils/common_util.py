@@ -2,6 +2,7 @@ import io
 import os
 import re
 from collections.abc import Generator, Sequence
+from functools import lru_cache
 from typing import Any, Literal, overload
 
 import pandas as pd
@@ -9,7 +10,10 @@ from openpyxl import Workbook
 from openpyxl.styles import Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
+from sqlalchemy import JSON, ColumnElement, Select, func, literal_column
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.engine.row import Row
+from sqlalchemy.orm import InstrumentedAttribute
 from sqlalchemy.orm.collections import InstrumentedList
 from sqlalchemy.sql.expression import TextClause, null
 
@@ -61,19 +65,107 @@ class SqlalchemyUtil:
         :return: 字典结果
         """
         if isinstance(obj, Base):
-            base_dict = obj.__dict__.copy()
-            base_dict.pop('_sa_instance_state', None)
-            for name, value in base_dict.items():
-                if isinstance(value, InstrumentedList):
-                    base_dict[name] = cls.serialize_result(value, 'snake_to_camel')
-        elif isinstance(obj, dict):
-            base_dict = obj.copy()
+            key_map, relationship_keys = cls.get_model_key_map(type(obj), transform_case)
+            base_dict = {
+                key_map[name] if name in key_map else cls.transform_key(name, transform_case): value
+                for name, value in obj.__dict__.items()
+                if name != '_sa_instance_state'
+            }
+            for name in relationship_keys:
+                key = key_map[name]
+                if isinstance(base_dict.get(key), InstrumentedList):
+                    base_dict[key] = cls.serialize_result(base_dict[key], 'snake_to_camel')
+            return base_dict
+        if transform_case == 'no_case':
+            return obj.copy()
+
+        return {cls.transform_key(k, transform_case): v for k, v in obj.items()}
+
+    @classmethod
+    def transform_key(cls, key: str, transform_case: Literal['no_case', 'snake_to_camel', 'camel_to_snake']) -> str:
+        """
+        按转换形式转换单个键名
+
+        :param key: 键名
+        :param transform_case: 转换得到的结果形式
+        :return: 转换后的键名
+        """
         if transform_case == 'snake_to_camel':
-            return {CamelCaseUtil.snake_to_camel(k): v for k, v in base_dict.items()}
+            return CamelCaseUtil.snake_to_camel(key)
         if transform_case == 'camel_to_snake':
-            return {SnakeCaseUtil.camel_to_snake(k): v for k, v in base_dict.items()}
+            return SnakeCaseUtil.camel_to_snake(key)
+        return key
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def get_model_key_map(
+        cls, model: type[Base], transform_case: Literal['no_case', 'snake_to_camel', 'camel_to_snake']
+    ) -> tuple[dict[str, str], tuple[str, ...]]:
+        """
+        获取模型属性名到转换后键名的映射，每个模型及转换形式仅计算一次
+
+        :param model: sqlalchemy模型类
+        :param transform_case: 转换得到的结果形式
+        :return: 属性名到转换后键名的映射及关系属性名列表
+        """
+        mapper = sa_inspect(model)
+        key_map = {attr.key: cls.transform_key(attr.key, transform_case) for attr in mapper.attrs}
+
+        return key_map, tuple(attr.key for attr in mapper.relationships)
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def get_row_keys(
+        cls, fields: tuple[str, ...], transform_case: Literal['no_case', 'snake_to_camel', 'camel_to_snake']
+    ) -> tuple[str, ...]:
+        """
+        获取查询结果行字段名转换后的键名，每种字段组合及转换形式仅计算一次
+
+        :param fields: 查询结果行的字段名
+        :param transform_case: 转换得到的结果形式
+        :return: 转换后的键名
+        """
+        return tuple(cls.transform_key(field, transform_case) for field in fields)
+
+    @classmethod
+    def is_column_query(cls, query: Select) -> bool:
+        """
+        判断查询语句是否仅查询多个列（不含ORM实体），此类查询的结果行可直接按字段名批量转换为字典
+
+        :param query: sqlalchemy查询语句
+        :return: 是否仅查询多个列
+        """
+        descriptions = query.column_descriptions
+        return len(descriptions) > 1 and not any(
+            isinstance(item['type'], type) and issubclass(item['type'], Base) for item in descriptions
+        )
+
+    @classmethod
+    def serialize_rows(
+        cls, rows: Sequence[Row], transform_case: Literal['no_case', 'snake_to_camel', 'camel_to_snake'] = 'no_case'
+    ) -> list[dict[str, Any]]:
+        """
+        将同一列查询语句的结果行批量序列化，字段名仅转换一次，无需逐行逐值判断类型
+
+        :param rows: 仅查询列（不含ORM实体）的查询结果行
+        :param transform_case: 转换得到的结果形式，可选的有'no_case'(不转换)、'snake_to_camel'(下划线转小驼峰)、'camel_to_snake'(小驼峰转下划线)，默认为'no_case'
+        :return: 序列化结果
+        """
+        if not rows:
+            return []
+        keys = cls.get_row_keys(rows[0]._fields, transform_case)
+
+        return [dict(zip(keys, row, strict=False)) for row in rows]
 
-        return base_dict
+    @classmethod
+    def get_model_columns(cls, model: type[Base]) -> list[InstrumentedAttribute]:
+        """
+        获取模型的全部列属性，用于以列代替ORM实体查询，避免列表查询时构造ORM实体对象
+
+        :param model: sqlalchemy模型类
+        :return: 列属性列表
+        """
+        return [getattr(model, attr.key) for attr in sa_inspect(model).column_attrs]
 
     @classmethod
     @overload
@@ -139,16 +231,9 @@ class SqlalchemyUtil:
         if isinstance(result, list):
             return [cls.serialize_result(row, transform_case) for row in result]
         if isinstance(result, Row):
-            if all(isinstance(row, Base) for row in result):
-                return [cls.base_to_dict(row, transform_case) for row in result]
             if any(isinstance(row, Base) for row in result):
                 return [cls.serialize_result(row, transform_case) for row in result]
-            result_dict = result._asdict()
-            if transform_case == 'snake_to_camel':
-                return {CamelCaseUtil.snake_to_camel(k): v for k, v in result_dict.items()}
-            if transform_case == 'camel_to_snake':
-                return {SnakeCaseUtil.camel_to_snake(k): v for k, v in result_dict.items()}
-            return result_dict
+            return dict(zip(cls.get_row_keys(result._fields, transform_case), result, strict=False))
         return result
 
     @classmethod
@@ -164,6 +249,30 @@ class SqlalchemyUtil:
             return null()
         return None
 
+    @classmethod
+    def json_array_agg(cls, dialect_name: str, *columns: ColumnElement) -> ColumnElement:
+        """
+        根据数据库方言动态返回将多行聚合为json数组的聚合函数，单列时聚合为值数组，多列时聚合为以列名为键的对象数组
+
+        :param dialect_name: 数据库方言名称
+        :param columns: 需要聚合的列
+        :return: 不同数据库方言对应的json数组聚合函数
+        """
+        if len(columns) == 1:
+            element = columns[0]
+        else:
+            key_value_pairs = []
+            for column in columns:
+                key_value_pairs.extend([literal_column(f"'{column.key}'"), column])
+            element = (
+                func.json_build_object(*key_value_pairs)
+                if dialect_name == 'postgresql'
+                else func.json_object(*key_value_pairs)
+            )
+        if dialect_name == 'postgresql':
+            return func.json_agg(element, type_=JSON)
+        return func.json_arrayagg(element, type_=JSON)
+
 
 class CamelCaseUtil:
     """
@@ -171,6 +280,7 @@ class CamelCaseUtil:
     """
 
     @classmethod
+    @lru_cache(maxsize=4096)
     def snake_to_camel(cls, snake_str: str) -> str:
         """
         下划线形式字符串(snake_case)转换为小驼峰形式字符串(camelCase)
@@ -232,6 +342,7 @@ class SnakeCaseUtil:
     """
 
     @classmethod
+    @lru_cache(maxsize=4096)
     def camel_to_snake(cls, camel_str: str) -> str:
         """
         小驼峰形式字符串(camelCase)转换为下划线形式字符串(snake_case)
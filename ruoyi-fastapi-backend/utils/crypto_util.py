@@ -5,6 +5,7 @@ from cryptography.fernet import Fernet
 
 from config.env import JwtConfig
 from exceptions.exception import ServiceException
+from utils.cache_util import LRUCache
 
 
 class CryptoUtil:
@@ -13,6 +14,8 @@ class CryptoUtil:
     """
 
     _cipher_suite = None
+    # 解密结果缓存，过期时间为5分钟
+    _decrypt_cache = LRUCache(maxsize=256, ttl=300)
 
     @classmethod
     def _get_cipher_suite(cls) -> Fernet:
@@ -56,3 +59,20 @@ class CryptoUtil:
             return decrypted_bytes.decode('utf-8')
         except Exception as e:
             raise ServiceException('解密失败') from e
+
+    @classmethod
+    def decrypt_with_cache(cls, token: str) -> str:
+        """
+        解密字符串，相同密文在缓存过期前直接返回缓存的明文
+
+        :param token: 密文
+        :return: 明文
+        """
+        if not token:
+            return token
+        data = cls._decrypt_cache.get(token)
+        if data is None:
+            data = cls.decrypt(token)
+            cls._decrypt_cache.set(token, data)
+
+        return data
@@ -1,4 +1,9 @@
+import asyncio
+import csv
 import io
+import tempfile
+from collections.abc import AsyncIterable, Generator
+from typing import IO, Any, Literal
 
 import pandas as pd
 from openpyxl import Workbook
@@ -6,12 +11,25 @@ from openpyxl.styles import Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
 
+ExportFormat = Literal['xlsx', 'csv']
+
 
 class ExcelUtil:
     """
     Excel操作类
     """
 
+    # 导出文件超过该大小（单位：字节）后写入磁盘临时文件
+    spool_max_size = 8 * 1024 * 1024
+    # 导出文件每次读取并返回的数据大小（单位：字节）
+    read_chunk_size = 64 * 1024
+    # csv格式每累计该条数的数据写入一次临时文件
+    csv_flush_rows = 1000
+    media_types: dict[str, str] = {
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'csv': 'text/csv; charset=utf-8',
+    }
+
     @classmethod
     def __mapping_list(cls, list_data: list, mapping_dict: dict) -> list[dict]:
         """
@@ -42,6 +60,73 @@ class ExcelUtil:
 
         return binary_data
 
+    @classmethod
+    async def export_stream2file(
+        cls, stream_data: AsyncIterable[dict[str, Any]], mapping_dict: dict, export_format: ExportFormat = 'xlsx'
+    ) -> IO[bytes]:
+        """
+        工具方法：将需要导出的异步数据流逐条写入临时文件，内存占用与数据总量无关
+
+        :param stream_data: 异步数据流
+        :param mapping_dict: 映射字典
+        :param export_format: 导出格式，可选的有'xlsx'及'csv'
+        :return: 已写入导出数据并定位到开头的临时文件
+        """
+        keys = list(mapping_dict.keys())
+        file = tempfile.SpooledTemporaryFile(max_size=cls.spool_max_size)  # noqa: SIM115
+        try:
+            if export_format == 'csv':
+                buffer = io.StringIO()
+                # 写入BOM以便Excel正确识别utf-8编码
+                buffer.write('\ufeff')
+                writer = csv.writer(buffer)
+                writer.writerow(mapping_dict.values())
+                row_count = 0
+                async for item in stream_data:
+                    writer.writerow(['' if item.get(key) is None else item.get(key) for key in keys])
+                    row_count += 1
+                    if row_count % cls.csv_flush_rows == 0:
+                        file.write(buffer.getvalue().encode('utf-8'))
+                        buffer.seek(0)
+                        buffer.truncate()
+                file.write(buffer.getvalue().encode('utf-8'))
+            else:
+                wb = Workbook(write_only=True)
+                ws = wb.create_sheet()
+                ws.append(list(mapping_dict.values()))
+                async for item in stream_data:
+                    ws.append([item.get(key) for key in keys])
+                await asyncio.to_thread(wb.save, file)
+            file.seek(0)
+        except BaseException:
+            file.close()
+            raise
+
+        return file
+
+    @classmethod
+    def iter_file(cls, file: IO[bytes]) -> Generator[bytes]:
+        """
+        工具方法：分块读取导出文件，读取完毕或客户端断开连接后关闭文件
+
+        :param file: 导出文件
+        :return: 导出文件的二进制数据块
+        """
+        with file:
+            while chunk := file.read(cls.read_chunk_size):
+                yield chunk
+
+    @classmethod
+    def get_export_headers(cls, file_name: str, export_format: ExportFormat = 'xlsx') -> dict[str, str]:
+        """
+        工具方法：获取导出文件对应的响应头
+
+        :param file_name: 导出文件名称（不含扩展名）
+        :param export_format: 导出格式
+        :return: 导出文件对应的响应头
+        """
+        return {'Content-Disposition': f'attachment; filename={file_name}.{export_format}'}
+
     @classmethod
     def get_excel_template(cls, header_list: list, selector_header_list: list, option_list: list[dict]) -> bytes:
         """
@@ -0,0 +1,343 @@
+import asyncio
+import bisect
+import csv
+import ipaddress
+import itertools
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Sequence
+
+import httpx
+from starlette.status import HTTP_200_OK
+
+from config.env import AppConfig
+from utils.cache_util import LRUCache
+from utils.log_util import logger
+
+INNER_IP_LOCATION = '内网IP'
+UNKNOWN_IP_LOCATION = '未知'
+
+
+class IpRangeDatabase:
+    """
+    基于内存映射文件的本地IP库，通过二分查找IP段获取归属区域
+
+    本地IP库文件格式（所有整数均为小端序uint32）::
+
+        +----------------+---------------------------------------------+
+        | 字段           | 说明                                        |
+        +================+=============================================+
+        | magic          | 4字节，固定为b'IPDB'                        |
+        | version        | 文件格式版本，当前为1                       |
+        | range_count    | IP段数量n                                   |
+        | location_count | 归属区域数量m                               |
+        | starts         | n个IP段起始地址，按升序排列                 |
+        | ends           | n个IP段结束地址（包含）                     |
+        | location_ids   | n个IP段对应的归属区域下标                   |
+        | offsets        | m + 1个归属区域在字符串区中的偏移量         |
+        | strings        | utf-8编码的归属区域字符串，按offsets顺序拼接 |
+        +----------------+---------------------------------------------+
+
+    IP段之间不能重叠，目前仅支持IPv4。可通过IpRangeDatabase.build_from_csv将
+    ``起始IP,结束IP,归属区域`` 格式的csv文件转换为上述格式。
+    """
+
+    MAGIC = b'IPDB'
+    VERSION = 1
+    HEADER = struct.Struct('<4sIII')
+
+    def __init__(self, path: str) -> None:
+        """
+        打开本地IP库文件
+
+        :param path: 本地IP库文件路径
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, range_count, location_count = self.HEADER.unpack_from(self._mm, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self._mm.close()
+            raise ValueError(f'不支持的IP库文件格式：{path}')
+        offset = self.HEADER.size
+        self._starts = self._uint32_view(offset, range_count)
+        offset += range_count * 4
+        self._ends = self._uint32_view(offset, range_count)
+        offset += range_count * 4
+        self._location_ids = self._uint32_view(offset, range_count)
+        offset += range_count * 4
+        self._offsets = self._uint32_view(offset, location_count + 1)
+        self._strings_offset = offset + (location_count + 1) * 4
+        self._locations: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _uint32_view(self, offset: int, count: int) -> Sequence[int]:
+        """
+        获取文件中指定位置的uint32数组，小端序主机上直接使用内存映射视图，无需拷贝
+
+        :param offset: 起始偏移量
+        :param count: 数组长度
+        :return: uint32数组
+        """
+        buffer = memoryview(self._mm)[offset : offset + count * 4]
+        if sys.byteorder == 'little':
+            return buffer.cast('I')
+        values = array('I', buffer)
+        values.byteswap()
+        return values
+
+    def lookup(self, ip: int) -> str | None:
+        """
+        查询整数形式IPv4地址的归属区域
+
+        :param ip: 整数形式的IPv4地址
+        :return: 归属区域，未命中时返回None
+        """
+        index = bisect.bisect_right(self._starts, ip) - 1
+        if index < 0 or ip > self._ends[index]:
+            return None
+        location_id = self._location_ids[index]
+        location = self._locations.get(location_id)
+        if location is None:
+            start = self._strings_offset + self._offsets[location_id]
+            end = self._strings_offset + self._offsets[location_id + 1]
+            location = self._mm[start:end].decode('utf-8')
+            self._locations[location_id] = location
+        return location
+
+    def close(self) -> None:
+        """
+        关闭内存映射文件
+
+        :return:
+        """
+        self._locations.clear()
+        for view in (self._starts, self._ends, self._location_ids, self._offsets):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mm.close()
+
+    @classmethod
+    def build_from_csv(cls, source: str, target: str) -> int:
+        """
+        将``起始IP,结束IP,归属区域``格式的csv文件转换为本地IP库文件
+
+        :param source: csv文件路径
+        :param target: 本地IP库文件路径
+        :return: IP段数量
+        """
+        ranges = []
+        location_ids: dict[str, int] = {}
+        with open(source, encoding='utf-8', newline='') as f:
+            for row in csv.reader(f):
+                if not row or row[0].startswith('#'):
+                    continue
+                start_ip, end_ip, location = (item.strip() for item in row[:3])
+                start = int(ipaddress.IPv4Address(start_ip))
+                end = int(ipaddress.IPv4Address(end_ip))
+                ranges.append((start, end, location_ids.setdefault(location, len(location_ids))))
+        ranges.sort()
+        for previous, current in itertools.pairwise(ranges):
+            if current[0] <= previous[1]:
+                raise ValueError(f'IP段存在重叠：{ipaddress.IPv4Address(current[0])}')
+        strings = [location.encode('utf-8') for location in location_ids]
+        offsets = [0]
+        for item in strings:
+            offsets.append(offsets[-1] + len(item))
+        with open(target, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(ranges), len(strings)))
+            for column in range(3):
+                f.write(struct.pack(f'<{len(ranges)}I', *(item[column] for item in ranges)))
+            f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+            f.write(b''.join(strings))
+
+        return len(ranges)
+
+
+class IpLocationResolver:
+    """
+    IP归属区域解析器基类
+    """
+
+    async def resolve(self, ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> str | None:
+        """
+        解析IP归属区域
+
+        :param ip: IP地址
+        :return: 归属区域，无法解析时返回None
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """
+        释放解析器占用的资源
+
+        :return:
+        """
+
+
+class LocalIpLocationResolver(IpLocationResolver):
+    """
+    基于本地IP库的IP归属区域解析器
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._database: IpRangeDatabase | None = None
+        self._loaded = False
+
+    def _get_database(self) -> IpRangeDatabase | None:
+        if not self._loaded:
+            self._loaded = True
+            if os.path.exists(self.path):
+                try:
+                    self._database = IpRangeDatabase(self.path)
+                    logger.info(f'✅️ 本地IP库加载成功，共{len(self._database)}个IP段')
+                except (OSError, ValueError) as e:
+                    logger.error(f'❌️ 本地IP库加载失败，详细错误信息：{e}')
+        return self._database
+
+    async def resolve(self, ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> str | None:
+        database = self._get_database()
+        if database is None or not isinstance(ip, ipaddress.IPv4Address):
+            return None
+        return database.lookup(int(ip))
+
+    async def close(self) -> None:
+        if self._database is not None:
+            self._database.close()
+        self._database = None
+        self._loaded = False
+
+
+class RemoteIpLocationResolver(IpLocationResolver):
+    """
+    基于远程接口的IP归属区域解析器，所有请求共用同一个连接池，请求失败后在冷却时间内不再请求
+    """
+
+    API_URL = 'https://qifu-api.baidubce.com/ip/geo/v1/district'
+
+    def __init__(self, timeout: float, cooldown: float = 60) -> None:
+        self.timeout = timeout
+        self.cooldown = cooldown
+        self._client: httpx.AsyncClient | None = None
+        self._disabled_until = 0.0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def resolve(self, ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> str | None:
+        if time.monotonic() < self._disabled_until:
+            return None
+        try:
+            ip_result = await self._get_client().get(self.API_URL, params={'ip': str(ip)})
+        except httpx.HTTPError as e:
+            self._disabled_until = time.monotonic() + self.cooldown
+            logger.warning(f'远程IP归属区域查询失败，{self.cooldown}秒内不再请求，详细错误信息：{e}')
+            return None
+        if ip_result.status_code != HTTP_200_OK:
+            return None
+        data = ip_result.json().get('data') or {}
+        prov = data.get('prov')
+        city = data.get('city')
+        if prov or city:
+            return f'{prov}-{city}'
+        return None
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+
+
+class IpLocationUtil:
+    """
+    IP归属区域查询工具类，依次使用本地IP库及远程接口（可选）解析，并对结果进行有界缓存
+    """
+
+    resolvers: list[IpLocationResolver] = [LocalIpLocationResolver(AppConfig.app_ip_location_db_path)]
+    if AppConfig.app_ip_location_remote_fallback:
+        resolvers.append(RemoteIpLocationResolver(AppConfig.app_ip_location_remote_timeout))
+    cache = LRUCache(maxsize=AppConfig.app_ip_location_cache_size, ttl=AppConfig.app_ip_location_cache_ttl)
+    _pending: dict[str, asyncio.Future] = {}
+
+    @classmethod
+    async def get_ip_location(cls, oper_ip: str | None) -> str:
+        """
+        查询ip归属区域
+
+        :param oper_ip: 需要查询的ip，为X-Forwarded-For格式时取第一个ip
+        :return: ip归属区域
+        """
+        if not oper_ip:
+            return UNKNOWN_IP_LOCATION
+        oper_ip = oper_ip.split(',')[0].strip()
+        if oper_ip == 'localhost':
+            return INNER_IP_LOCATION
+        try:
+            ip = ipaddress.ip_address(oper_ip)
+        except ValueError:
+            return UNKNOWN_IP_LOCATION
+        if ip.is_private or ip.is_loopback or ip.is_link_local:
+            return INNER_IP_LOCATION
+        location = cls.cache.get(oper_ip)
+        if location is not None:
+            return location
+        # 同一ip的并发查询只解析一次
+        pending = cls._pending.get(oper_ip)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        cls._pending[oper_ip] = future
+        location = UNKNOWN_IP_LOCATION
+        try:
+            location = await cls._resolve(ip)
+            # 无法解析时可能是远程接口暂时不可用，仅短时间缓存，过期后重新查询
+            cls.cache.set(
+                oper_ip,
+                location,
+                ttl=AppConfig.app_ip_location_unknown_cache_ttl if location == UNKNOWN_IP_LOCATION else None,
+            )
+        except Exception as e:
+            logger.exception(e)
+        finally:
+            cls._pending.pop(oper_ip, None)
+            future.set_result(location)
+
+        return location
+
+    @classmethod
+    async def _resolve(cls, ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> str:
+        """
+        依次使用各个解析器解析ip归属区域
+
+        :param ip: IP地址
+        :return: ip归属区域
+        """
+        for resolver in cls.resolvers:
+            location = await resolver.resolve(ip)
+            if location:
+                return location
+        return UNKNOWN_IP_LOCATION
+
+    @classmethod
+    async def close(cls) -> None:
+        """
+        应用关闭时释放各个解析器占用的资源
+
+        :return:
+        """
+        for resolver in cls.resolvers:
+            await resolver.close()
+        cls.cache.clear()
@@ -1,11 +1,22 @@
+import base64
+import binascii
+import json
 import math
-from typing import Any
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any, Literal
 
-from sqlalchemy import Row, Select, func, select
+from sqlalchemy import ColumnElement, Row, Select, and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
 from common.vo import PageModel
-from utils.common_util import CamelCaseUtil
+from exceptions.exception import ServiceException
+from utils.cache_util import LRUCache
+from utils.common_util import CamelCaseUtil, SqlalchemyUtil
+from utils.log_util import logger
+
+CountMode = Literal['exact', 'approximate', 'cached']
 
 
 class PageUtil:
@@ -13,6 +24,11 @@ class PageUtil:
     分页工具类
     """
 
+    # 缓存总数的有效期较短，仅用于避免游标分页翻页时重复统计
+    count_cache = LRUCache(maxsize=256, ttl=60)
+    # 估算总数低于该值时改为精确统计
+    approximate_count_threshold = 10000
+
     @classmethod
     def get_page_obj(cls, data_list: list, page_num: int, page_size: int) -> PageModel:
         """
@@ -39,7 +55,16 @@ class PageUtil:
 
     @classmethod
     async def paginate(
-        cls, db: AsyncSession, query: Select, page_num: int, page_size: int, is_page: bool = False
+        cls,
+        db: AsyncSession,
+        query: Select,
+        page_num: int,
+        page_size: int,
+        is_page: bool = False,
+        cursor: str | None = None,
+        cursor_columns: Sequence[InstrumentedAttribute] | None = None,
+        cursor_desc: bool = False,
+        count_mode: CountMode = 'exact',
     ) -> PageModel | list[dict[str, Any] | list[dict[Any, Any]]]:
         """
         输入查询语句和分页信息，返回分页数据列表结果
@@ -49,37 +74,271 @@ class PageUtil:
         :param page_num: 当前页码
         :param page_size: 当前页面数据量
         :param is_page: 是否开启分页
+        :param cursor: 分页游标，不为None且传入cursor_columns时使用游标分页，首页传入空字符串
+        :param cursor_columns: 游标分页的排序列，最后一列需唯一（一般为主键），其余列可为NULL
+        :param cursor_desc: 游标分页是否按降序排列
+        :param count_mode: 游标分页时总数的统计方式，可选的有'exact'(精确统计)、'approximate'(根据执行计划估算)、'cached'(精确统计并短暂缓存)
         :return: 分页数据对象
         """
+        if is_page and cursor is not None and cursor_columns:
+            return await cls._cursor_paginate(
+                db, query, page_num, page_size, cursor, cursor_columns, cursor_desc, count_mode
+            )
         if is_page:
             total = (await db.execute(select(func.count('*')).select_from(query.subquery()))).scalar()
-            query_result = await db.execute(query.offset((page_num - 1) * page_size).limit(page_size))
-            paginated_data: list[Row] = []
-            for row in query_result:
-                if row and len(row) == 1:
-                    paginated_data.append(row[0])
-                else:
-                    paginated_data.append(row)
+            query_result = (await db.execute(query.offset((page_num - 1) * page_size).limit(page_size))).all()
             has_next = math.ceil(total / page_size) > page_num
             result = PageModel[Any](
-                rows=CamelCaseUtil.transform_result(paginated_data),
+                rows=cls.transform_rows(query, query_result),
                 pageNum=page_num,
                 pageSize=page_size,
                 total=total,
                 hasNext=has_next,
             )
         else:
-            query_result = await db.execute(query)
-            no_paginated_data: list[Row] = []
-            for row in query_result:
-                if row and len(row) == 1:
-                    no_paginated_data.append(row[0])
-                else:
-                    no_paginated_data.append(row)
-            result = CamelCaseUtil.transform_result(no_paginated_data)
+            query_result = (await db.execute(query)).all()
+            result = cls.transform_rows(query, query_result)
 
         return result
 
+    @classmethod
+    async def stream(
+        cls, db: AsyncSession, query: Select, chunk_size: int = 1000
+    ) -> AsyncIterator[dict[str, Any] | list[dict[Any, Any]]]:
+        """
+        输入查询语句，使用服务端游标分批读取并逐条返回结果，适用于导出等需要遍历全部数据的场景
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句
+        :param chunk_size: 每批从数据库读取的数据量
+        :return: 逐条返回的数据，格式与不分页时paginate返回的列表元素一致
+        """
+        query_result = await db.stream(query.execution_options(yield_per=chunk_size))
+        async for partition in query_result.partitions():
+            for item in cls.transform_rows(query, partition):
+                yield item
+
+    @classmethod
+    async def _cursor_paginate(
+        cls,
+        db: AsyncSession,
+        query: Select,
+        page_num: int,
+        page_size: int,
+        cursor: str,
+        cursor_columns: Sequence[InstrumentedAttribute],
+        cursor_desc: bool,
+        count_mode: CountMode,
+    ) -> PageModel:
+        """
+        游标分页，按排序列的值定位下一页，避免深分页时的OFFSET扫描
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句
+        :param page_num: 当前页码
+        :param page_size: 当前页面数据量
+        :param cursor: 分页游标，首页为空字符串
+        :param cursor_columns: 游标分页的排序列
+        :param cursor_desc: 是否按降序排列
+        :param count_mode: 总数的统计方式
+        :return: 分页数据对象
+        """
+        total = await cls.get_total(db, query, count_mode)
+        keyset_query = query.order_by(None).order_by(
+            *[column.desc() if cursor_desc else column.asc() for column in cursor_columns]
+        )
+        if cursor:
+            keyset_query = keyset_query.where(
+                cls._get_keyset_condition(
+                    cursor_columns,
+                    cls.decode_cursor(cursor, len(cursor_columns)),
+                    cursor_desc,
+                    cls._is_null_smallest(db),
+                )
+            )
+        query_result = (await db.execute(keyset_query.limit(page_size + 1))).all()
+        has_next = len(query_result) > page_size
+        query_result = query_result[:page_size]
+        next_cursor = None
+        if has_next:
+            next_cursor = cls.encode_cursor(cls._get_cursor_values(query_result[-1], cursor_columns))
+
+        return PageModel[Any](
+            rows=cls.transform_rows(query, query_result),
+            pageNum=page_num,
+            pageSize=page_size,
+            total=total,
+            hasNext=has_next,
+            nextCursor=next_cursor,
+        )
+
+    @classmethod
+    def transform_rows(cls, query: Select, rows: Sequence[Row]) -> list[Any]:
+        """
+        将查询结果行转换为小驼峰形式的数据列表，仅查询多个列时按字段名批量转换，否则单列或单实体的结果行取其唯一元素后逐条转换
+
+        :param query: sqlalchemy查询语句
+        :param rows: 查询结果行
+        :return: 小驼峰形式的数据列表
+        """
+        if SqlalchemyUtil.is_column_query(query):
+            return SqlalchemyUtil.serialize_rows(rows, 'snake_to_camel')
+
+        return CamelCaseUtil.transform_result([row[0] if row and len(row) == 1 else row for row in rows])
+
+    @classmethod
+    async def get_total(cls, db: AsyncSession, query: Select, count_mode: CountMode = 'exact') -> int:
+        """
+        根据统计方式获取查询语句的总数
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句
+        :param count_mode: 统计方式
+        :return: 总数
+        """
+        count_query = select(func.count('*')).select_from(query.order_by(None).subquery())
+        if count_mode == 'approximate':
+            total = await cls._get_approximate_total(db, query)
+            if total is not None and total >= cls.approximate_count_threshold:
+                return total
+        if count_mode == 'cached':
+            compiled = count_query.compile(dialect=db.bind.dialect)
+            cache_key = (str(compiled), tuple(sorted((k, str(v)) for k, v in compiled.params.items())))
+            total = cls.count_cache.get(cache_key)
+            if total is None:
+                total = (await db.execute(count_query)).scalar()
+                cls.count_cache.set(cache_key, total)
+            return total
+
+        return (await db.execute(count_query)).scalar()
+
+    @classmethod
+    async def _get_approximate_total(cls, db: AsyncSession, query: Select) -> int | None:
+        """
+        根据数据库执行计划估算查询语句的总数
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句
+        :return: 估算总数，无法估算时返回None
+        """
+        dialect = db.bind.dialect
+        try:
+            # 查询条件以绑定参数的形式传给数据库驱动，避免用户输入中的特殊字符被解析为SQL或绑定参数
+            compiled = query.order_by(None).compile(dialect=dialect, compile_kwargs={'render_postcompile': True})
+            params = compiled.params
+            parameters = tuple(params[name] for name in compiled.positiontup) if compiled.positional else params
+            explain_prefix = 'EXPLAIN (FORMAT JSON)' if dialect.name == 'postgresql' else 'EXPLAIN'
+            # 在保存点中执行，执行失败时仅回滚保存点，PostgreSQL中的事务不会因此中止
+            async with db.begin_nested():
+                connection = await db.connection()
+                explain_result = await connection.exec_driver_sql(f'{explain_prefix} {compiled}', parameters)
+                if dialect.name == 'postgresql':
+                    plan = explain_result.scalar()
+                else:
+                    explain_row = explain_result.mappings().first()
+            if dialect.name == 'postgresql':
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return int(plan[0]['Plan']['Plan Rows'])
+            return int(explain_row['rows'] * (explain_row.get('filtered') or 100) / 100)
+        except Exception as e:
+            logger.warning(f'估算查询总数失败，将使用精确统计，详细错误信息：{e}')
+            return None
+
+    @classmethod
+    def _is_null_smallest(cls, db: AsyncSession) -> bool:
+        """
+        判断数据库排序时是否将NULL视为最小值，MySQL及SQLite视为最小值，PostgreSQL视为最大值
+
+        :param db: orm对象
+        :return: 是否将NULL视为最小值
+        """
+        return db.bind.dialect.name != 'postgresql'
+
+    @classmethod
+    def _get_keyset_condition(
+        cls,
+        cursor_columns: Sequence[InstrumentedAttribute],
+        values: list[Any],
+        cursor_desc: bool,
+        null_smallest: bool = True,
+    ) -> ColumnElement[bool]:
+        """
+        生成游标分页的定位条件，展开为(k1 > v1) OR (k1 = v1 AND k2 > v2) ...以便使用索引，
+        排序列为NULL时按数据库默认的NULL排序位置生成IS NULL/IS NOT NULL条件，排序语句无需额外处理NULL
+
+        :param cursor_columns: 游标分页的排序列
+        :param values: 上一页最后一条数据的排序列值
+        :param cursor_desc: 是否按降序排列
+        :param null_smallest: 数据库排序时是否将NULL视为最小值
+        :return: 定位条件
+        """
+        # 升序时NULL视为最小值，或降序时NULL视为最大值，NULL排在最前面
+        nulls_first = null_smallest != cursor_desc
+        conditions = []
+        equals = []
+        for column, value in zip(cursor_columns, values, strict=True):
+            if value is None:
+                # NULL排在最前面时，非NULL的数据均在其后；NULL排在最后面时，其后没有该列更大的数据
+                if nulls_first:
+                    conditions.append(and_(*equals, column.is_not(None)))
+                equals.append(column.is_(None))
+                continue
+            compare = column < value if cursor_desc else column > value
+            if not nulls_first and getattr(column.expression, 'nullable', True):
+                compare = or_(compare, column.is_(None))
+            conditions.append(and_(*equals, compare))
+            equals.append(column == value)
+        return or_(*conditions)
+
+    @classmethod
+    def _get_cursor_values(cls, row: Row, cursor_columns: Sequence[InstrumentedAttribute]) -> list[Any]:
+        """
+        获取查询结果中排序列的值
+
+        :param row: 查询结果
+        :param cursor_columns: 游标分页的排序列
+        :return: 排序列的值
+        """
+        values = []
+        for column in cursor_columns:
+            entity = next((item for item in row if isinstance(item, column.class_)), None)
+            if entity is None:
+                entity = row if column.key in row._fields else row[0]
+            values.append(getattr(entity, column.key))
+        return values
+
+    @classmethod
+    def encode_cursor(cls, values: list[Any]) -> str:
+        """
+        将排序列的值编码为不透明的分页游标
+
+        :param values: 排序列的值
+        :return: 分页游标
+        """
+        payload = [{'d': value.isoformat()} if isinstance(value, datetime) else value for value in values]
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode_cursor(cls, cursor: str, column_count: int) -> list[Any]:
+        """
+        解析分页游标得到排序列的值
+
+        :param cursor: 分页游标
+        :param column_count: 排序列数量
+        :return: 排序列的值
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            if not isinstance(payload, list) or len(payload) != column_count:
+                raise ValueError(cursor)
+            return [
+                datetime.fromisoformat(value['d']) if isinstance(value, dict) and 'd' in value else value
+                for value in payload
+            ]
+        except (binascii.Error, TypeError, ValueError) as e:
+            raise ServiceException(message='分页游标无效') from e
+
 
 def get_page_obj(data_list: list, page_num: int, page_size: int) -> PageModel:
     """
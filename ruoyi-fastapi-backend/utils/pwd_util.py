@@ -1,11 +1,22 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
 import bcrypt
 
+from config.env import AppConfig
+
+T = TypeVar('T')
+
 
 class PwdUtil:
     """
     密码工具类
     """
 
+    _executor: ThreadPoolExecutor | None = None
+
     @classmethod
     def verify_password(cls, plain_password: str, hashed_password: str) -> bool:
         """
@@ -27,4 +38,82 @@ class PwdUtil:
         :param input_password: 输入的密码
         :return: 加密成功的密码
         """
-        return bcrypt.hashpw(input_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        return bcrypt.hashpw(
+            input_password.encode('utf-8'), bcrypt.gensalt(rounds=AppConfig.app_password_hash_rounds)
+        ).decode('utf-8')
+
+    @classmethod
+    def needs_rehash(cls, hashed_password: str) -> bool:
+        """
+        工具方法：判断数据库存储的密码的计算成本是否与当前配置不一致，需要重新加密
+
+        :param hashed_password: 数据库存储的密码
+        :return: 是否需要重新加密
+        """
+        try:
+            rounds = int(hashed_password.split('$')[2])
+        except (AttributeError, IndexError, ValueError):
+            return False
+        return rounds != AppConfig.app_password_hash_rounds
+
+    @classmethod
+    async def verify_password_async(cls, plain_password: str, hashed_password: str) -> bool:
+        """
+        工具方法：在密码计算线程池中校验当前输入的密码与数据库存储的密码是否一致，避免阻塞事件循环
+
+        :param plain_password: 当前输入的密码
+        :param hashed_password: 数据库存储的密码
+        :return: 校验结果
+        """
+        return await cls._run_in_executor(cls.verify_password, plain_password, hashed_password)
+
+    @classmethod
+    async def get_password_hash_async(cls, input_password: str) -> str:
+        """
+        工具方法：在密码计算线程池中对当前输入的密码进行加密，避免阻塞事件循环
+
+        :param input_password: 输入的密码
+        :return: 加密成功的密码
+        """
+        return await cls._run_in_executor(cls.get_password_hash, input_password)
+
+    @classmethod
+    async def verify_and_update_password(cls, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """
+        工具方法：校验密码，校验通过且计算成本与当前配置不一致时使用当前配置重新加密
+
+        :param plain_password: 当前输入的密码
+        :param hashed_password: 数据库存储的密码
+        :return: 校验结果及重新加密后的密码，无需重新加密时为None
+        """
+        if not await cls.verify_password_async(plain_password, hashed_password):
+            return False, None
+        if cls.needs_rehash(hashed_password):
+            return True, await cls.get_password_hash_async(plain_password)
+        return True, None
+
+    @classmethod
+    def close(cls) -> None:
+        """
+        应用关闭时关闭密码计算线程池
+
+        :return:
+        """
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+        cls._executor = None
+
+    @classmethod
+    async def _run_in_executor(cls, func: Callable[..., T], *args: str) -> T:
+        """
+        在密码计算线程池中执行函数，线程池的最大线程数即为密码计算的最大并发数
+
+        :param func: 需要执行的函数
+        :param args: 函数参数
+        :return: 函数执行结果
+        """
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=AppConfig.app_password_hash_workers, thread_name_prefix='pwd-util'
+            )
+        return await asyncio.get_running_loop().run_in_executor(cls._executor, func, *args)
@@ -0,0 +1,161 @@
+import time
+from collections.abc import AsyncIterator, Sequence
+from datetime import timedelta
+
+from redis import asyncio as aioredis
+from redis.asyncio.client import Pipeline
+
+
+class RedisKeyUtil:
+    """
+    Redis键空间工具类
+
+    使用SCAN代替KEYS分批遍历键，删除时使用UNLINK并通过pipeline批量发送，避免长时间阻塞Redis；
+    对于需要频繁列出全部键的命名空间（如在线用户会话），通过有序集合维护键索引，列出时无需遍历整个键空间。
+    """
+
+    # 每次SCAN返回的键数量提示
+    scan_count = 1000
+    # 每条UNLINK命令删除的键数量
+    unlink_batch_size = 500
+    # 每次MGET获取的键数量
+    mget_batch_size = 500
+
+    @classmethod
+    async def scan_keys(cls, redis: aioredis.Redis, match: str = '*') -> AsyncIterator[str]:
+        """
+        使用SCAN遍历匹配的键，遍历期间可能返回重复的键
+
+        :param redis: redis对象
+        :param match: 键匹配模式
+        :return: 匹配的键
+        """
+        async for key in redis.scan_iter(match=match, count=cls.scan_count):
+            yield key
+
+    @classmethod
+    async def get_keys(cls, redis: aioredis.Redis, match: str = '*') -> list[str]:
+        """
+        使用SCAN获取全部匹配的键
+
+        :param redis: redis对象
+        :param match: 键匹配模式
+        :return: 去重后的键列表
+        """
+        return list(dict.fromkeys([key async for key in cls.scan_keys(redis, match)]))
+
+    @classmethod
+    async def unlink_keys(cls, redis: aioredis.Redis, keys: Sequence[str]) -> int:
+        """
+        按批次使用UNLINK删除键，所有批次通过同一个pipeline发送
+
+        :param redis: redis对象
+        :param keys: 需要删除的键
+        :return: 删除的键数量
+        """
+        if not keys:
+            return 0
+        async with redis.pipeline(transaction=False) as pipe:
+            for index in range(0, len(keys), cls.unlink_batch_size):
+                pipe.unlink(*keys[index : index + cls.unlink_batch_size])
+            result = await pipe.execute()
+
+        return sum(result)
+
+    @classmethod
+    async def unlink_by_pattern(cls, redis: aioredis.Redis, match: str) -> int:
+        """
+        使用SCAN遍历匹配的键并分批删除
+
+        :param redis: redis对象
+        :param match: 键匹配模式
+        :return: 删除的键数量
+        """
+        count = 0
+        keys = []
+        async for key in cls.scan_keys(redis, match):
+            keys.append(key)
+            if len(keys) >= cls.scan_count:
+                count += await cls.unlink_keys(redis, keys)
+                keys = []
+        count += await cls.unlink_keys(redis, keys)
+
+        return count
+
+    @classmethod
+    async def mget(cls, redis: aioredis.Redis, keys: Sequence[str]) -> list[str | None]:
+        """
+        按批次使用MGET获取键值，所有批次通过同一个pipeline发送
+
+        :param redis: redis对象
+        :param keys: 需要获取的键
+        :return: 与keys一一对应的键值，键不存在时为None
+        """
+        if not keys:
+            return []
+        async with redis.pipeline(transaction=False) as pipe:
+            for index in range(0, len(keys), cls.mget_batch_size):
+                pipe.mget(keys[index : index + cls.mget_batch_size])
+            result = await pipe.execute()
+
+        return [value for values in result for value in values]
+
+    @classmethod
+    def get_index_key(cls, namespace: str) -> str:
+        """
+        获取命名空间对应的键索引名称
+
+        :param namespace: 命名空间，即键名中冒号前的部分
+        :return: 键索引名称
+        """
+        return f'{namespace}_index'
+
+    @classmethod
+    def add_to_index(cls, pipe: Pipeline, namespace: str, member: str, ex: int | timedelta | None = None) -> None:
+        """
+        将命名空间下的键加入键索引，键索引为以过期时间戳为分数的有序集合
+
+        :param pipe: redis pipeline对象
+        :param namespace: 命名空间
+        :param member: 键名中冒号后的部分
+        :param ex: 键的过期时间，为None时永不过期
+        :return:
+        """
+        if isinstance(ex, timedelta):
+            ex = ex.total_seconds()
+        pipe.zadd(cls.get_index_key(namespace), {member: time.time() + ex if ex is not None else float('inf')})
+
+    @classmethod
+    def remove_from_index(cls, pipe: Pipeline, namespace: str, members: Sequence[str]) -> None:
+        """
+        将命名空间下的键移出键索引
+
+        :param pipe: redis pipeline对象
+        :param namespace: 命名空间
+        :param members: 键名中冒号后的部分
+        :return:
+        """
+        if members:
+            pipe.zrem(cls.get_index_key(namespace), *members)
+
+    @classmethod
+    async def get_index_page(
+        cls, redis: aioredis.Redis, namespace: str, offset: int = 0, limit: int | None = None
+    ) -> tuple[int, list[str]]:
+        """
+        按过期时间倒序分页获取键索引中的键，获取前先移除已过期的键
+
+        :param redis: redis对象
+        :param namespace: 命名空间
+        :param offset: 起始位置
+        :param limit: 获取数量，为None时获取全部
+        :return: 键索引中的键总数及当前页的键名中冒号后的部分
+        """
+        index_key = cls.get_index_key(namespace)
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(index_key, '-inf', time.time())
+            pipe.zcard(index_key)
+            pipe.zrevrange(index_key, offset, offset + limit - 1 if limit is not None else -1)
+            _, total, members = await pipe.execute()
+
+        return total, members
@@ -1,21 +1,65 @@
+import hashlib
+import json
+import os
 from collections.abc import Mapping
-from datetime import datetime
+from datetime import datetime, timedelta
+from decimal import Decimal
+from email.utils import parsedate_to_datetime
 from typing import Any
 
-from fastapi import status
+import orjson
+from fastapi import Request, status
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from starlette.background import BackgroundTask
+from starlette.background import BackgroundTask, BackgroundTasks
 
 from common.constant import HttpStatusConstant
 
 
+def orjson_default(obj: Any) -> Any:
+    """
+    orjson无法直接序列化的对象的转换函数，转换结果与jsonable_encoder保持一致
+
+    :param obj: 无法直接序列化的对象
+    :return: 可序列化的对象
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(by_alias=True)
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    return jsonable_encoder(obj)
+
+
+class OrjsonEnvelopeResponse(JSONResponse):
+    """
+    使用orjson直接序列化响应内容的JSON响应类
+
+    datetime、date、UUID、枚举、dataclass等类型由orjson原生序列化，pydantic模型、Decimal等类型通过orjson_default转换，
+    无需先经过jsonable_encoder递归转换整个响应内容；orjson无法序列化时（如超出64位的整数）回退为jsonable_encoder
+    """
+
+    def render(self, content: Any) -> bytes:
+        try:
+            return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return super().render(jsonable_encoder(content))
+
+
 class ResponseUtil:
     """
     响应工具类
     """
 
+    # 文件响应无法零拷贝发送时每次读取的字节数
+    file_chunk_size = 1024 * 1024
+
     @classmethod
     def success(
         cls,
@@ -54,9 +98,9 @@ class ResponseUtil:
 
         result.update({'success': True, 'time': datetime.now()})
 
-        return JSONResponse(
+        return OrjsonEnvelopeResponse(
             status_code=status.HTTP_200_OK,
-            content=jsonable_encoder(result),
+            content=result,
             headers=headers,
             media_type=media_type,
             background=background,
@@ -100,9 +144,9 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(
+        return OrjsonEnvelopeResponse(
             status_code=status.HTTP_200_OK,
-            content=jsonable_encoder(result),
+            content=result,
             headers=headers,
             media_type=media_type,
             background=background,
@@ -146,9 +190,9 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(
+        return OrjsonEnvelopeResponse(
             status_code=status.HTTP_200_OK,
-            content=jsonable_encoder(result),
+            content=result,
             headers=headers,
             media_type=media_type,
             background=background,
@@ -192,9 +236,9 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(
+        return OrjsonEnvelopeResponse(
             status_code=status.HTTP_200_OK,
-            content=jsonable_encoder(result),
+            content=result,
             headers=headers,
             media_type=media_type,
             background=background,
@@ -238,9 +282,9 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(
+        return OrjsonEnvelopeResponse(
             status_code=status.HTTP_200_OK,
-            content=jsonable_encoder(result),
+            content=result,
             headers=headers,
             media_type=media_type,
             background=background,
@@ -267,3 +311,105 @@ class ResponseUtil:
         return StreamingResponse(
             status_code=status.HTTP_200_OK, content=data, headers=headers, media_type=media_type, background=background
         )
+
+    @classmethod
+    def file(
+        cls,
+        *,
+        request: Request,
+        path: str,
+        filename: str | None = None,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = 'application/octet-stream',
+        background: BackgroundTask | None = None,
+        delete_after_send: bool = False,
+    ) -> Response:
+        """
+        文件响应方法，支持Range及If-Range断点续传，并根据ETag及Last-Modified处理条件请求；
+        服务器支持http.response.pathsend扩展时由服务器零拷贝发送文件，uvicorn不支持该扩展，此时按固定大小分块读取
+
+        :param request: Request对象
+        :param path: 文件路径
+        :param filename: 可选，下载时的文件名称
+        :param headers: 可选，响应头信息
+        :param media_type: 可选，响应结果媒体类型
+        :param background: 可选，响应返回后执行的后台任务
+        :param delete_after_send: 可选，是否在完整发送文件后删除文件，Range请求的响应及条件请求命中时不删除，以便客户端继续断点续传
+        :return: 文件响应结果
+        """
+        if delete_after_send and 'range' not in request.headers:
+            background_tasks = BackgroundTasks([background] if background else None)
+            background_tasks.add_task(os.remove, path)
+            background = background_tasks
+        response = FileResponse(
+            path,
+            headers=headers,
+            media_type=media_type,
+            background=background,
+            filename=filename,
+            stat_result=os.stat(path),
+        )
+        response.chunk_size = cls.file_chunk_size
+        if cls.is_not_modified(request.headers, response.headers):
+            return cls.not_modified(
+                {key: response.headers[key] for key in ('etag', 'last-modified') if key in response.headers}
+            )
+
+        return response
+
+    @classmethod
+    def is_not_modified(cls, request_headers: Mapping[str, str], response_headers: Mapping[str, str]) -> bool:
+        """
+        判断条件请求是否命中，请求头If-None-Match存在时忽略If-Modified-Since
+
+        :param request_headers: 请求头信息
+        :param response_headers: 响应头信息
+        :return: 是否命中
+        """
+        if_none_match = request_headers.get('if-none-match')
+        if if_none_match:
+            return cls.is_etag_match(if_none_match, response_headers.get('etag', ''))
+        if_modified_since = request_headers.get('if-modified-since')
+        last_modified = response_headers.get('last-modified')
+        if not if_modified_since or not last_modified:
+            return False
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+    @classmethod
+    def not_modified(cls, headers: Mapping[str, str] | None = None) -> Response:
+        """
+        未修改响应方法，用于条件请求命中时返回304
+
+        :param headers: 可选，响应头信息，通常包含ETag
+        :return: 未修改响应结果
+        """
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    @classmethod
+    def get_etag(cls, content: Any) -> str:
+        """
+        根据响应内容生成强校验ETag
+
+        :param content: 响应内容
+        :return: 带双引号的ETag
+        """
+        payload = json.dumps(jsonable_encoder(content), ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return f'"{hashlib.sha1(payload.encode("utf-8")).hexdigest()}"'
+
+    @classmethod
+    def is_etag_match(cls, if_none_match: str | None, etag: str) -> bool:
+        """
+        判断请求头If-None-Match是否与ETag匹配，忽略弱校验前缀W/
+
+        :param if_none_match: 请求头If-None-Match的值
+        :param etag: 当前响应内容的ETag
+        :return: 是否匹配
+        """
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        return etag.removeprefix('W/') in {item.strip().removeprefix('W/') for item in if_none_match.split(',')}
@@ -0,0 +1,100 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    定长时间序列环形缓冲工具类
+
+    时间戳、展示时间及各指标值分别保存在预先分配的numpy数组中，写满后覆盖最早的数据，内存占用固定；
+    时间戳应取自单调时钟（如time.monotonic()），用于排序及按时间范围截取，系统时间跳变不会打乱数据顺序，展示时间仅用于展示；
+    查询时按时间范围截取数据，并按桶取平均值降采样到指定点数
+    """
+
+    def __init__(self, capacity: int, columns: Sequence[str]) -> None:
+        """
+        初始化环形缓冲
+
+        :param capacity: 最多保存的数据条数
+        :param columns: 指标名称列表
+        """
+        self.capacity = max(capacity, 1)
+        self.columns = tuple(columns)
+        self._timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self._wall_times = np.zeros(self.capacity, dtype=np.float64)
+        self._values = np.zeros((self.capacity, len(self.columns)), dtype=np.float64)
+        self._index = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, values: Sequence[float], wall_time: float | None = None) -> None:
+        """
+        追加一条数据，缓冲已满时覆盖最早的数据
+
+        :param timestamp: 单调时钟时间戳（单位：秒）
+        :param values: 与指标名称列表顺序一致的指标值
+        :param wall_time: 用于展示的系统时间戳（单位：秒），为None时与timestamp相同
+        :return:
+        """
+        self._timestamps[self._index] = timestamp
+        self._wall_times[self._index] = timestamp if wall_time is None else wall_time
+        self._values[self._index] = values
+        self._index = (self._index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def latest(self) -> dict[str, float] | None:
+        """
+        获取最近一条数据
+
+        :return: 指标名称与指标值的映射，缓冲为空时返回None
+        """
+        if not self._size:
+            return None
+        return dict(zip(self.columns, self._values[self._index - 1].tolist(), strict=True))
+
+    def get_range(self, since: float | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        按时间先后顺序获取指定时间之后的数据
+
+        :param since: 起始的单调时钟时间戳（单位：秒），为None时获取全部数据
+        :return: 时间戳数组、展示时间数组及对应的指标值二维数组
+        """
+        if self._size < self.capacity:
+            timestamps = self._timestamps[: self._size]
+            wall_times = self._wall_times[: self._size]
+            values = self._values[: self._size]
+        else:
+            timestamps = np.concatenate((self._timestamps[self._index :], self._timestamps[: self._index]))
+            wall_times = np.concatenate((self._wall_times[self._index :], self._wall_times[: self._index]))
+            values = np.concatenate((self._values[self._index :], self._values[: self._index]))
+        if since is not None:
+            start = int(np.searchsorted(timestamps, since, side='left'))
+            timestamps = timestamps[start:]
+            wall_times = wall_times[start:]
+            values = values[start:]
+        return timestamps, wall_times, values
+
+    def downsample(
+        self, since: float | None = None, max_points: int = 120
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        获取指定时间之后的数据，数据条数超过max_points时将相邻数据均分为max_points个桶并取平均值
+
+        :param since: 起始的单调时钟时间戳（单位：秒），为None时获取全部数据
+        :param max_points: 最多返回的数据条数
+        :return: 时间戳数组、展示时间数组及对应的指标值二维数组
+        """
+        timestamps, wall_times, values = self.get_range(since)
+        size = len(timestamps)
+        if max_points <= 0 or size <= max_points:
+            return timestamps, wall_times, values
+        bounds = np.linspace(0, size, max_points + 1).astype(np.int64)[:-1]
+        counts = np.diff(np.append(bounds, size))
+        return (
+            np.add.reduceat(timestamps, bounds) / counts,
+            np.add.reduceat(wall_times, bounds) / counts,
+            np.add.reduceat(values, bounds, axis=0) / counts[:, None],
+        )
@@ -0,0 +1,99 @@
+import json
+import time
+from typing import Any
+
+
+class StreamFrameBuffer:
+    """
+    流式响应帧缓冲工具类
+
+    将同一类型的连续文本片段合并为一帧输出，距上次输出超过时间窗口或缓冲内容超过大小上限时输出，
+    类型变化或输出非文本帧前先输出已缓冲的内容，保证帧的先后顺序不变；同时统计首字时间、片段速率及输出字节数。
+    """
+
+    def __init__(self, flush_interval: float = 0.05, flush_size: int = 1024) -> None:
+        """
+        初始化流式响应帧缓冲
+
+        :param flush_interval: 合并时间窗口（单位：秒）
+        :param flush_size: 单帧缓冲的最大字符数
+        """
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._frame_type: str | None = None
+        self._parts: list[str] = []
+        self._size = 0
+        self._start_time = time.monotonic()
+        self._last_flush_time = self._start_time
+        self._first_token_time: float | None = None
+        self.token_count = 0
+        self.frame_count = 0
+        self.bytes_sent = 0
+
+    def append(self, frame_type: str, content: str) -> list[str]:
+        """
+        追加文本片段
+
+        :param frame_type: 帧类型
+        :param content: 文本片段
+        :return: 需要立即输出的帧列表
+        """
+        now = time.monotonic()
+        if self._first_token_time is None:
+            self._first_token_time = now
+        self.token_count += 1
+        frames = self.flush() if self._frame_type != frame_type else []
+        self._frame_type = frame_type
+        self._parts.append(content)
+        self._size += len(content)
+        if self._size >= self.flush_size or now - self._last_flush_time >= self.flush_interval:
+            frames.extend(self.flush())
+
+        return frames
+
+    def flush(self) -> list[str]:
+        """
+        输出已缓冲的文本片段
+
+        :return: 需要立即输出的帧列表
+        """
+        if not self._parts:
+            return []
+        frame = self.frame({'content': ''.join(self._parts), 'type': self._frame_type})
+        self._parts = []
+        self._size = 0
+        self._last_flush_time = time.monotonic()
+
+        return [frame]
+
+    def frame(self, data: dict[str, Any]) -> str:
+        """
+        将数据序列化为一帧并计入统计
+
+        :param data: 帧数据
+        :return: 帧内容
+        """
+        frame = json.dumps(data) + '\n'
+        self.frame_count += 1
+        self.bytes_sent += len(frame.encode('utf-8'))
+
+        return frame
+
+    def get_metrics(self) -> dict[str, Any]:
+        """
+        获取流式响应统计信息
+
+        :return: 首字时间（毫秒）、片段数、片段速率（个/秒）、帧数及输出字节数
+        """
+        now = time.monotonic()
+        generate_time = now - self._first_token_time if self._first_token_time is not None else 0
+
+        return {
+            'timeToFirstToken': round((self._first_token_time - self._start_time) * 1000, 2)
+            if self._first_token_time is not None
+            else None,
+            'tokenCount': self.token_count,
+            'tokensPerSecond': round(self.token_count / generate_time, 2) if generate_time > 0 else None,
+            'frameCount': self.frame_count,
+            'bytesSent': self.bytes_sent,
+        }
@@ -0,0 +1,54 @@
+from collections.abc import Callable, Hashable, Sequence
+from operator import attrgetter
+from typing import Any, TypeVar
+
+T = TypeVar('T')
+N = TypeVar('N')
+
+_missing = object()
+
+
+class TreeUtil:
+    """
+    树形数据工具类
+    """
+
+    @classmethod
+    def list_to_tree(
+        cls,
+        data_list: Sequence[T],
+        node_func: Callable[[T, list[N] | None], N],
+        id_field: str,
+        parent_field: str = 'parent_id',
+        root_parent_id: Hashable = _missing,
+    ) -> list[N]:
+        """
+        工具方法：根据列表数据生成树形嵌套数据
+
+        先一次性建立父节点id到子节点列表的索引，再从根节点开始自底向上生成节点，整体复杂度为O(n)，
+        同一父节点下的子节点保持列表中的原有顺序
+
+        :param data_list: 列表数据
+        :param node_func: 节点生成函数，参数为当前数据及已生成的子节点列表（无子节点时为None）
+        :param id_field: 数据id属性名
+        :param parent_field: 数据父id属性名
+        :param root_parent_id: 根节点的父id，不传时将父节点不在列表中的数据作为根节点
+        :return: 树形嵌套数据
+        """
+        get_id = attrgetter(id_field)
+        get_parent_id = attrgetter(parent_field)
+        children_map: dict[Any, list[T]] = {}
+        for item in data_list:
+            children_map.setdefault(get_parent_id(item), []).append(item)
+
+        if root_parent_id is _missing:
+            id_set = {get_id(item) for item in data_list}
+            roots = [item for item in data_list if get_parent_id(item) not in id_set]
+        else:
+            roots = children_map.get(root_parent_id, [])
+
+        def build_node(item: T) -> N:
+            children = children_map.get(get_id(item))
+            return node_func(item, [build_node(child) for child in children] if children else None)
+
+        return [build_node(item) for item in roots]
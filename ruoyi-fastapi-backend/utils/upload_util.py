@@ -1,7 +1,12 @@
+import asyncio
+import hashlib
 import os
 import random
-from collections.abc import AsyncGenerator
+import shutil
+import tempfile
+from collections.abc import AsyncIterator, Callable
 from datetime import datetime
+from typing import Any
 
 import aiofiles
 from fastapi import UploadFile
@@ -12,8 +17,18 @@ from config.env import UploadConfig
 class UploadUtil:
     """
     上传工具类
+
+    上传文件先边写入临时文件边计算sha256，再以内容哈希分片保存到UPLOAD_STORE_PATH中（相同内容只保存一份），
+    对外访问路径为指向存储文件的硬链接，存储文件的硬链接数减1即为引用次数，对外访问路径的格式保持不变；
+    删除对外访问路径后引用次数为0的存储文件会被一并删除。引用次数依赖硬链接数，迁移上传目录时需保留硬链接（如rsync -H），
+    复制或另行硬链接上传目录下的文件会使引用次数不准确。
     """
 
+    # 已创建的上传目录，避免每次上传都创建目录
+    _created_dirs: set[str] = set()
+    # 上传文件每次读取的字节数
+    upload_chunk_size = 1024 * 1024
+
     @classmethod
     def generate_random_number(cls) -> str:
         """
@@ -85,22 +100,192 @@ class UploadUtil:
         return filename.rsplit('.', 1)[0][-3:] in valid_code_list
 
     @classmethod
-    async def generate_file(cls, filepath: str) -> AsyncGenerator[bytes, None]:
+    def get_upload_dir(cls, category: str, now: datetime) -> str:
         """
-        根据文件生成二进制数据
+        获取按日期划分的上传目录相对路径，目录不存在时创建
 
-        :param filepath: 文件路径
-        :yield: 二进制数据
+        :param category: 上传目录分类，如upload、avatar
+        :param now: 当前时间
+        :return: 上传目录相对路径
+        """
+        relative_path = f'{category}/{now.strftime("%Y/%m/%d")}'
+        if relative_path not in cls._created_dirs:
+            os.makedirs(os.path.join(UploadConfig.UPLOAD_PATH, relative_path), exist_ok=True)
+            cls._created_dirs.add(relative_path)
+
+        return relative_path
+
+    @classmethod
+    def get_store_path(cls, content_hash: str) -> str:
+        """
+        获取内容哈希对应的存储文件路径，按哈希前4位分两级目录
+
+        :param content_hash: 文件内容的sha256
+        :return: 存储文件路径
+        """
+        return os.path.join(UploadConfig.UPLOAD_STORE_PATH, content_hash[:2], content_hash[2:4], content_hash)
+
+    @classmethod
+    def get_ref_count(cls, filepath: str) -> int:
+        """
+        获取上传文件对应的存储文件的引用次数
+
+        :param filepath: 上传文件路径或存储文件路径
+        :return: 引用次数，即除存储文件自身外的硬链接数
+        """
+        return os.stat(filepath).st_nlink - 1
+
+    @classmethod
+    async def save_upload_file(cls, file: UploadFile, filepath: str) -> None:
         """
-        async with aiofiles.open(filepath, 'rb') as response_file:
-            async for chunk in response_file:
+        保存上传文件对象，相同内容的文件只保存一份
+
+        :param file: 上传文件对象
+        :param filepath: 上传文件的对外访问路径
+        :return:
+        """
+
+        async def read_chunks() -> AsyncIterator[bytes]:
+            while chunk := await file.read(cls.upload_chunk_size):
                 yield chunk
 
+        await cls._save_chunks(read_chunks(), filepath)
+
+    @classmethod
+    async def save_upload_bytes(cls, data: bytes, filepath: str) -> None:
+        """
+        保存上传的二进制数据，相同内容的文件只保存一份
+
+        :param data: 二进制数据
+        :param filepath: 上传文件的对外访问路径
+        :return:
+        """
+
+        async def read_chunks() -> AsyncIterator[bytes]:
+            yield data
+
+        await cls._save_chunks(read_chunks(), filepath)
+
+    @classmethod
+    async def _save_chunks(cls, chunks: AsyncIterator[bytes], filepath: str) -> None:
+        """
+        将数据边计算哈希边写入存储目录下的临时文件，再保存到内容寻址存储并链接到对外访问路径
+
+        :param chunks: 数据块迭代器
+        :param filepath: 上传文件的对外访问路径
+        :return:
+        """
+        fd, temp_path = tempfile.mkstemp(dir=UploadConfig.UPLOAD_STORE_PATH, suffix='.tmp')
+        content_hash = hashlib.sha256()
+        try:
+            async with aiofiles.open(fd, 'wb') as f:
+                async for chunk in chunks:
+                    # 数据量较大时hashlib会释放GIL，放入线程中计算避免阻塞事件循环
+                    await asyncio.to_thread(content_hash.update, chunk)
+                    await f.write(chunk)
+            await asyncio.to_thread(cls._link_store_file, temp_path, content_hash.hexdigest(), filepath)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
     @classmethod
-    def delete_file(cls, filepath: str) -> None:
+    def _link_store_file(cls, temp_path: str, content_hash: str, filepath: str) -> None:
+        """
+        将临时文件保存为存储文件（已存在相同内容时直接复用），并在对外访问路径创建指向存储文件的硬链接；
+        文件系统不支持硬链接时退化为直接保存到对外访问路径
+
+        :param temp_path: 临时文件路径
+        :param content_hash: 文件内容的sha256
+        :param filepath: 上传文件的对外访问路径
+        :return:
         """
-        根据文件路径删除对应文件
+        store_path = cls.get_store_path(content_hash)
+        os.makedirs(os.path.dirname(store_path), exist_ok=True)
+        try:
+            # 使用硬链接原子地创建存储文件，不会覆盖并发上传的相同内容
+            os.link(temp_path, store_path)
+        except FileExistsError:
+            pass
+        except OSError:
+            cls._save_to_public_path(shutil.move, temp_path, filepath)
+            return
+        try:
+            cls._save_to_public_path(os.link, store_path, filepath)
+        except OSError:
+            # 对外访问路径与存储目录不在同一文件系统时无法创建硬链接，直接保存临时文件并清理未被引用的存储文件
+            cls._save_to_public_path(shutil.move, temp_path, filepath)
+            cls._remove_unreferenced_store_file(store_path)
+
+    @classmethod
+    def _save_to_public_path(cls, save_func: Callable[[str, str], Any], source_path: str, filepath: str) -> None:
+        """
+        将文件保存到对外访问路径，上传目录已被删除时重新创建目录后再保存
+
+        :param save_func: 保存文件的函数，如os.link、shutil.move
+        :param source_path: 源文件路径
+        :param filepath: 上传文件的对外访问路径
+        :return:
+        """
+        try:
+            save_func(source_path, filepath)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            save_func(source_path, filepath)
+
+    @classmethod
+    def _remove_unreferenced_store_file(cls, store_path: str) -> None:
+        """
+        删除引用次数为0的存储文件
+
+        :param store_path: 存储文件路径
+        :return:
+        """
+        try:
+            if cls.get_ref_count(store_path) == 0:
+                os.remove(store_path)
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def _get_file_hash(cls, filepath: str) -> str:
+        """
+        计算文件内容的sha256
+
+        :param filepath: 文件路径
+        :return: 文件内容的sha256
+        """
+        content_hash = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            while chunk := f.read(cls.upload_chunk_size):
+                content_hash.update(chunk)
+        return content_hash.hexdigest()
+
+    @classmethod
+    async def delete_file(cls, filepath: str) -> None:
+        """
+        根据文件路径删除对应文件，删除的是存储文件的最后一个对外访问路径时同时删除存储文件，文件不存在时忽略
+
+        :param filepath: 文件路径
+        :return:
+        """
+        # 计算文件哈希需要读取整个文件，放入线程中执行避免阻塞事件循环
+        await asyncio.to_thread(cls._delete_file, filepath)
+
+    @classmethod
+    def _delete_file(cls, filepath: str) -> None:
+        """
+        删除文件，并删除引用次数为0的存储文件
 
         :param filepath: 文件路径
+        :return:
         """
-        os.remove(filepath)
+        try:
+            store_path = None
+            # 引用次数为1时，当前文件为存储文件的最后一个对外访问路径
+            if cls.get_ref_count(filepath) == 1:
+                store_path = cls.get_store_path(cls._get_file_hash(filepath))
+            os.remove(filepath)
+        except FileNotFoundError:
+            return
+        if store_path:
+            cls._remove_unreferenced_store_file(store_path)
@@ -134,3 +134,11 @@ export function deptTreeSelect() {
     method: 'get'
   })
 }
+
+// 查询用户导入进度
+export function getImportUserProgress(taskId) {
+  return request({
+    url: '/system/user/importData/' + taskId,
+    method: 'get'
+  })
+}